@@ -0,0 +1,158 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import time
+
+from celery.signals import task_failure, task_success
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from sentry_sdk import Hub
+
+from sentry import app, options
+from sentry.utils import metrics
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+_request_futures = threading.local()
+
+
+def _get_executor():
+    """
+    Returns the pool shared by all loaders, or ``None`` if loaders should be
+    run synchronously by the calling thread. The pool is replaced (and the
+    previous one shut down) when the ``api.serializer-loader.workers``
+    option changes.
+    """
+    global _executor, _executor_workers
+
+    workers = options.get("api.serializer-loader.workers")
+    if workers <= 0:
+        return None
+
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                # Loads that were already submitted still complete.
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="serializer-loader"
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _freeze(value):
+    """
+    Returns a hashable version of ``value`` for use in a cache key. Raises
+    ``TypeError`` if the value contains something that is not hashable.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    elif isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    hash(value)
+    return value
+
+
+def _get_request_futures():
+    # Like ``request_cache``, loads are only shared while handling a request.
+    if app.env.request is None:
+        return None
+    if not hasattr(_request_futures, "items"):
+        _request_futures.items = {}
+    return _request_futures.items
+
+
+def clear_request_futures(**kwargs):
+    _request_futures.items = {}
+
+
+request_finished.connect(clear_request_futures)
+task_failure.connect(clear_request_futures)
+task_success.connect(clear_request_futures)
+
+
+class AttributeLoader:
+    """
+    Runs the independent fetches a serializer needs for ``get_attrs``.
+
+    Each fetch is declared with ``load``, which returns a future for its
+    result. When the ``api.serializer-loader.workers`` option is positive,
+    fetches run concurrently on a bounded thread pool that is shared by all
+    serializers; otherwise they run immediately in the calling thread.
+    Repeated loads of the same key, function and arguments return the future
+    of the first load. While handling a request, this applies to all loaders
+    of that request, so loaded functions must only depend on their
+    arguments. The duration of each fetch is recorded as a metric.
+
+    Loaded functions must not depend on each other's results, since a loader
+    that blocks on another could exhaust the pool.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.__executor = _get_executor()
+        self.__futures = {}
+
+    @property
+    def concurrent(self):
+        """Whether loads run in other threads than the calling one."""
+        return self.__executor is not None
+
+    def load(self, key, function, *args, **kwargs):
+        try:
+            cache_key = (key, function, _freeze(args), _freeze(kwargs))
+        except TypeError:
+            cache_key = None
+
+        futures = _get_request_futures()
+        if futures is None:
+            futures = self.__futures
+
+        future = futures.get(cache_key) if cache_key is not None else None
+        if future is not None:
+            metrics.incr(
+                "api.serializer.loader.deduplicated",
+                tags={"serializer": self.name, "loader": key},
+            )
+            return future
+
+        if self.__executor is None:
+            future = Future()
+            try:
+                future.set_result(self.__run(key, function, args, kwargs))
+            except Exception as error:
+                future.set_exception(error)
+        else:
+            future = self.__executor.submit(
+                self.__run_in_thread, Hub(Hub.current), key, function, args, kwargs
+            )
+
+        if cache_key is not None:
+            futures[cache_key] = future
+        return future
+
+    def __run(self, key, function, args, kwargs):
+        start = time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics.timing(
+                "api.serializer.loader.duration",
+                time() - start,
+                tags={"serializer": self.name, "loader": key},
+            )
+
+    def __run_in_thread(self, hub, key, function, args, kwargs):
+        with Hub(hub):
+            try:
+                return self.__run(key, function, args, kwargs)
+            finally:
+                # Django opens a connection per thread. Like at the end of a
+                # request, only connections that are broken or have exceeded
+                # ``CONN_MAX_AGE`` are closed, so that the pool's worker
+                # threads can reuse persistent connections.
+                close_old_connections()
@@ -12,6 +12,7 @@ from django.utils import timezone
 
 from sentry import tagstore, tsdb
 from sentry.api.serializers import Serializer, register, serialize
+from sentry.api.serializers.loader import AttributeLoader
 from sentry.api.serializers.models.actor import ActorSerializer
 from sentry.app import env
 from sentry.auth.superuser import is_active_superuser
@@ -173,6 +174,136 @@ class GroupSerializerBase(Serializer):
 
         return {group_id: {"unhandled": unhandled} for group_id, unhandled in unhandled.items()}
 
+    @staticmethod
+    def _get_bookmarks(item_list, user):
+        return set(
+            GroupBookmark.objects.filter(user=user, group__in=item_list).values_list(
+                "group_id", flat=True
+            )
+        )
+
+    @staticmethod
+    def _get_seen_groups(item_list, user):
+        return dict(
+            GroupSeen.objects.filter(user=user, group__in=item_list).values_list(
+                "group_id", "last_seen"
+            )
+        )
+
+    @staticmethod
+    def _get_assignees(item_list):
+        return {
+            a.group_id: a.assigned_actor()
+            for a in GroupAssignee.objects.filter(group__in=item_list)
+        }
+
+    @staticmethod
+    def _get_ignore_items(item_list):
+        return {g.group_id: g for g in GroupSnooze.objects.filter(group__in=item_list)}
+
+    @staticmethod
+    def _get_release_resolutions(resolved_item_list):
+        if not resolved_item_list:
+            return {}
+
+        return {
+            i[0]: i[1:]
+            for i in GroupResolution.objects.filter(group__in=resolved_item_list).values_list(
+                "group", "type", "release__version", "actor_id"
+            )
+        }
+
+    @staticmethod
+    def _get_commit_resolutions(resolved_item_list, user):
+        if not resolved_item_list:
+            return {}
+
+        # due to our laziness, and django's inability to do a reasonable join here
+        # we end up with two queries
+        commit_results = list(
+            Commit.objects.extra(
+                select={"group_id": "sentry_grouplink.group_id"},
+                tables=["sentry_grouplink"],
+                where=[
+                    "sentry_grouplink.linked_id = sentry_commit.id",
+                    "sentry_grouplink.group_id IN ({})".format(
+                        ", ".join(str(i.id) for i in resolved_item_list)
+                    ),
+                    "sentry_grouplink.linked_type = %s",
+                    "sentry_grouplink.relationship = %s",
+                ],
+                params=[int(GroupLink.LinkedType.commit), int(GroupLink.Relationship.resolves)],
+            )
+        )
+        return {i.group_id: d for i, d in zip(commit_results, serialize(commit_results, user))}
+
+    @staticmethod
+    def _get_actors(actor_ids, user):
+        if not actor_ids:
+            return {}
+
+        users = list(User.objects.filter(id__in=actor_ids, is_active=True))
+        return {u.id: d for u, d in zip(users, serialize(users, user))}
+
+    @staticmethod
+    def _get_share_ids(item_list):
+        return dict(GroupShare.objects.filter(group__in=item_list).values_list("group_id", "uuid"))
+
+    @staticmethod
+    def _get_integration_annotations(item_list, organization_id):
+        from sentry.integrations import IntegrationFeatures
+
+        annotations_by_group_id = defaultdict(list)
+
+        # find all the integration installs that have issue tracking
+        for integration in Integration.objects.filter(organizations=organization_id):
+            if not (
+                integration.has_feature(IntegrationFeatures.ISSUE_BASIC)
+                or integration.has_feature(IntegrationFeatures.ISSUE_SYNC)
+            ):
+                continue
+
+            install = integration.get_installation(organization_id)
+            local_annotations_by_group_id = (
+                safe_execute(
+                    install.get_annotations_for_group_list,
+                    group_list=item_list,
+                    _with_transaction=False,
+                )
+                or {}
+            )
+            merge_list_dictionaries(annotations_by_group_id, local_annotations_by_group_id)
+
+        return annotations_by_group_id
+
+    @staticmethod
+    def _get_plugin_annotations(project, item_list, populate_cache=False):
+        from sentry.plugins.base import plugins
+
+        # Plugins read the GroupMeta cache, which is local to each thread. The
+        # calling thread populates it in ``get_attrs``, other threads need to
+        # populate their own.
+        if populate_cache:
+            GroupMeta.objects.populate_cache(item_list)
+
+        annotations_by_group_id = defaultdict(list)
+        for plugin in plugins.for_project(project=project, version=1):
+            for item in item_list:
+                safe_execute(
+                    plugin.tags,
+                    None,
+                    item,
+                    annotations_by_group_id[item.id],
+                    _with_transaction=False,
+                )
+        for plugin in plugins.for_project(project=project, version=2):
+            for item in item_list:
+                annotations_by_group_id[item.id].extend(
+                    safe_execute(plugin.get_annotations, group=item, _with_transaction=False) or ()
+                )
+
+        return annotations_by_group_id
+
     @staticmethod
     def _get_subscriptions(
         groups: Iterable[Group], user: User
@@ -221,9 +352,11 @@ class GroupSerializerBase(Serializer):
         )
 
     def get_attrs(self, item_list, user):
-        from sentry.integrations import IntegrationFeatures
         from sentry.models import PlatformExternalIssue
-        from sentry.plugins.base import plugins
+
+        # if no groups, then we can't proceed but this seems to be a valid use case
+        if not item_list:
+            return {}
 
         GroupMeta.objects.populate_cache(item_list)
 
@@ -231,86 +364,7 @@ class GroupSerializerBase(Serializer):
         # making unnecessary queries.
         attach_foreignkey(item_list, Group.project, related=("organization",))
 
-        if user.is_authenticated and item_list:
-            bookmarks = set(
-                GroupBookmark.objects.filter(user=user, group__in=item_list).values_list(
-                    "group_id", flat=True
-                )
-            )
-            seen_groups = dict(
-                GroupSeen.objects.filter(user=user, group__in=item_list).values_list(
-                    "group_id", "last_seen"
-                )
-            )
-            subscriptions = self._get_subscriptions(item_list, user)
-        else:
-            bookmarks = set()
-            seen_groups = {}
-            subscriptions = defaultdict(lambda: (False, False, None))
-
-        assignees = {
-            a.group_id: a.assigned_actor()
-            for a in GroupAssignee.objects.filter(group__in=item_list)
-        }
-        resolved_assignees = ActorTuple.resolve_dict(assignees)
-
-        ignore_items = {g.group_id: g for g in GroupSnooze.objects.filter(group__in=item_list)}
-
-        resolved_item_list = [i for i in item_list if i.status == GroupStatus.RESOLVED]
-        if resolved_item_list:
-            release_resolutions = {
-                i[0]: i[1:]
-                for i in GroupResolution.objects.filter(group__in=resolved_item_list).values_list(
-                    "group", "type", "release__version", "actor_id"
-                )
-            }
-
-            # due to our laziness, and django's inability to do a reasonable join here
-            # we end up with two queries
-            commit_results = list(
-                Commit.objects.extra(
-                    select={"group_id": "sentry_grouplink.group_id"},
-                    tables=["sentry_grouplink"],
-                    where=[
-                        "sentry_grouplink.linked_id = sentry_commit.id",
-                        "sentry_grouplink.group_id IN ({})".format(
-                            ", ".join(str(i.id) for i in resolved_item_list)
-                        ),
-                        "sentry_grouplink.linked_type = %s",
-                        "sentry_grouplink.relationship = %s",
-                    ],
-                    params=[int(GroupLink.LinkedType.commit), int(GroupLink.Relationship.resolves)],
-                )
-            )
-            commit_resolutions = {
-                i.group_id: d for i, d in zip(commit_results, serialize(commit_results, user))
-            }
-        else:
-            release_resolutions = {}
-            commit_resolutions = {}
-
-        actor_ids = {r[-1] for r in release_resolutions.values()}
-        actor_ids.update(r.actor_id for r in ignore_items.values())
-        if actor_ids:
-            users = list(User.objects.filter(id__in=actor_ids, is_active=True))
-            actors = {u.id: d for u, d in zip(users, serialize(users, user))}
-        else:
-            actors = {}
-
-        share_ids = dict(
-            GroupShare.objects.filter(group__in=item_list).values_list("group_id", "uuid")
-        )
-
-        result = {}
-
-        seen_stats = self._get_seen_stats(item_list, user)
-
-        annotations_by_group_id = defaultdict(list)
-
         organization_id_list = list({item.project.organization_id for item in item_list})
-        # if no groups, then we can't proceed but this seems to be a valid use case
-        if not item_list:
-            return {}
         if len(organization_id_list) > 1:
             # this should never happen but if it does we should know about it
             logger.warn(
@@ -321,54 +375,90 @@ class GroupSerializerBase(Serializer):
         # should only have 1 org at this point
         organization_id = organization_id_list[0]
 
-        # find all the integration installs that have issue tracking
-        for integration in Integration.objects.filter(organizations=organization_id):
-            if not (
-                integration.has_feature(IntegrationFeatures.ISSUE_BASIC)
-                or integration.has_feature(IntegrationFeatures.ISSUE_SYNC)
-            ):
-                continue
+        resolved_item_list = [i for i in item_list if i.status == GroupStatus.RESOLVED]
 
-            install = integration.get_installation(organization_id)
-            local_annotations_by_group_id = (
-                safe_execute(
-                    install.get_annotations_for_group_list,
-                    group_list=item_list,
-                    _with_transaction=False,
-                )
-                or {}
+        # All of these are independent of each other, so they are declared up
+        # front and may be fetched concurrently.
+        loader = AttributeLoader(type(self).__name__)
+        if user.is_authenticated:
+            bookmarks = loader.load("bookmarks", self._get_bookmarks, item_list, user)
+            seen_groups = loader.load("seen_groups", self._get_seen_groups, item_list, user)
+            subscriptions = loader.load("subscriptions", self._get_subscriptions, item_list, user)
+        assignees = loader.load("assignees", self._get_assignees, item_list)
+        ignore_items = loader.load("ignore_items", self._get_ignore_items, item_list)
+        release_resolutions = loader.load(
+            "release_resolutions", self._get_release_resolutions, resolved_item_list
+        )
+        commit_resolutions = loader.load(
+            "commit_resolutions", self._get_commit_resolutions, resolved_item_list, user
+        )
+        share_ids = loader.load("share_ids", self._get_share_ids, item_list)
+        seen_stats = loader.load("seen_stats", self._get_seen_stats, item_list, user)
+        integration_annotations = loader.load(
+            "integration_annotations",
+            self._get_integration_annotations,
+            item_list,
+            organization_id,
+        )
+        external_issue_annotations = loader.load(
+            "external_issue_annotations",
+            safe_execute,
+            PlatformExternalIssue.get_annotations_for_group_list,
+            group_list=item_list,
+            _with_transaction=False,
+        )
+        items_by_project = defaultdict(list)
+        for item in item_list:
+            items_by_project[item.project].append(item)
+        plugin_annotations = [
+            loader.load(
+                "plugin_annotations",
+                self._get_plugin_annotations,
+                project,
+                project_items,
+                populate_cache=loader.concurrent,
             )
-            merge_list_dictionaries(annotations_by_group_id, local_annotations_by_group_id)
+            for project, project_items in items_by_project.items()
+        ]
 
-        # find the external issues for sentry apps and add them in
-        local_annotations_by_group_id = (
-            safe_execute(
-                PlatformExternalIssue.get_annotations_for_group_list,
-                group_list=item_list,
-                _with_transaction=False,
-            )
-            or {}
-        )
-        merge_list_dictionaries(annotations_by_group_id, local_annotations_by_group_id)
+        if user.is_authenticated:
+            bookmarks = bookmarks.result()
+            seen_groups = seen_groups.result()
+            subscriptions = subscriptions.result()
+        else:
+            bookmarks = set()
+            seen_groups = {}
+            subscriptions = defaultdict(lambda: (False, False, None))
 
-        snuba_stats = self._get_group_snuba_stats(item_list, seen_stats)
+        resolved_assignees = ActorTuple.resolve_dict(assignees.result())
+        ignore_items = ignore_items.result()
+        release_resolutions = release_resolutions.result()
+        commit_resolutions = commit_resolutions.result()
+        share_ids = share_ids.result()
+        seen_stats = seen_stats.result()
 
+        # These depend on the results of the loads above.
+        actor_ids = {r[-1] for r in release_resolutions.values()}
+        actor_ids.update(r.actor_id for r in ignore_items.values())
+        actors = loader.load("actors", self._get_actors, actor_ids, user)
+        snuba_stats = loader.load("snuba_stats", self._get_group_snuba_stats, item_list, seen_stats)
+
+        annotations_by_group_id = defaultdict(list)
+        merge_list_dictionaries(annotations_by_group_id, integration_annotations.result())
+        merge_list_dictionaries(annotations_by_group_id, external_issue_annotations.result() or {})
+        for annotations in plugin_annotations:
+            merge_list_dictionaries(annotations_by_group_id, annotations.result())
+
+        actors = actors.result()
+        snuba_stats = snuba_stats.result()
+
+        result = {}
         for item in item_list:
             active_date = item.active_at or item.first_seen
 
             annotations = []
             annotations.extend(annotations_by_group_id[item.id])
 
-            # add the annotations for plugins
-            # note that the model GroupMeta where all the information is stored is already cached at the top of this function
-            # so these for loops doesn't make a bunch of queries
-            for plugin in plugins.for_project(project=item.project, version=1):
-                safe_execute(plugin.tags, None, item, annotations, _with_transaction=False)
-            for plugin in plugins.for_project(project=item.project, version=2):
-                annotations.extend(
-                    safe_execute(plugin.get_annotations, group=item, _with_transaction=False) or ()
-                )
-
             resolution_actor = None
             resolution_type = None
             resolution = release_resolutions.get(item.id)
@@ -1280,6 +1280,15 @@ SENTRY_METRICS_OPTIONS = {}
 SENTRY_METRICS_SAMPLE_RATE = 1.0
 SENTRY_METRICS_PREFIX = "sentry."
 SENTRY_METRICS_SKIP_INTERNAL_PREFIXES = []  # Order this by most frequent prefixes.
+# Aggregate metrics in process and send them to the backend in bulk every
+# given number of seconds, instead of sending every metric as it is recorded.
+SENTRY_METRICS_FLUSH_INTERVAL = None
+# Maximum number of distinct series aggregated between two flushes.
+SENTRY_METRICS_BUFFER_MAX_KEYS = 10000
+
+# The library used to encode and decode JSON, either "simplejson" or "orjson".
+# Both produce the same values, but "orjson" is considerably faster.
+SENTRY_JSON_BACKEND = "simplejson"
 
 # Render charts on the backend. This uses the Chartcuterie external service.
 SENTRY_CHART_RENDERER = "sentry.charts.chartcuterie.Chartcuterie"
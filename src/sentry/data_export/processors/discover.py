@@ -69,7 +69,7 @@ class DiscoverProcessor:
     @staticmethod
     def get_data_fn(fields, query, params, sort):
         def data_fn(offset, limit):
-            return discover.query(
+            return discover.stream_query(
                 selected_columns=fields,
                 query=query,
                 params=params,
@@ -3,6 +3,7 @@ import csv
 import logging
 import tempfile
 from hashlib import sha1
+from itertools import islice
 
 import sentry_sdk
 from celery.exceptions import MaxRetriesExceededError
@@ -24,6 +25,7 @@ from sentry.utils import metrics
 from sentry.utils.sdk import capture_exception
 
 from .base import (
+    DISCOVER_CHUNK_SIZE,
     EXPORTED_ROWS_LIMIT,
     MAX_BATCH_SIZE,
     SNUBA_MAX_RESULTS,
@@ -130,15 +132,16 @@ def assemble_download(
                     # the number of rows to export in the next batch fragment
                     fragment_row_count = min(batch_size, max(export_limit - next_offset, 1))
 
-                    rows = process_rows(processor, data_export, fragment_row_count, next_offset)
-                    writer.writerows(rows)
+                    row_count = process_rows(
+                        processor, data_export, fragment_row_count, next_offset, writer
+                    )
 
-                    fragment_offset += len(rows)
+                    fragment_offset += row_count
                     next_offset = offset + fragment_offset
 
                     if (
-                        not rows
-                        or len(rows) < batch_size
+                        not row_count
+                        or row_count < batch_size
                         # the batch may exceed MAX_BATCH_SIZE but immediately stops
                         or tf.tell() - starting_pos >= MAX_BATCH_SIZE
                     ):
@@ -182,12 +185,7 @@ def assemble_download(
                 )
                 return data_export.email_failure(message="Internal processing failure")
         else:
-            if (
-                rows
-                and len(rows) >= batch_size
-                and new_bytes_written
-                and next_offset < export_limit
-            ):
+            if row_count >= batch_size and new_bytes_written and next_offset < export_limit:
                 assemble_download.delay(
                     data_export_id,
                     export_limit=export_limit,
@@ -227,13 +225,17 @@ def get_processor(data_export, environment_id):
         raise
 
 
-def process_rows(processor, data_export, batch_size, offset):
+def process_rows(processor, data_export, batch_size, offset, writer):
+    """
+    Writes a batch of rows to ``writer`` and returns the number of rows
+    written.
+    """
     try:
         if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
-            rows = process_issues_by_tag(processor, batch_size, offset)
+            row_count = process_issues_by_tag(processor, batch_size, offset, writer)
         elif data_export.query_type == ExportQueryType.DISCOVER:
-            rows = process_discover(processor, batch_size, offset)
-        return rows
+            row_count = process_discover(processor, batch_size, offset, writer)
+        return row_count
     except ExportError as error:
         error_str = str(error)
         metrics.incr("dataexport.error", tags={"error": error_str}, sample_rate=1.0)
@@ -243,14 +245,26 @@ def process_rows(processor, data_export, batch_size, offset):
 
 
 @handle_snuba_errors(logger)
-def process_issues_by_tag(processor, limit, offset):
-    return processor.get_serialized_data(limit=limit, offset=offset)
+def process_issues_by_tag(processor, limit, offset, writer):
+    rows = processor.get_serialized_data(limit=limit, offset=offset)
+    writer.writerows(rows)
+    return len(rows)
 
 
 @handle_snuba_errors(logger)
-def process_discover(processor, limit, offset):
-    raw_data_unicode = processor.data_fn(limit=limit, offset=offset)["data"]
-    return processor.handle_fields(raw_data_unicode)
+def process_discover(processor, limit, offset, writer):
+    # The rows are streamed from Snuba and written in chunks, so only a chunk
+    # of them is held in memory at a time rather than the whole batch. Errors
+    # can be raised while the rows are consumed, so that happens within the
+    # error handling of this function.
+    rows = processor.data_fn(limit=limit, offset=offset)
+    row_count = 0
+    while True:
+        chunk = list(islice(rows, DISCOVER_CHUNK_SIZE))
+        if not chunk:
+            return row_count
+        writer.writerows(processor.handle_fields(chunk))
+        row_count += len(chunk)
 
 
 @transaction.atomic()
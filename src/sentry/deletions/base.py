@@ -1,8 +1,9 @@
 import logging
 import re
+from collections import OrderedDict
 
 from sentry.constants import ObjectStatus
-from sentry.utils.query import bulk_delete_objects
+from sentry.utils.query import bulk_delete_objects, bulk_delete_objects_by_id
 
 _leaf_re = re.compile(r"^(UserReport|Event|Group)(.+)")
 
@@ -26,26 +27,84 @@ class ModelRelation(BaseRelation):
         super().__init__(params=params, task=task)
 
 
+def merge_relations(relations):
+    """
+    Collapses ``ModelRelation``s that only differ by the value of a single
+    equality filter into one relation with an ``__in`` filter, e.g.
+    ``{"group_id": 1}`` and ``{"group_id": 2}`` become
+    ``{"group_id__in": [1, 2]}``. Order of first appearance is preserved since
+    relations may depend on each other being deleted in sequence.
+    """
+    merged = OrderedDict()
+    for relation in relations:
+        query = relation.params.get("query")
+        if (
+            not isinstance(relation, ModelRelation)
+            or len(query) != 1
+            or next(iter(query)).endswith("__in")
+        ):
+            merged[id(relation)] = relation
+            continue
+
+        ((column, value),) = query.items()
+        key = (
+            relation.params["model"],
+            relation.task,
+            column,
+            tuple(sorted((relation.params.get("partition_key") or {}).items())),
+        )
+        merged.setdefault(key, []).append(relation)
+
+    rv = []
+    for key, value in merged.items():
+        if not isinstance(value, list):
+            rv.append(value)
+        elif len(value) == 1:
+            rv.append(value[0])
+        else:
+            model, task, column, partition_key = key
+            values = list(OrderedDict.fromkeys(r.params["query"][column] for r in value))
+            rv.append(
+                ModelRelation(
+                    model,
+                    {f"{column}__in": values},
+                    task=task,
+                    partition_key=dict(partition_key) or None,
+                )
+            )
+    return rv
+
+
 class BaseDeletionTask:
     logger = logging.getLogger("sentry.deletions.async")
 
     DEFAULT_CHUNK_SIZE = 100
 
     def __init__(
-        self, manager, skip_models=None, transaction_id=None, actor_id=None, chunk_size=None
+        self,
+        manager,
+        skip_models=None,
+        transaction_id=None,
+        actor_id=None,
+        chunk_size=None,
+        bulk=False,
     ):
         self.manager = manager
         self.skip_models = set(skip_models) if skip_models else None
         self.transaction_id = transaction_id
         self.actor_id = actor_id
         self.chunk_size = chunk_size if chunk_size is not None else self.DEFAULT_CHUNK_SIZE
+        # In bulk mode child relations are resolved for a whole chunk of
+        # parents at once and rows are removed with set-based statements.
+        self.bulk = bulk
 
     def __repr__(self):
-        return "<{}: skip_models={} transaction_id={} actor_id={}>".format(
+        return "<{}: skip_models={} transaction_id={} actor_id={} bulk={}>".format(
             type(self),
             self.skip_models,
             self.transaction_id,
             self.actor_id,
+            self.bulk,
         )
 
     def chunk(self):
@@ -97,14 +156,26 @@ class BaseDeletionTask:
             if has_more:
                 return has_more
 
-        for instance in instance_list:
-            child_relations = self.get_child_relations(instance)
-            child_relations = self.extend_relations(child_relations, instance)
-            child_relations = self.filter_relations(child_relations)
+        if self.bulk:
+            child_relations = []
+            for instance in instance_list:
+                child_relations.extend(
+                    self.extend_relations(self.get_child_relations(instance), instance)
+                )
+            child_relations = self.filter_relations(merge_relations(child_relations))
             if child_relations:
                 has_more = self.delete_children(child_relations)
                 if has_more:
                     return has_more
+        else:
+            for instance in instance_list:
+                child_relations = self.get_child_relations(instance)
+                child_relations = self.extend_relations(child_relations, instance)
+                child_relations = self.filter_relations(child_relations)
+                if child_relations:
+                    has_more = self.delete_children(child_relations)
+                    if has_more:
+                        return has_more
 
         return self.delete_instance_bulk(instance_list)
 
@@ -122,6 +193,7 @@ class BaseDeletionTask:
                 transaction_id=self.transaction_id,
                 actor_id=self.actor_id,
                 task=relation.task,
+                bulk=self.bulk,
                 **relation.params,
             )
             has_more = True
@@ -145,13 +217,14 @@ class ModelDeletionTask(BaseDeletionTask):
         self.order_by = order_by
 
     def __repr__(self):
-        return "<{}: model={} query={} order_by={} transaction_id={} actor_id={}>".format(
+        return "<{}: model={} query={} order_by={} transaction_id={} actor_id={} bulk={}>".format(
             type(self),
             self.model,
             self.query,
             self.order_by,
             self.transaction_id,
             self.actor_id,
+            self.bulk,
         )
 
     def extend_relations(self, child_relations, obj):
@@ -191,11 +264,44 @@ class ModelDeletionTask(BaseDeletionTask):
             remaining -= query_limit
         return True
 
+    def can_delete_in_bulk(self):
+        """
+        Rows can only be removed with a set-based delete when neither this
+        task customizes ``delete_instance`` nor the model overrides ``delete``
+        (e.g. to remove files or clear caches), as both would be skipped.
+        """
+        from django.db import models
+
+        return (
+            self.bulk
+            and type(self).delete_instance is ModelDeletionTask.delete_instance
+            and self.model.delete is models.Model.delete
+        )
+
     def delete_instance_bulk(self, instance_list):
+        if self.can_delete_in_bulk():
+            return self.delete_instance_ids([instance.id for instance in instance_list])
+
         # slow, but ensures Django cascades are handled
         for instance in instance_list:
             self.delete_instance(instance)
 
+    def delete_instance_ids(self, id_list):
+        """
+        Removes all rows in ``id_list`` at once. When nothing needs to cascade
+        this is a single ``DELETE ... WHERE id = ANY(...)``, otherwise Django
+        collects the remaining dependents with one query per related model.
+        """
+        from django.db import router
+        from django.db.models.deletion import Collector
+
+        queryset = getattr(self.model, self.manager_name).filter(id__in=id_list)
+        if Collector(using=router.db_for_write(self.model)).can_fast_delete(queryset):
+            return bulk_delete_objects_by_id(
+                self.model, id_list, transaction_id=self.transaction_id, logger=self.logger
+            )
+        return queryset.delete()
+
     def delete_instance(self, instance):
         instance_id = instance.id
         try:
@@ -1,4 +1,5 @@
 import os
+from collections import defaultdict
 
 from sentry import eventstore, models, nodestore
 from sentry.eventstore.models import Event
@@ -43,8 +44,9 @@ class EventDataDeletionTask(BaseDeletionTask):
 
     DEFAULT_CHUNK_SIZE = 10000
 
-    def __init__(self, manager, group_id, project_id, **kwargs):
+    def __init__(self, manager, group_id=None, project_id=None, group_ids=None, **kwargs):
         self.group_id = group_id
+        self.group_ids = group_ids if group_ids is not None else [group_id]
         self.project_id = project_id
         self.last_event = None
         super().__init__(manager, **kwargs)
@@ -64,7 +66,7 @@ class EventDataDeletionTask(BaseDeletionTask):
 
         events = eventstore.get_unfetched_events(
             filter=eventstore.Filter(
-                conditions=conditions, project_ids=[self.project_id], group_ids=[self.group_id]
+                conditions=conditions, project_ids=[self.project_id], group_ids=self.group_ids
             ),
             limit=self.DEFAULT_CHUNK_SIZE,
             referrer="deletions.group",
@@ -78,15 +80,36 @@ class EventDataDeletionTask(BaseDeletionTask):
 
         # Remove from nodestore
         node_ids = [Event.generate_node_id(self.project_id, event.event_id) for event in events]
-        nodestore.delete_multi(node_ids)
+        if self.bulk:
+            from sentry.tasks.deletion import delete_nodestore_nodes
+
+            delete_nodestore_nodes.delay(node_ids=node_ids)
+        else:
+            nodestore.delete_multi(node_ids)
 
         # Remove EventAttachment and UserReport *again* as those may not have a
         # group ID, therefore there may be dangling ones after "regular" model
         # deletion.
         event_ids = [event.event_id for event in events]
-        models.EventAttachment.objects.filter(
+        attachments = models.EventAttachment.objects.filter(
             event_id__in=event_ids, project_id=self.project_id
-        ).delete()
+        )
+        if self.bulk:
+            from django.core.cache import cache
+
+            from sentry.models.eventattachment import get_crashreport_key
+            from sentry.tasks.files import delete_files
+
+            # Mirror ``EventAttachment.delete``, which a set-based delete skips.
+            rows = list(attachments.values_list("file_id", "group_id"))
+            attachments.delete()
+            if rows:
+                cache.delete_many(
+                    [get_crashreport_key(group_id) for group_id in {row[1] for row in rows}]
+                )
+                delete_files.delay(file_ids=[row[0] for row in rows])
+        else:
+            attachments.delete()
         models.UserReport.objects.filter(
             event_id__in=event_ids, project_id=self.project_id
         ).delete()
@@ -103,8 +126,10 @@ class GroupDeletionTask(ModelDeletionTask):
             [ModelRelation(m, {"group_id": instance.id}) for m in _GROUP_RELATED_MODELS]
         )
 
-        # Skip EventDataDeletionTask if this is being called from cleanup.py
-        if not os.environ.get("_SENTRY_CLEANUP"):
+        # Skip EventDataDeletionTask if this is being called from cleanup.py.
+        # In bulk mode event data is removed for all groups of a project at
+        # once, see ``get_child_relations_bulk``.
+        if not self.bulk and not os.environ.get("_SENTRY_CLEANUP"):
             relations.extend(
                 [
                     BaseRelation(
@@ -116,6 +141,31 @@ class GroupDeletionTask(ModelDeletionTask):
 
         return relations
 
+    def get_child_relations_bulk(self, instance_list):
+        if not self.bulk or os.environ.get("_SENTRY_CLEANUP"):
+            return []
+
+        group_ids_by_project = defaultdict(list)
+        for instance in instance_list:
+            group_ids_by_project[instance.project_id].append(instance.id)
+
+        return [
+            BaseRelation({"group_ids": group_ids, "project_id": project_id}, EventDataDeletionTask)
+            for project_id, group_ids in group_ids_by_project.items()
+        ]
+
+    def delete_instance_bulk(self, instance_list):
+        if not self.bulk:
+            return super().delete_instance_bulk(instance_list)
+
+        from sentry import similarity
+
+        if not self.skip_models or similarity not in self.skip_models:
+            for instance in instance_list:
+                similarity.delete(None, instance)
+
+        return self.delete_instance_ids([instance.id for instance in instance_list])
+
     def delete_instance(self, instance):
         from sentry import similarity
 
@@ -1,4 +1,6 @@
 import logging
+from collections.abc import Mapping
+from contextlib import contextmanager
 
 from sentry.utils.imports import import_string
 from sentry.utils.services import Service
@@ -13,6 +15,22 @@ def load(options):
 DEFAULT_CODEC = {"path": "sentry.digests.codecs.CompressedPickleCodec"}
 
 
+def get_minimum_delay(minimum_delay, key, default):
+    """
+    Resolves the minimum delay for a timeline, where ``minimum_delay`` may
+    either be a single value or a mapping of timeline key to value.
+    """
+    if isinstance(minimum_delay, Mapping):
+        minimum_delay = minimum_delay.get(key)
+    return minimum_delay if minimum_delay is not None else default
+
+
+class SkipDigest(Exception):
+    """
+    Raised into a digest context to abort it without closing the timeline.
+    """
+
+
 class InvalidState(Exception):
     """
     An error that is raised when an action cannot be performed on a
@@ -53,7 +71,18 @@ class Backend(Service):
     be transitioned to "waiting" instead.)
     """
 
-    __all__ = ("add", "delete", "digest", "enabled", "maintenance", "schedule", "validate")
+    __all__ = (
+        "add",
+        "add_many",
+        "delete",
+        "digest",
+        "digest_many",
+        "enabled",
+        "maintenance",
+        "schedule",
+        "schedule_batches",
+        "validate",
+    )
 
     def __init__(self, **options):
         # The ``minimum_delay`` option defines the default minimum amount of
@@ -121,6 +150,23 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    def add_many(self, items, increment_delay=None, maximum_delay=None):
+        """
+        Add many records to (possibly many) timelines.
+
+        ``items`` is a sequence of ``(key, record)`` pairs. The return value
+        is a list of booleans (in the same order as ``items``) indicating
+        whether or not the respective timeline is ready for immediate
+        digestion. Backends should override this to reduce the number of
+        round trips required compared to calling ``add`` for each item.
+        """
+        return [
+            bool(
+                self.add(key, record, increment_delay=increment_delay, maximum_delay=maximum_delay)
+            )
+            for key, record in items
+        ]
+
     def digest(self, key, minimum_delay=None):
         """
         Extract records from a timeline for processing.
@@ -156,6 +202,49 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    @contextmanager
+    def digest_many(self, keys, minimum_delay=None):
+        """
+        Extract records from many timelines for processing.
+
+        This behaves like ``digest``, but the target of the ``as`` clause is
+        a mapping of timeline key to records. Timelines that could not be
+        digested (e.g. because they are not in the "ready" state) are omitted
+        from the mapping. ``minimum_delay`` may either be a single value or a
+        mapping of timeline key to value.
+
+        If the context manager successfully exits, all timelines that are
+        still present in the mapping are closed. Timelines removed from the
+        mapping by the caller are left untouched, as if the digest operation
+        for them had failed.
+        """
+        contexts = {}
+        digests = {}
+        try:
+            for key in keys:
+                context = self.digest(
+                    key, minimum_delay=get_minimum_delay(minimum_delay, key, None)
+                )
+                try:
+                    digests[key] = context.__enter__()
+                except InvalidState as error:
+                    logger.info("Skipping digest for %r: %s", key, error)
+                else:
+                    contexts[key] = context
+
+            yield digests
+        except BaseException as error:
+            for context in contexts.values():
+                context.__exit__(type(error), error, error.__traceback__)
+            raise
+        else:
+            for key, context in contexts.items():
+                if key in digests:
+                    context.__exit__(None, None, None)
+                else:
+                    error = SkipDigest()
+                    context.__exit__(SkipDigest, error, None)
+
     def schedule(self, deadline):
         """
         Identify timelines that are ready for processing.
@@ -167,6 +256,21 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    def schedule_batches(self, deadline, batch_size):
+        """
+        Identify timelines that are ready for processing, like ``schedule``,
+        but yield lists of at most ``batch_size`` schedule entries so that
+        they can be handed out to workers together.
+        """
+        batch = []
+        for entry in self.schedule(deadline):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     def maintenance(self, deadline):
         """
         Identify timelines that appear to be stuck in the ready state.
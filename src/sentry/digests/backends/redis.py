@@ -1,12 +1,14 @@
 import logging
 import time
-from contextlib import contextmanager
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
 
 from redis.client import ResponseError
 
 from sentry.digests import Record, ScheduleEntry
-from sentry.digests.backends.base import Backend, InvalidState
+from sentry.digests.backends.base import Backend, InvalidState, get_minimum_delay
 from sentry.utils.compat import map
+from sentry.utils.locking import UnableToAcquireLock
 from sentry.utils.locking.backends.redis import RedisLockBackend
 from sentry.utils.locking.manager import LockManager
 from sentry.utils.redis import check_cluster_versions, get_cluster_from_options, load_script
@@ -95,6 +97,29 @@ class RedisBackend(Backend):
         lock_key = f"{self.namespace}:t:{key}"
         return self.locks.get(lock_key, duration=duration, routing_key=lock_key)
 
+    def _group_by_host(self, items, key_func=lambda item: item):
+        """
+        Partitions ``items`` by the host that the timeline identified by
+        ``key_func(item)`` is stored on, preserving their relative order.
+        """
+        router = self.cluster.get_router()
+        hosts = defaultdict(list)
+        for item in items:
+            hosts[router.get_host_for_key(f"{self.namespace}:t:{key_func(item)}")].append(item)
+        return hosts
+
+    def _decode_records(self, response):
+        return map(
+            lambda key__value__timestamp: Record(
+                key__value__timestamp[0].decode("utf-8"),
+                self.codec.decode(key__value__timestamp[1])
+                if key__value__timestamp[1] is not None
+                else None,
+                float(key__value__timestamp[2]),
+            ),
+            response,
+        )
+
     def add(self, key, record, increment_delay=None, maximum_delay=None, timestamp=None):
         if timestamp is None:
             timestamp = time.time()
@@ -128,6 +153,45 @@ class RedisBackend(Backend):
             )
         )
 
+    def add_many(self, items, increment_delay=None, maximum_delay=None, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+
+        if increment_delay is None:
+            increment_delay = self.increment_delay
+
+        if maximum_delay is None:
+            maximum_delay = self.maximum_delay
+
+        items = list(items)
+        results = [False] * len(items)
+        positions = self._group_by_host(enumerate(items), key_func=lambda item: item[1][0])
+        for host, entries in positions.items():
+            arguments = [
+                "ADD_MANY",
+                self.namespace,
+                self.ttl,
+                timestamp,
+                increment_delay,
+                maximum_delay,
+                self.capacity if self.capacity else -1,
+                self.truncation_chance,
+            ]
+            for _, (key, record) in entries:
+                arguments.extend(
+                    [key, record.key, self.codec.encode(record.value), record.timestamp]
+                )
+
+            response = script(
+                self.cluster.get_local_client(host),
+                list({key for _, (key, _) in entries}),
+                arguments,
+            )
+            for (i, _), ready in zip(entries, response):
+                results[i] = bool(ready)
+
+        return results
+
     def __schedule_partition(self, host, deadline, timestamp):
         return script(
             self.cluster.get_local_client(host),
@@ -202,16 +266,7 @@ class RedisBackend(Backend):
                 else:
                     raise
 
-            records = map(
-                lambda key__value__timestamp: Record(
-                    key__value__timestamp[0].decode("utf-8"),
-                    self.codec.decode(key__value__timestamp[1])
-                    if key__value__timestamp[1] is not None
-                    else None,
-                    float(key__value__timestamp[2]),
-                ),
-                response,
-            )
+            records = self._decode_records(response)
 
             # If the record value is `None`, this means the record data was
             # missing (it was presumably evicted by Redis) so we don't need to
@@ -225,6 +280,70 @@ class RedisBackend(Backend):
                 + [record.key for record in records],
             )
 
+    @contextmanager
+    def digest_many(self, keys, minimum_delay=None, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+
+        with ExitStack() as stack:
+            locked = []
+            for key in keys:
+                try:
+                    stack.enter_context(self._get_timeline_lock(key, duration=30).acquire())
+                except UnableToAcquireLock as error:
+                    logger.info("Skipping digest for %r: %s", key, error)
+                else:
+                    locked.append(key)
+
+            hosts = self._group_by_host(locked)
+
+            record_keys = {}
+            digests = {}
+            for host, host_keys in hosts.items():
+                response = script(
+                    self.cluster.get_local_client(host),
+                    host_keys,
+                    [
+                        "DIGEST_OPEN_MANY",
+                        self.namespace,
+                        self.ttl,
+                        timestamp,
+                        self.capacity if self.capacity else -1,
+                    ]
+                    + host_keys,
+                )
+                for key, ready, records in response:
+                    key = key.decode("utf-8")
+                    if not ready:
+                        logger.info(
+                            "Skipping digest for %r: timeline is not in the ready state", key
+                        )
+                        continue
+                    records = self._decode_records(records)
+                    record_keys[key] = [record.key for record in records]
+                    digests[key] = [record for record in records if record.value is not None]
+
+            yield digests
+
+            for host, host_keys in hosts.items():
+                arguments = ["DIGEST_CLOSE_MANY", self.namespace, self.ttl, timestamp]
+                for key in host_keys:
+                    # Timelines which were dropped from the mapping by the
+                    # caller are left open, and will be retried after the next
+                    # maintenance run.
+                    if key not in digests:
+                        continue
+                    arguments.extend(
+                        [
+                            key,
+                            get_minimum_delay(minimum_delay, key, self.minimum_delay),
+                            len(record_keys[key]),
+                        ]
+                        + record_keys[key]
+                    )
+                if len(arguments) > 4:
+                    script(self.cluster.get_local_client(host), host_keys, arguments)
+
     def delete(self, key, timestamp=None):
         if timestamp is None:
             timestamp = time.time()
@@ -1,6 +1,8 @@
 import pickle
 import zlib
 
+import msgpack
+
 
 class Codec:
     def encode(self, value):
@@ -16,3 +18,43 @@ class CompressedPickleCodec(Codec):
 
     def decode(self, value):
         return pickle.loads(zlib.decompress(value))
+
+
+class EventReferenceCodec(Codec):
+    """
+    Encodes a digest notification as a reference to the event (project, event
+    and group ID) and the IDs of the rules that fired, instead of pickling the
+    whole event. The event payload is rehydrated from nodestore in bulk when
+    the digest is built (see ``sentry.digests.notifications.bind_events``.)
+    The record timestamp is not part of the value, since it is already stored
+    as the score of the record in the timeline.
+
+    Values that were written by the ``CompressedPickleCodec`` can still be
+    decoded, which allows switching codecs while timelines are populated.
+    """
+
+    version = 1
+
+    # zlib streams (as written by ``CompressedPickleCodec``) always start with
+    # this byte, while the msgpack array header used here never does.
+    zlib_header = b"\x78"
+
+    def __init__(self):
+        self.fallback = CompressedPickleCodec()
+
+    def encode(self, value):
+        event = value.event
+        return msgpack.packb(
+            [self.version, event.project_id, event.event_id, event.group_id, list(value.rules)]
+        )
+
+    def decode(self, value):
+        from sentry.digests.notifications import Notification
+        from sentry.eventstore.models import Event
+
+        if value[:1] == self.zlib_header:
+            return self.fallback.decode(value)
+
+        version, project_id, event_id, group_id, rules = msgpack.unpackb(value, raw=False)
+        assert version == self.version, f"Unsupported record version: {version}"
+        return Notification(Event(project_id, event_id, group_id=group_id), rules)
@@ -4,6 +4,7 @@ import logging
 from collections import OrderedDict, defaultdict, namedtuple
 from functools import reduce
 
+from sentry import eventstore
 from sentry.app import tsdb
 from sentry.digests import Record
 from sentry.models import Group, GroupStatus, Project, Rule
@@ -48,6 +49,19 @@ def event_to_record(event, rules):
     )
 
 
+def bind_events(records):
+    """
+    Fetches the payloads of all events in ``records`` that were decoded from
+    references (and not from a full copy of the event) in a single nodestore
+    request.
+    """
+    events = [
+        record.value.event for record in records if record.value.event.data._node_data is None
+    ]
+    if events:
+        eventstore.bind_nodes(events, "data")
+
+
 def fetch_state(project, records):
     # This reads a little strange, but remember that records are returned in
     # reverse chronological order, and we query the database in chronological
@@ -200,6 +214,8 @@ def build_digest(project, records, state=None):
 
     state = attach_state(**state)
 
+    bind_events(records)
+
     def check_group_state(record):
         return record.value.event.group.get_status() == GroupStatus.UNRESOLVED
 
@@ -1,4 +1,3 @@
-import copy
 import ipaddress
 import logging
 import random
@@ -29,6 +28,7 @@ from sentry.grouping.api import (
     GroupingConfigNotFound,
     SecondaryGroupingConfigLoader,
     apply_server_fingerprinting,
+    copy_event_for_grouping,
     get_fingerprinting_config_for_project,
     get_grouping_config_dict_for_event_data,
     get_grouping_config_dict_for_project,
@@ -76,6 +76,7 @@ from sentry.utils import json, metrics
 from sentry.utils.cache import cache_key_for_event
 from sentry.utils.canonical import CanonicalKeyDict
 from sentry.utils.dates import to_datetime, to_timestamp
+from sentry.utils.functional import cache_scope
 from sentry.utils.outcomes import Outcome, track_outcome
 from sentry.utils.safe import get_path, safe_execute, setdefault_path, trim
 
@@ -348,40 +349,48 @@ class EventManager:
         _derive_plugin_tags_many(jobs, projects)
         _derive_interface_tags_many(jobs)
 
-        do_background_grouping_before = options.get("store.background-grouping-before")
-        if do_background_grouping_before:
-            _run_background_grouping(project, job)
-
-        secondary_flat_hashes = []
-
-        try:
-            if (project.get_option("sentry:secondary_grouping_expiry") or 0) >= time.time():
-                with metrics.timer("event_manager.secondary_grouping"):
-                    secondary_event = copy.deepcopy(job["event"])
-                    loader = SecondaryGroupingConfigLoader()
-                    secondary_grouping_config = loader.get_config_dict(project)
-                    _calculate_event_grouping(project, secondary_event, secondary_grouping_config)
-                    secondary_flat_hashes.extend(secondary_event.data["hashes"])
-        except Exception:
-            sentry_sdk.capture_exception()
-
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            grouping_config = get_grouping_config_dict_for_event_data(
-                job["event"].data.data, project
-            )
-
-        with sentry_sdk.start_span(op="event_manager.save.calculate_event_grouping"), metrics.timer(
-            "event_manager.calculate_event_grouping"
-        ):
-            _calculate_event_grouping(project, job["event"], grouping_config)
+        # Grouping the event with several configs shares the work that does
+        # not depend on the config, like trimming function names.
+        with cache_scope():
+            do_background_grouping_before = options.get("store.background-grouping-before")
+            if do_background_grouping_before:
+                _run_background_grouping(project, job)
+
+            with metrics.timer("event_manager.load_grouping_config"):
+                # At this point we want to normalize the in_app values in case the
+                # clients did not set this appropriately so far.
+                grouping_config = get_grouping_config_dict_for_event_data(
+                    job["event"].data.data, project
+                )
 
-        flat_hashes = job["event"].data["hashes"] + secondary_flat_hashes
-        hierarchical_hashes = job["event"].data.get("hierarchical_hashes") or []
+            secondary_flat_hashes = []
 
-        if not do_background_grouping_before:
-            _run_background_grouping(project, job)
+            try:
+                if (project.get_option("sentry:secondary_grouping_expiry") or 0) >= time.time():
+                    with metrics.timer("event_manager.secondary_grouping"):
+                        loader = SecondaryGroupingConfigLoader()
+                        secondary_grouping_config = loader.get_config_dict(project)
+                        # The same config would produce the same hashes as the
+                        # primary grouping below.
+                        if secondary_grouping_config != grouping_config:
+                            secondary_event = copy_event_for_grouping(job["event"])
+                            _calculate_event_grouping(
+                                project, secondary_event, secondary_grouping_config
+                            )
+                            secondary_flat_hashes.extend(secondary_event.data["hashes"])
+            except Exception:
+                sentry_sdk.capture_exception()
+
+            with sentry_sdk.start_span(
+                op="event_manager.save.calculate_event_grouping"
+            ), metrics.timer("event_manager.calculate_event_grouping"):
+                _calculate_event_grouping(project, job["event"], grouping_config)
+
+            flat_hashes = job["event"].data["hashes"] + secondary_flat_hashes
+            hierarchical_hashes = job["event"].data.get("hierarchical_hashes") or []
+
+            if not do_background_grouping_before:
+                _run_background_grouping(project, job)
 
         _materialize_metadata_many(jobs)
 
@@ -548,7 +557,7 @@ def _run_background_grouping(project, job):
         if sample_rate and random.random() <= sample_rate:
             config = BackgroundGroupingConfigLoader().get_config_dict(project)
             if config["id"]:
-                copied_event = copy.deepcopy(job["event"])
+                copied_event = copy_event_for_grouping(job["event"])
                 _calculate_background_grouping(project, copied_event, config)
     except Exception:
         sentry_sdk.capture_exception()
@@ -10,6 +10,7 @@ from sentry.eventstream.kafka.consumer import SynchronizedConsumer
 from sentry.eventstream.kafka.protocol import get_task_kwargs_for_message
 from sentry.eventstream.snuba import SnubaProtocolEventStream
 from sentry.utils import json, kafka, metrics
+from sentry.utils.sampling_profiler import profiling_stage
 
 logger = logging.getLogger(__name__)
 
@@ -210,13 +211,15 @@ class KafkaEventStream(SnubaProtocolEventStream):
             i = i + 1
             owned_partition_offsets[key] = message.offset() + 1
 
-            with metrics.timer("eventstream.duration", instance="get_task_kwargs_for_message"):
+            with metrics.timer(
+                "eventstream.duration", instance="get_task_kwargs_for_message"
+            ), profiling_stage("eventstream.get_task_kwargs_for_message"):
                 task_kwargs = get_task_kwargs_for_message(message.value())
 
             if task_kwargs is not None:
                 with metrics.timer(
                     "eventstream.duration", instance="dispatch_post_process_group_task"
-                ):
+                ), profiling_stage("eventstream.dispatch_post_process_group_task"):
                     self._dispatch_post_process_group_task(**task_kwargs)
 
             if i % commit_batch_size == 0:
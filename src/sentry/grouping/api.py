@@ -1,3 +1,4 @@
+import copy
 import re
 
 from sentry import options
@@ -194,6 +195,55 @@ def apply_server_fingerprinting(event, config, allow_custom_title=True):
         }
 
 
+def _copy_frames(stacktrace):
+    rv = dict(stacktrace)
+    frames = stacktrace.get("frames")
+    if isinstance(frames, list):
+        rv["frames"] = frames = [
+            dict(frame) if isinstance(frame, dict) else frame for frame in frames
+        ]
+        for frame in frames:
+            if isinstance(frame, dict) and isinstance(frame.get("data"), dict):
+                frame["data"] = dict(frame["data"])
+    return rv
+
+
+def _copy_stacktrace_container(container):
+    if not isinstance(container, dict):
+        return container
+    rv = dict(container)
+    for key in ("stacktrace", "raw_stacktrace"):
+        if isinstance(rv.get(key), dict):
+            rv[key] = _copy_frames(rv[key])
+    return rv
+
+
+def copy_event_for_grouping(event):
+    """
+    Returns a copy of the event that can be grouped with another config
+    without affecting the original event.
+
+    Grouping only sets top-level keys and modifies the frames of stack
+    traces, so instead of deep-copying the entire event only the frames and
+    the containers leading to them are copied.  All other data is shared with
+    the original event.
+    """
+    data = event.data.data.copy()
+    for key in ("exception", "threads"):
+        container = data.get(key)
+        if isinstance(container, dict) and isinstance(container.get("values"), list):
+            values = [_copy_stacktrace_container(x) for x in container["values"]]
+            data[key] = dict(container, values=values)
+    if isinstance(data.get("stacktrace"), dict):
+        data["stacktrace"] = _copy_frames(data["stacktrace"])
+
+    rv = copy.copy(event)
+    rv.data = data
+    if hasattr(event, "_project_cache"):
+        rv._project_cache = event._project_cache
+    return rv
+
+
 def _get_calculated_grouping_variants_for_event(event, context):
     winning_strategy = None
     precedence_hint = None
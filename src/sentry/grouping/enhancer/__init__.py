@@ -1,6 +1,7 @@
 import base64
 import os
 import zlib
+from threading import Lock
 
 import msgpack
 from parsimonious.exceptions import ParseError
@@ -8,10 +9,12 @@ from parsimonious.grammar import Grammar, NodeVisitor
 
 from sentry import projectoptions
 from sentry.grouping.component import GroupingComponent
+from sentry.utils.hashlib import md5_text
 from sentry.utils.strings import unescape_string
 
 from .actions import Action, FlagAction, VarAction
 from .exceptions import InvalidEnhancerConfig
+from .index import RuleIndex
 from .matchers import (
     CalleeMatch,
     CallerMatch,
@@ -96,6 +99,13 @@ class StacktraceState:
         return f"{hint} by stack trace rule ({description})"
 
 
+# Rule indexes are kept per process for the most recently used configs.
+RULE_INDEXES_CACHE_SIZE = 100
+
+_rule_indexes_cache = {}
+_rule_indexes_cache_lock = Lock()
+
+
 class Enhancements:
 
     # NOTE: You must add a version to ``VERSIONS`` any time attributes are added
@@ -115,6 +125,27 @@ class Enhancements:
 
         self._modifier_rules = [rule for rule in self.iter_rules() if rule.is_modifier]
         self._updater_rules = [rule for rule in self.iter_rules() if rule.is_updater]
+        self._rule_indexes = None
+
+    def _get_rule_indexes(self):
+        """Returns the indexes of the modifier and updater rules.  They only
+        depend on the config, so they are shared by all instances loaded from
+        the same config.
+        """
+        if self._rule_indexes is None:
+            config_hash = md5_text(self.dumps()).hexdigest()
+            with _rule_indexes_cache_lock:
+                rule_indexes = _rule_indexes_cache.pop(config_hash, None)
+                if rule_indexes is None:
+                    rule_indexes = (
+                        RuleIndex(self._modifier_rules),
+                        RuleIndex(self._updater_rules),
+                    )
+                    if len(_rule_indexes_cache) >= RULE_INDEXES_CACHE_SIZE:
+                        del _rule_indexes_cache[next(iter(_rule_indexes_cache))]
+                _rule_indexes_cache[config_hash] = rule_indexes
+            self._rule_indexes = rule_indexes
+        return self._rule_indexes
 
     def apply_modifications_to_frame(self, frames, platform, exception_data):
         """This applies the frame modifications to the frames itself.  This
@@ -124,10 +155,11 @@ class Enhancements:
         cache = {}
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
+        candidates = self._get_rule_indexes()[0].get_candidates(match_frames)
 
-        for rule in self._modifier_rules:
+        for rule, frame_indexes in zip(self._modifier_rules, candidates):
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indexes
             ):
                 action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
 
@@ -136,13 +168,14 @@ class Enhancements:
         cache = {}
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
+        candidates = self._get_rule_indexes()[1].get_candidates(match_frames)
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
+        for rule, frame_indexes in zip(self._updater_rules, candidates):
 
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indexes
             ):
                 action.update_frame_components_contributions(components, frames, idx, rule=rule)
                 action.modify_stacktrace_state(stacktrace_state, rule)
@@ -312,13 +345,22 @@ class Rule:
             matchers[matcher.key] = matcher.pattern
         return {"match": matchers, "actions": [str(x) for x in self.actions]}
 
-    def get_matching_frame_actions(self, frames, platform, exception_data=None, cache=None):
+    def get_matching_frame_actions(
+        self, frames, platform, exception_data=None, cache=None, frame_indexes=None
+    ):
         """Given a frame returns all the matching actions based on this rule.
-        If the rule does not match `None` is returned.
+        If the rule does not match `None` is returned.  `frame_indexes`
+        restricts the frames that are checked to the candidates found by a
+        `RuleIndex`.
         """
         if not self.matchers:
             return []
 
+        if frame_indexes is None:
+            frame_indexes = range(len(frames))
+        elif not frame_indexes:
+            return []
+
         # 1 - Check if exception matchers match
         for m in self._exception_matchers:
             if not m.matches_frame(frames, -1, platform, exception_data, cache):
@@ -327,7 +369,7 @@ class Rule:
         rv = []
 
         # 2 - Check if frame matchers match
-        for idx, frame in enumerate(frames):
+        for idx in frame_indexes:
             if all(
                 m.matches_frame(frames, idx, platform, exception_data, cache)
                 for m in self._other_matchers
@@ -0,0 +1,110 @@
+from sentry.utils.glob import GlobSet
+
+from .matchers import FamilyMatch, FunctionMatch, ModuleMatch, PathLikeMatch
+
+# Frame fields that can be indexed.  They are never changed by actions, so
+# candidates stay valid while modifications are applied.
+INDEXED_MATCHERS = (FunctionMatch, ModuleMatch, PathLikeMatch, FamilyMatch)
+
+
+def _get_selectivity(matcher):
+    """
+    Estimates how few frames a positive matcher selects.  Literal characters
+    narrow a glob down while wildcards do not, and families only split frames
+    into a handful of buckets.
+    """
+    if isinstance(matcher, FamilyMatch):
+        return 0 if b"all" in matcher._flags else 0.5
+    return len(matcher.pattern) - matcher.pattern.count("*") - matcher.pattern.count("?")
+
+
+def _iter_bits(mask):
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length() - 1
+        mask ^= bit
+
+
+class FieldIndex:
+    """
+    Index of the patterns used with one frame field.  Returns the bitmask of
+    rules whose index matcher matches a frame.
+    """
+
+    def __init__(self, field, patterns, masks):
+        self.field = field
+        self.masks = masks
+        self.is_path = field in ("path", "package")
+        self.globs = GlobSet(patterns, doublestar=self.is_path, path_normalize=self.is_path)
+
+    def get_mask(self, match_frame, cache):
+        value = match_frame[self.field]
+        if value is None:
+            return 0
+        cache_key = (self.field, value)
+        rv = cache.get(cache_key)
+        if rv is None:
+            rv = 0
+            for index in self.globs.match(value):
+                rv |= self.masks[index]
+            if self.is_path and not value.startswith(b"/"):
+                for index in self.globs.match(b"/" + value):
+                    rv |= self.masks[index]
+            cache[cache_key] = rv
+        return rv
+
+
+class RuleIndex:
+    """
+    Index of the frames each rule of a list of rules may match.
+
+    Every rule is bucketed by its most selective positive matcher on a frame
+    field that actions never modify.  The patterns of each field are combined
+    into a `GlobSet`, so a stacktrace is indexed with one pass over its
+    frames and rules only need to be checked against their candidate frames.
+    Rules without such a matcher are candidates for every frame.
+    """
+
+    def __init__(self, rules):
+        self.size = len(rules)
+        self.unindexed = []
+        families = {}
+        patterns = {}
+        for rule_index, rule in enumerate(rules):
+            candidates = [
+                matcher
+                for matcher in rule.matchers
+                if isinstance(matcher, INDEXED_MATCHERS) and not matcher.negated
+            ]
+            matcher = max(candidates, key=_get_selectivity, default=None)
+            if matcher is None or not _get_selectivity(matcher):
+                self.unindexed.append(rule_index)
+            elif isinstance(matcher, FamilyMatch):
+                for family in matcher._flags:
+                    families[family] = families.get(family, 0) | 1 << rule_index
+            else:
+                by_pattern = patterns.setdefault(matcher.key, {})
+                by_pattern[matcher.pattern] = by_pattern.get(matcher.pattern, 0) | 1 << rule_index
+
+        self.families = families
+        self.fields = [
+            FieldIndex(field, list(by_pattern.keys()), list(by_pattern.values()))
+            for field, by_pattern in patterns.items()
+        ]
+
+    def get_candidates(self, match_frames):
+        """Returns the indexes of the candidate frames of every rule."""
+        all_frames = range(len(match_frames))
+        rv = [[] for _ in range(self.size)]
+        for rule_index in self.unindexed:
+            rv[rule_index] = all_frames
+
+        cache = {}
+        for frame_index, match_frame in enumerate(match_frames):
+            mask = self.families.get(match_frame["family"], 0)
+            for field in self.fields:
+                mask |= field.get_mask(match_frame, cache)
+            for rule_index in _iter_bits(mask):
+                rv[rule_index].append(frame_index)
+
+        return rv
@@ -1,16 +1,25 @@
 import inspect
+from threading import Lock
 
 from parsimonious.exceptions import ParseError
 from parsimonious.grammar import Grammar, NodeVisitor
 
 from sentry.grouping.utils import get_rule_bool
 from sentry.stacktraces.platform import get_behavior_family_for_platform
-from sentry.utils.glob import glob_match
+from sentry.utils import json
+from sentry.utils.glob import GlobSet, glob_match
+from sentry.utils.hashlib import md5_text
 from sentry.utils.safe import get_path
 from sentry.utils.strings import unescape_string
 
 VERSION = 1
 
+# Compiled matchers are kept per process for the most recently used configs.
+MATCHER_CACHE_SIZE = 100
+
+_matcher_cache = {}
+_matcher_cache_lock = Lock()
+
 
 # Grammar is defined in EBNF syntax.
 fingerprinting_grammar = Grammar(
@@ -169,6 +178,7 @@ class FingerprintingRules:
         self.version = version
         self.rules = rules
         self.changelog = changelog
+        self._matcher = None
 
     def iter_rules(self):
         return iter(self.rules)
@@ -176,11 +186,28 @@ class FingerprintingRules:
     def get_fingerprint_values_for_event(self, event):
         if not self.rules:
             return
-        access = EventAccess(event)
-        for rule in self.iter_rules():
-            new_values = rule.get_fingerprint_values_for_event_access(access)
-            if new_values is not None:
-                return (rule,) + new_values
+        index = self._get_matcher().get_matching_rule(EventAccess(event))
+        if index is not None:
+            rule = self.rules[index]
+            return rule, rule.fingerprint, rule.attributes
+
+    def _get_matcher(self):
+        """
+        Returns the compiled matcher for these rules.  Compiled matchers only
+        depend on the config, so they are shared by all instances loaded
+        from the same config.
+        """
+        if self._matcher is None:
+            config_hash = md5_text(json.dumps(self._to_config_structure())).hexdigest()
+            with _matcher_cache_lock:
+                matcher = _matcher_cache.pop(config_hash, None)
+                if matcher is None:
+                    matcher = FingerprintMatcher(self.rules)
+                    if len(_matcher_cache) >= MATCHER_CACHE_SIZE:
+                        del _matcher_cache[next(iter(_matcher_cache))]
+                _matcher_cache[config_hash] = matcher
+            self._matcher = matcher
+        return self._matcher
 
     @classmethod
     def _from_config_structure(cls, data):
@@ -398,6 +425,123 @@ class Rule:
         ).rstrip()
 
 
+class KeyMatcher:
+    """
+    Evaluates all distinct patterns used with one matcher key together.  The
+    result for a set of values is the bitmask of the patterns that match.
+    """
+
+    def __init__(self, key, patterns, bits):
+        self.key = key
+        self.bits = bits
+        self.matches = None
+        if key in ("path", "package"):
+            self.globs = GlobSet(patterns, doublestar=True, ignorecase=True, path_normalize=True)
+        elif key == "message":
+            self.globs = GlobSet(patterns, ignorecase=True)
+        elif key in ("family", "app"):
+            self.globs = None
+            self.matches = [Match(key, pattern) for pattern in patterns]
+        else:
+            self.globs = GlobSet(patterns, ignorecase=key in ("level", "value"))
+
+    def get_mask(self, values):
+        if self.matches is not None:
+            mask = 0
+            for bit, match in zip(self.bits, self.matches):
+                if match._positive_match(values):
+                    mask |= bit
+            return mask
+        if self.key == "path":
+            return self._get_path_mask(values.get("abs_path"))
+        if self.key == "package":
+            return self._get_path_mask(values.get("package"))
+        if self.key == "message":
+            return self._get_glob_mask(values.get("message")) | self._get_glob_mask(
+                values.get("value")
+            )
+        return self._get_glob_mask(values.get(self.key))
+
+    def _get_glob_mask(self, value):
+        mask = 0
+        if value is not None:
+            for index in self.globs.match(value):
+                mask |= self.bits[index]
+        return mask
+
+    def _get_path_mask(self, value):
+        if value is None:
+            return 0
+        mask = self._get_glob_mask(value)
+        if not value.startswith("/"):
+            mask |= self._get_glob_mask("/" + value)
+        return mask
+
+
+class FingerprintMatcher:
+    """
+    Compiled form of a list of fingerprinting rules.
+
+    Every distinct matcher is assigned a bit, and all matchers of a match
+    group are evaluated together in a single pass over the group's values
+    (for instance the frames of an event).  A rule then matches if, for each
+    of its match groups, one of the values has all of the rule's positive
+    bits and none of its negated bits set.
+    """
+
+    def __init__(self, rules):
+        bits = {}
+        patterns = {}
+        self.conditions = []
+        for rule in rules:
+            conditions = {}
+            for matcher in rule.matchers:
+                match_group = matcher.match_group
+                bit = bits.get((matcher.key, matcher.pattern))
+                if bit is None:
+                    bit = bits[matcher.key, matcher.pattern] = 1 << len(bits)
+                    by_key = patterns.setdefault(match_group, {})
+                    by_key.setdefault(matcher.key, []).append((matcher.pattern, bit))
+                required, negated = conditions.get(match_group, (0, 0))
+                if matcher.negated:
+                    negated |= bit
+                else:
+                    required |= bit
+                conditions[match_group] = required, negated
+            self.conditions.append(list(conditions.items()))
+
+        self.key_matchers = {
+            match_group: [
+                KeyMatcher(key, [pattern for pattern, _ in items], [bit for _, bit in items])
+                for key, items in by_key.items()
+            ]
+            for match_group, by_key in patterns.items()
+        }
+
+    def get_masks(self, access, match_group):
+        key_matchers = self.key_matchers[match_group]
+        masks = set()
+        for values in access.get_values(match_group):
+            mask = 0
+            for key_matcher in key_matchers:
+                mask |= key_matcher.get_mask(values)
+            masks.add(mask)
+        return masks
+
+    def get_matching_rule(self, access):
+        """Returns the index of the first rule matching the event, if any."""
+        masks_by_group = {}
+        for index, conditions in enumerate(self.conditions):
+            for match_group, (required, negated) in conditions:
+                masks = masks_by_group.get(match_group)
+                if masks is None:
+                    masks = masks_by_group[match_group] = self.get_masks(access, match_group)
+                if not any((mask & required) == required and not mask & negated for mask in masks):
+                    break
+            else:
+                return index
+
+
 class FingerprintingVisitor(NodeVisitor):
     visit_comment = visit_empty = lambda *a: None
     unwrapped_exceptions = (InvalidFingerprintingConfig,)
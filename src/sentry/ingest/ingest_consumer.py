@@ -36,6 +36,7 @@ from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
 from sentry.utils.dates import to_datetime
 from sentry.utils.kafka import create_batching_kafka_consumer
+from sentry.utils.sampling_profiler import profiling_stage
 from sentry.utils.sdk import mark_scope_as_unsafe
 
 logger = logging.getLogger(__name__)
@@ -71,7 +72,9 @@ class IngestConsumerWorker(AbstractBatchWorker):
 
     def flush_batch(self, batch):
         mark_scope_as_unsafe()
-        with metrics.timer("ingest_consumer.flush_batch"):
+        with metrics.timer("ingest_consumer.flush_batch"), profiling_stage(
+            "ingest_consumer.flush_batch"
+        ):
             return self._flush_batch(batch)
 
     def _flush_batch(self, batch: Sequence[Message]):
@@ -293,7 +296,8 @@ def _load_event(
 
 
 def _store_event(data) -> str:
-    return event_processing_store.store(data)
+    with profiling_stage("ingest_consumer.store_event"):
+        return event_processing_store.store(data)
 
 
 @trace_func(name="ingest_consumer.process_event")
@@ -27,10 +27,14 @@ class NotifyEmailAction(EventAction):
             return
 
         metrics.incr("notifications.sent", instance=self.metrics_slug, skip_internal=False)
+        # Mail actions of all rules share a key, so that the digest records of
+        # all of their targets are added at once. Each rule is still notified
+        # separately.
         yield self.future(
-            lambda event, futures: mail_adapter.rule_notify(
-                event, futures, target_type, self.data.get("targetIdentifier", None)
-            )
+            mail_adapter.rule_notify_many,
+            key="mail:rule_notify",
+            target_type=target_type,
+            target_identifier=self.data.get("targetIdentifier", None),
         )
 
     def get_form_instance(self):
@@ -39,49 +39,83 @@ class MailAdapter:
     ) -> None:
         metrics.incr("mail_adapter.rule_notify")
         rules = []
-        extra = {
-            "event_id": event.event_id,
-            "group_id": event.group_id,
-            "is_from_mail_action_adapter": True,
-            "target_type": target_type.value,
-            "target_identifier": target_identifier,
-        }
-        log_event = "dispatched"
         for future in futures:
             rules.append(future.rule)
-            extra["rule_id"] = future.rule.id
             if not future.kwargs:
                 continue
             raise NotImplementedError(
                 "The default behavior for notification de-duplication does not support args"
             )
 
+        self._notify_targets(event, [(target_type, target_identifier, rules)])
+
+    def rule_notify_many(self, event: Any, futures: Sequence[Any]) -> None:
+        """
+        Notify the targets of all mail actions triggered by an event. Every
+        future carries its ``target_type`` and ``target_identifier`` as
+        keyword arguments. Like with ``rule_notify``, every rule notifies its
+        target separately, but with digests enabled the records of all rules
+        are added in one batch.
+        """
+        metrics.incr("mail_adapter.rule_notify")
+        self._notify_targets(
+            event,
+            [
+                (
+                    future.kwargs["target_type"],
+                    future.kwargs.get("target_identifier"),
+                    [future.rule],
+                )
+                for future in futures
+            ],
+        )
+
+    def _notify_targets(self, event, targets):
         project = event.group.project
-        extra["project_id"] = project.id
+        extras = [
+            {
+                "event_id": event.event_id,
+                "group_id": event.group_id,
+                "is_from_mail_action_adapter": True,
+                "target_type": target_type.value,
+                "target_identifier": target_identifier,
+                "rule_id": rules[-1].id,
+                "project_id": project.id,
+            }
+            for target_type, target_identifier, rules in targets
+        ]
 
         if digests.enabled(project):
 
             def get_digest_option(key):
                 return ProjectOption.objects.get_value(project, get_digest_option_key("mail", key))
 
-            digest_key = unsplit_key(event.group.project, target_type, target_identifier)
-            extra["digest_key"] = digest_key
-            immediate_delivery = digests.add(
-                digest_key,
-                event_to_record(event, rules),
+            items = [
+                (
+                    unsplit_key(project, target_type, target_identifier),
+                    event_to_record(event, rules),
+                )
+                for target_type, target_identifier, rules in targets
+            ]
+            ready = digests.add_many(
+                items,
                 increment_delay=get_digest_option("increment_delay"),
                 maximum_delay=get_digest_option("maximum_delay"),
             )
-            if immediate_delivery:
-                deliver_digest.delay(digest_key)
-            else:
-                log_event = "digested"
+            for (digest_key, _), immediate_delivery, extra in zip(items, ready, extras):
+                extra["digest_key"] = digest_key
+                if immediate_delivery:
+                    deliver_digest.delay(digest_key)
+                    log_event = "dispatched"
+                else:
+                    log_event = "digested"
+                logger.info("mail.adapter.notification.%s" % log_event, extra=extra)
 
         else:
-            notification = Notification(event=event, rules=rules)
-            self.notify(notification, target_type, target_identifier)
-
-        logger.info("mail.adapter.notification.%s" % log_event, extra=extra)
+            for (target_type, target_identifier, rules), extra in zip(targets, extras):
+                notification = Notification(event=event, rules=rules)
+                self.notify(notification, target_type, target_identifier)
+                logger.info("mail.adapter.notification.dispatched", extra=extra)
 
     def _build_subject_prefix(self, project):
         subject_prefix = ProjectOption.objects.get_value(project, self.mail_option_key, None)
@@ -25,3 +25,38 @@ class MetricsBackend(local):
 
     def timing(self, key, value, instance=None, tags=None, sample_rate=1):
         raise NotImplementedError
+
+    def gauge(self, key, value, instance=None, tags=None, sample_rate=1):
+        raise NotImplementedError
+
+    def _get_unsampled_counters(self, timings):
+        """
+        Returns the number of values that a ``MetricsBuffer`` left out of the
+        sample of each timing, as ``metrics.buffer.unsampled`` counters with
+        the timing's key as the instance.
+        """
+        return [
+            (
+                "metrics.buffer.unsampled",
+                key,
+                dict(tags),
+                int(round(len(values) / sample_rate)) - len(values),
+            )
+            for key, instance, tags, values, sample_rate in timings
+            if sample_rate < 1
+        ]
+
+    def flush_buffer(self, counters, timings):
+        """
+        Sends the counters and timings aggregated by a ``MetricsBuffer``.
+        Backends that can send several metrics at once should override this.
+
+        The timings are already sampled by the buffer, so the kept values are
+        sent without a sample rate, which backends would use to sample them
+        again. The values left out of the sample are counted separately.
+        """
+        for key, instance, tags, amount in counters + self._get_unsampled_counters(timings):
+            self.incr(key, instance, tags, amount)
+        for key, instance, tags, values, _ in timings:
+            for value in values:
+                self.timing(key, value, instance, tags)
@@ -0,0 +1,123 @@
+__all__ = ["MetricsBuffer"]
+
+import atexit
+import logging
+import os
+from random import random
+from threading import Lock, Thread
+from time import sleep
+
+logger = logging.getLogger("sentry.errors")
+
+
+def _freeze_tags(tags):
+    if not tags:
+        return ()
+    return tuple(sorted(tags.items()))
+
+
+class MetricsBuffer:
+    """
+    Aggregates metrics in process and periodically hands them to
+    ``flush_func`` in bulk.
+
+    Counters are summed and timings are summarized as a uniform sample of at
+    most ``max_timing_values`` values per ``(key, instance, tags)``, along
+    with the rate of values that were kept.  The buffer holds at most
+    ``max_keys`` distinct series between two flushes; metrics for further
+    series are dropped and reported as the ``metrics.buffer.dropped`` counter
+    on the next flush.
+
+    ``flush_func`` is called from a background thread with the lists of
+    ``(key, instance, tags, amount)`` counters and ``(key, instance, tags,
+    values, sample_rate)`` timings.
+    """
+
+    def __init__(self, flush_func, name, flush_interval=10, max_keys=10000, max_timing_values=100):
+        self.flush_func = flush_func
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self.max_timing_values = max_timing_values
+        self.__lock = Lock()
+        self.__counters = {}
+        self.__timings = {}
+        self.__dropped = 0
+        self.__pid = None
+
+    def __ensure_started(self):
+        # Forked processes do not inherit the flushing thread and need to
+        # start their own.
+        if self.__pid == os.getpid():
+            return
+
+        self.__pid = os.getpid()
+        self.__counters = {}
+        self.__timings = {}
+        self.__dropped = 0
+        thread = Thread(target=self.__run, name=f"{self.name}-flusher", daemon=True)
+        thread.start()
+        atexit.register(self.flush)
+
+    def __run(self):
+        while True:
+            sleep(self.flush_interval)
+            self.flush()
+
+    def incr(self, key, instance=None, tags=None, amount=1):
+        series = (key, instance, _freeze_tags(tags))
+        with self.__lock:
+            self.__ensure_started()
+            if series in self.__counters:
+                self.__counters[series] += amount
+            elif len(self.__counters) + len(self.__timings) < self.max_keys:
+                self.__counters[series] = amount
+            else:
+                self.__dropped += 1
+
+    def timing(self, key, value, instance=None, tags=None):
+        series = (key, instance, _freeze_tags(tags))
+        with self.__lock:
+            self.__ensure_started()
+            summary = self.__timings.get(series)
+            if summary is None:
+                if len(self.__counters) + len(self.__timings) >= self.max_keys:
+                    self.__dropped += 1
+                    return
+                summary = self.__timings[series] = [0, []]
+
+            summary[0] += 1
+            values = summary[1]
+            if len(values) < self.max_timing_values:
+                values.append(value)
+            else:
+                # Reservoir sampling keeps a uniform sample of all values.
+                index = int(random() * summary[0])
+                if index < self.max_timing_values:
+                    values[index] = value
+
+    def flush(self):
+        with self.__lock:
+            counters, self.__counters = self.__counters, {}
+            timings, self.__timings = self.__timings, {}
+            dropped, self.__dropped = self.__dropped, 0
+
+        if not (counters or timings or dropped):
+            return
+
+        counters = [
+            (key, instance, dict(tags), amount)
+            for (key, instance, tags), amount in counters.items()
+        ]
+        if dropped:
+            counters.append(("metrics.buffer.dropped", self.name, {}, dropped))
+
+        timings = [
+            (key, instance, dict(tags), values, len(values) / count)
+            for (key, instance, tags), (count, values) in timings.items()
+        ]
+
+        try:
+            self.flush_func(counters, timings)
+        except Exception:
+            logger.exception("Unable to flush metrics buffer")
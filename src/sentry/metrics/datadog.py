@@ -33,8 +33,8 @@ class DatadogMetricsBackend(MetricsBackend):
         return instance
 
     def incr(self, key, instance=None, tags=None, amount=1, sample_rate=1):
-        if tags is None:
-            tags = {}
+        # The tags may be shared with other metrics, so they are not modified.
+        tags = dict(tags or ())
         if self.tags:
             tags.update(self.tags)
         if instance:
@@ -46,8 +46,7 @@ class DatadogMetricsBackend(MetricsBackend):
         )
 
     def timing(self, key, value, instance=None, tags=None, sample_rate=1):
-        if tags is None:
-            tags = {}
+        tags = dict(tags or ())
         if self.tags:
             tags.update(self.tags)
         if instance:
@@ -57,3 +56,15 @@ class DatadogMetricsBackend(MetricsBackend):
         self.stats.timing(
             self._get_key(key), value, sample_rate=sample_rate, tags=tags, host=self.host
         )
+
+    def gauge(self, key, value, instance=None, tags=None, sample_rate=1):
+        tags = dict(tags or ())
+        if self.tags:
+            tags.update(self.tags)
+        if instance:
+            tags["instance"] = instance
+        if tags:
+            tags = [f"{k}:{v}" for k, v in tags.items()]
+        self.stats.gauge(
+            self._get_key(key), value, sample_rate=sample_rate, tags=tags, host=self.host
+        )
@@ -13,8 +13,8 @@ class DogStatsdMetricsBackend(MetricsBackend):
         super().__init__(prefix=prefix)
 
     def incr(self, key, instance=None, tags=None, amount=1, sample_rate=1):
-        if tags is None:
-            tags = {}
+        # The tags may be shared with other metrics, so they are not modified.
+        tags = dict(tags or ())
         if self.tags:
             tags.update(self.tags)
         if instance:
@@ -24,8 +24,7 @@ class DogStatsdMetricsBackend(MetricsBackend):
         statsd.increment(self._get_key(key), amount, sample_rate=sample_rate, tags=tags)
 
     def timing(self, key, value, instance=None, tags=None, sample_rate=1):
-        if tags is None:
-            tags = {}
+        tags = dict(tags or ())
         if self.tags:
             tags.update(self.tags)
         if instance:
@@ -33,3 +32,13 @@ class DogStatsdMetricsBackend(MetricsBackend):
         if tags:
             tags = [f"{k}:{v}" for k, v in tags.items()]
         statsd.timing(self._get_key(key), value, sample_rate=sample_rate, tags=tags)
+
+    def gauge(self, key, value, instance=None, tags=None, sample_rate=1):
+        tags = dict(tags or ())
+        if self.tags:
+            tags.update(self.tags)
+        if instance:
+            tags["instance"] = instance
+        if tags:
+            tags = [f"{k}:{v}" for k, v in tags.items()]
+        statsd.gauge(self._get_key(key), value, sample_rate=sample_rate, tags=tags)
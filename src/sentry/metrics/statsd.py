@@ -20,3 +20,16 @@ class StatsdMetricsBackend(MetricsBackend):
 
     def timing(self, key, value, instance=None, tags=None, sample_rate=1):
         self.client.timing(self._full_key(self._get_key(key)), value, sample_rate)
+
+    def gauge(self, key, value, instance=None, tags=None, sample_rate=1):
+        self.client.gauge(self._full_key(self._get_key(key)), value, sample_rate)
+
+    def flush_buffer(self, counters, timings):
+        # The pipeline packs as many metrics into each packet as fit.
+        with self.client.pipeline() as pipe:
+            for key, instance, tags, amount in counters + self._get_unsampled_counters(timings):
+                pipe.incr(self._full_key(self._get_key(key)), amount)
+            for key, instance, tags, values, _ in timings:
+                stat = self._full_key(self._get_key(key))
+                for value in values:
+                    pipe.timing(stat, value)
@@ -87,6 +87,10 @@ register(
 
 register("api.rate-limit.org-create", default=5, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
 
+# Number of threads shared by serializers to load attributes concurrently. A
+# value of 0 loads them one after another in the calling thread.
+register("api.serializer-loader.workers", default=0, flags=FLAG_PRIORITIZE_DISK)
+
 # Beacon
 register("beacon.anonymous", type=Bool, flags=FLAG_REQUIRED)
 
@@ -210,6 +214,19 @@ register("snuba.track-outcomes-sample-rate", default=0.0)
 register("snuba.snql.referrer-rate", default=0.0)
 register("snuba.snql.snql_only", default=0.0)
 
+# Referrers (or referrer prefixes ending with a period) whose identical
+# concurrent queries are only sent to snuba once, mapped to how many seconds
+# the other callers wait for the result before running the query themselves
+register("snuba.query-coalescing.referrers", default={}, flags=FLAG_PRIORITIZE_DISK)
+
+# Referrers (or referrer prefixes ending with a period) mapped to the priority
+# class ("interactive" or "background") and concurrency budget of their
+# queries within a process
+register("snuba.query-scheduler.referrers", default={}, flags=FLAG_PRIORITIZE_DISK)
+# Halve the number of concurrent snuba queries of a process when snuba reports
+# that it's overloaded, and slowly grow it back once queries succeed again
+register("snuba.query-scheduler.adaptive-concurrency", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
 register("snuba.tagstore.cache-tagkeys-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 
@@ -347,5 +364,54 @@ register("processing.release-archive-min-files", default=10)
 # Try to read release artifacts from zip archives
 register("processing.use-release-archives-sample-rate", default=0.0)
 
+# Resolve child relations of deletions for whole chunks of parents at once and
+# hand off nodestore/filestore cleanups to async tasks
+register("deletions.bulk-relations", default=False, flags=FLAG_PRIORITIZE_DISK)
+
+# Number of ready digest timelines handed to a single delivery task. A value of
+# 1 schedules one ``deliver_digest`` task per timeline.
+register("digests.delivery-batch-size", default=1, flags=FLAG_PRIORITIZE_DISK)
+
+# Number of time slices that the events of a group are split into when
+# unmerging, each of which is migrated by a separate task. A value of 1
+# migrates the events in a single sequence of batches.
+register("unmerge.parallel-slices", default=1, flags=FLAG_PRIORITIZE_DISK)
+
+# Move the related rows of merged groups with a fixed number of set-based
+# statements per model, rather than one object at a time
+register("merge.bulk-objects", default=False, flags=FLAG_PRIORITIZE_DISK)
+
+# Process classes sampled by the sampling profiler, e.g. "web",
+# "ingest-consumer", "post-process-forwarder", "worker" or "worker:<queue>"
+register(
+    "profiling.sampler.targets",
+    type=Sequence,
+    default=[],
+    flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK,
+)
+
+# Seconds between two samples of the sampling profiler
+register("profiling.sampler.interval", default=0.01, flags=FLAG_PRIORITIZE_DISK)
+
+# Seconds between two writes of collapsed stacks to disk
+register("profiling.sampler.flush-interval", default=60, flags=FLAG_PRIORITIZE_DISK)
+
+# Directory collapsed stacks are written to. Defaults to a directory in the
+# system's temporary directory.
+register(
+    "profiling.sampler.output-dir",
+    type=String,
+    default="",
+    flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK,
+)
+
+# Number of frame processing results kept in an in-process LRU cache shared by
+# all events. 0 disables the in-process cache.
+register("processing.frame-cache.local-size", default=0, flags=FLAG_PRIORITIZE_DISK)
+
+# Share frame processing results between processes through the default cache.
+# Off by default, since a lookup costs a round trip to the cache for every event.
+register("processing.frame-cache.shared", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # All Relay options (statically authenticated Relays can be registered here)
 register("relay.static_auth", default={}, flags=FLAG_NOSTORE)
@@ -205,10 +205,13 @@ class Quota(Service):
         "get_organization_quota",
         "get_project_quota",
         "is_rate_limited",
+        "is_rate_limited_many",
         "validate",
         "refund",
+        "refund_many",
         "get_event_retention",
         "get_quotas",
+        "get_quotas_version",
     )
 
     def __init__(self, **options):
@@ -228,6 +231,19 @@ class Quota(Service):
         """
         return []
 
+    def get_quotas_version(self, project, key=None, keys=None):
+        """
+        Returns a value that changes whenever the quotas returned by
+        ``get_quotas`` for the same arguments change for reasons other than a
+        change to the project's or organization's options. Returns ``None``
+        if the quotas can't be cached.
+
+        :param project: The project instance that is used to determine quotas.
+        :param key:     A project project key to obtain quotas for.
+        :param keys:    Similar to ``key``, except for multiple keys.
+        """
+        return None
+
     def is_rate_limited(self, project, key=None):
         """
         Checks whether any of the quotas in effect for the given project and
@@ -282,6 +298,46 @@ class Quota(Service):
                           attachment in bytes.
         """
 
+    def is_rate_limited_many(self, items, timestamp=None):
+        """
+        Checks and consumes quotas for many items at once, see
+        ``is_rate_limited``. Backends may use this to check the quotas of all
+        items with fewer round trips than checking them one by one.
+
+        Each item is checked and counted atomically against the quotas of its
+        project and key that apply to its data category. Items are processed
+        in order, so later items observe the consumption of earlier items that
+        share a quota.
+
+        The return value is a list of ``RateLimit`` in the same order as
+        ``items``.
+
+        :param items:     A sequence of ``(project, key, category, quantity)``
+                          tuples. ``key`` may be ``None`` to only check project
+                          and organization quotas. ``category`` defaults to
+                          ``DataCategory.ERROR`` and ``quantity`` to ``1``.
+        :param timestamp: The timestamp at which data was ingested.
+
+        The default implementation checks every item with ``is_rate_limited``,
+        which only considers the project and key. It ignores the category,
+        quantity and timestamp. Backends that enforce quotas per category
+        should override it.
+        """
+        return [self.is_rate_limited(project, key=key) for project, key, _, _ in items]
+
+    def refund_many(self, items, timestamp=None):
+        """
+        Refunds previously consumed quota for many items at once, see
+        ``refund``.
+
+        :param items:     A sequence of ``(project, key, category, quantity)``
+                          tuples with the same meaning as the arguments of
+                          ``refund``.
+        :param timestamp: The timestamp at which data was ingested.
+        """
+        for project, key, category, quantity in items:
+            self.refund(project, key=key, timestamp=timestamp, category=category, quantity=quantity)
+
     def get_event_retention(self, organization):
         """
         Returns the retention for events in the given organization in days.
@@ -303,20 +359,23 @@ class Quota(Service):
 
         return _limit_from_settings(quota or parent_quota)
 
-    def get_key_quota(self, key):
+    def _has_rate_limits(self, project):
         from sentry import features
 
         # XXX(epurkhiser): Avoid excessive feature manager checks (which can be
         # expensive depending on feature handlers) for project rate limits.
         # This happens on /store.
-        cache_key = f"project:{key.project.id}:features:rate-limits"
+        cache_key = f"project:{project.id}:features:rate-limits"
 
         has_rate_limits = cache.get(cache_key)
         if has_rate_limits is None:
-            has_rate_limits = features.has("projects:rate-limits", key.project)
+            has_rate_limits = features.has("projects:rate-limits", project)
             cache.set(cache_key, has_rate_limits, 600)
 
-        if not has_rate_limits:
+        return has_rate_limits
+
+    def get_key_quota(self, key):
+        if not self._has_rate_limits(key.project):
             return (None, None)
 
         limit, window = key.rate_limit
@@ -1,9 +1,10 @@
-import functools
+from collections import defaultdict
 from time import time
 
+from sentry import options
 from sentry.constants import DataCategory
 from sentry.quotas.base import NotRateLimited, Quota, QuotaConfig, QuotaScope, RateLimited
-from sentry.utils.compat import map, zip
+from sentry.utils.compat import zip
 from sentry.utils.redis import (
     get_dynamic_cluster_from_options,
     load_script,
@@ -11,6 +12,7 @@ from sentry.utils.redis import (
 )
 
 is_rate_limited = load_script("quotas/is_rate_limited.lua")
+is_rate_limited_many = load_script("quotas/is_rate_limited_many.lua")
 
 
 class RedisQuota(Quota):
@@ -55,6 +57,18 @@ class RedisQuota(Quota):
         interval = quota.window
         return f"{self.namespace}:{local_key}:{int((timestamp - shift) // interval)}"
 
+    def get_quotas_version(self, project, key=None, keys=None):
+        if key and not keys:
+            keys = [key]
+
+        # Besides the organization's options, the quotas depend on the system
+        # rate limit and the rate limits of the keys.
+        return (
+            options.get("system.rate-limit"),
+            bool(keys) and self._has_rate_limits(project),
+            [(key.id, key.rate_limit) for key in keys or ()],
+        )
+
     def get_quotas(self, project, key=None, keys=None):
         if key:
             key.project = project
@@ -115,33 +129,30 @@ class RedisQuota(Quota):
         if timestamp is None:
             timestamp = time()
 
-        def get_usage_for_quota(client, quota):
+        keys = []
+        for quota in quotas:
             if not quota.should_track:
-                return (None, None)
+                continue
 
             key = self.__get_redis_key(
                 quota, timestamp, organization_id % quota.window, organization_id
             )
-            refund_key = self.get_refunded_quota_key(key)
+            keys.extend((key, self.get_refunded_quota_key(key)))
 
-            return (client.get(key), client.get(refund_key))
+        # All keys of an organization are routed to the same client, so they
+        # can be fetched with a single command.
+        values = iter(self.__get_redis_client(str(organization_id)).mget(keys) if keys else ())
 
-        def get_value_for_result(result, refund_result):
-            if result is None:
-                return None
-
-            return int(result.value or 0) - int(refund_result.value or 0)
+        results = []
+        for quota in quotas:
+            if not quota.should_track:
+                results.append(None)
+                continue
 
-        if self.is_redis_cluster:
-            results = map(functools.partial(get_usage_for_quota, self.cluster), quotas)
-        else:
-            with self.cluster.fanout() as client:
-                results = map(
-                    functools.partial(get_usage_for_quota, client.target_key(str(organization_id))),
-                    quotas,
-                )
+            value, refunded = next(values), next(values)
+            results.append(int(value or 0) - int(refunded or 0))
 
-        return [get_value_for_result(*r) for r in results]
+        return results
 
     def get_refunded_quota_key(self, key):
         return f"r:{key}"
@@ -170,7 +181,38 @@ class RedisQuota(Quota):
 
         client = self.__get_redis_client(str(project.organization_id))
         pipe = client.pipeline()
+        self.__add_refund_to_pipeline(pipe, project, quotas, timestamp, quantity)
+        pipe.execute()
+
+    def refund_many(self, items, timestamp=None):
+        if timestamp is None:
+            timestamp = time()
 
+        refunds = []
+        for project, key, category, quantity in items:
+            if category is None:
+                category = DataCategory.ERROR
+
+            if quantity is None:
+                quantity = 1
+
+            quotas = [
+                quota
+                for quota in self.get_quotas(project, key=key)
+                if quota.should_track and category in quota.categories
+            ]
+            if quotas:
+                refunds.append((project, quotas, quantity))
+
+        for client, batch in self.__group_by_client(
+            refunds, lambda refund: refund[0].organization_id
+        ):
+            pipe = client.pipeline()
+            for project, quotas, quantity in batch:
+                self.__add_refund_to_pipeline(pipe, project, quotas, timestamp, quantity)
+            pipe.execute()
+
+    def __add_refund_to_pipeline(self, pipe, project, quotas, timestamp, quantity):
         for quota in quotas:
             shift = project.organization_id % quota.window
             # kind of arbitrary, but seems like we don't want this to expire til we're
@@ -182,7 +224,25 @@ class RedisQuota(Quota):
             pipe.incr(return_key, quantity)
             pipe.expireat(return_key, int(expiry))
 
-        pipe.execute()
+    def __group_by_client(self, items, get_organization_id):
+        """
+        Partitions ``items`` so that each partition can be sent with a single
+        command (or script call) to the returned client.
+
+        With Redis Cluster, all keys of an organization share a hash slot, so
+        items are grouped by organization. Otherwise, items are grouped by the
+        host their organization is routed to.
+        """
+        groups = defaultdict(list)
+        if self.is_redis_cluster:
+            for item in items:
+                groups[get_organization_id(item)].append(item)
+            return [(self.cluster, batch) for batch in groups.values()]
+
+        router = self.cluster.get_router()
+        for item in items:
+            groups[router.get_host_for_key(str(get_organization_id(item)))].append(item)
+        return [(self.cluster.get_local_client(host), batch) for host, batch in groups.items()]
 
     def get_next_period_start(self, interval, shift, timestamp):
         """Return the timestamp when the next rate limit period begins for an interval."""
@@ -211,8 +271,65 @@ class RedisQuota(Quota):
         if not quotas:
             return NotRateLimited()
 
-        keys = []
-        args = []
+        zero_quota = self.__get_zero_quota(quotas)
+        if zero_quota is not None:
+            return RateLimited(retry_after=None, reason_code=zero_quota.reason_code)
+
+        keys, args = self.__get_script_arguments(project, quotas, timestamp)
+        if not keys or not args:
+            return NotRateLimited()
+
+        client = self.__get_redis_client(str(project.organization_id))
+        rejections = is_rate_limited(client, keys, args)
+
+        return self.__get_rate_limit(project, quotas, rejections, timestamp)
+
+    def is_rate_limited_many(self, items, timestamp=None):
+        if timestamp is None:
+            timestamp = time()
+
+        results = [None] * len(items)
+        checks = []
+        for index, (project, key, category, quantity) in enumerate(items):
+            if category is None:
+                category = DataCategory.ERROR
+
+            if quantity is None:
+                quantity = 1
+
+            quotas = [
+                q
+                for q in self.get_quotas(project, key=key)
+                if not q.categories or category in q.categories
+            ]
+
+            if not quotas:
+                results[index] = NotRateLimited()
+                continue
+
+            zero_quota = self.__get_zero_quota(quotas)
+            if zero_quota is not None:
+                results[index] = RateLimited(retry_after=None, reason_code=zero_quota.reason_code)
+                continue
+
+            checks.append((index, project, quotas, quantity))
+
+        for client, batch in self.__group_by_client(checks, lambda check: check[1].organization_id):
+            keys = []
+            args = []
+            for _, project, quotas, quantity in batch:
+                item_keys, item_args = self.__get_script_arguments(project, quotas, timestamp)
+                keys.extend(item_keys)
+                args.extend((len(quotas), quantity))
+                args.extend(item_args)
+
+            response = is_rate_limited_many(client, keys, args)
+            for (index, project, quotas, _), rejections in zip(batch, response):
+                results[index] = self.__get_rate_limit(project, quotas, rejections, timestamp)
+
+        return results
+
+    def __get_zero_quota(self, quotas):
         for quota in quotas:
             if quota.limit == 0:
                 # A zero-sized quota is the absolute worst-case. Do not call
@@ -221,8 +338,12 @@ class RedisQuota(Quota):
                 # as well).
                 assert quota.window is None
                 assert not quota.should_track
-                return RateLimited(retry_after=None, reason_code=quota.reason_code)
+                return quota
 
+    def __get_script_arguments(self, project, quotas, timestamp):
+        keys = []
+        args = []
+        for quota in quotas:
             assert quota.should_track
 
             shift = project.organization_id % quota.window
@@ -235,12 +356,9 @@ class RedisQuota(Quota):
             lua_quota = quota.limit if quota.limit is not None else -1
             args.extend((lua_quota, int(expiry)))
 
-        if not keys or not args:
-            return NotRateLimited()
-
-        client = self.__get_redis_client(str(project.organization_id))
-        rejections = is_rate_limited(client, keys, args)
+        return keys, args
 
+    def __get_rate_limit(self, project, quotas, rejections, timestamp):
         if not any(rejections):
             return NotRateLimited()
 
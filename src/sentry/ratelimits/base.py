@@ -2,9 +2,21 @@ from sentry.utils.services import Service
 
 
 class RateLimiter(Service):
-    __all__ = ("is_limited", "validate")
+    __all__ = ("is_limited", "is_limited_many", "validate")
 
     window = 60
 
     def is_limited(self, key, limit, project=None, window=None):
         return False
+
+    def is_limited_many(self, requests):
+        """
+        Checks many rate limits at once. ``requests`` is a sequence of
+        ``(key, limit, project, window)`` tuples with the same meaning as the
+        arguments of ``is_limited``, and the result is a list of booleans in
+        the same order.
+        """
+        return [
+            self.is_limited(key, limit, project=project, window=window)
+            for key, limit, project, window in requests
+        ]
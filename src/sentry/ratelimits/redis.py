@@ -1,3 +1,5 @@
+from collections import OrderedDict, defaultdict
+from threading import Lock
 from time import time
 
 from redis.exceptions import RedisError
@@ -5,8 +7,47 @@ from sentry_sdk import capture_exception
 
 from sentry.exceptions import InvalidConfiguration
 from sentry.ratelimits.base import RateLimiter
+from sentry.utils import metrics
 from sentry.utils.hashlib import md5_text
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
+
+ratelimits = load_script("ratelimits/ratelimits.lua")
+
+FIXED_WINDOW = "fixed_window"
+SLIDING_WINDOW = "sliding_window"
+GCRA = "gcra"
+
+STRATEGIES = frozenset((FIXED_WINDOW, SLIDING_WINDOW, GCRA))
+
+
+class LocalLimitCache:
+    """
+    A bounded, process-local record of keys that were found to be rate limited
+    and the time until which they will remain limited. This allows rejecting
+    requests for these keys without a round trip to Redis.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.__entries = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key, timestamp):
+        with self.__lock:
+            limited_until = self.__entries.get(key)
+            if limited_until is None:
+                return False
+            if limited_until <= timestamp:
+                del self.__entries[key]
+                return False
+            return True
+
+    def set(self, key, limited_until):
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__entries[key] = limited_until
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
 
 
 class RedisRateLimiter(RateLimiter):
@@ -15,6 +56,21 @@ class RedisRateLimiter(RateLimiter):
     def __init__(self, **options):
         self.cluster, options = get_cluster_from_options("SENTRY_RATELIMITER_OPTIONS", options)
 
+        # The ``strategy`` option selects the algorithm used to count
+        # requests. ``fixed_window`` counts requests in consecutive windows,
+        # ``sliding_window`` weighs in the count of the previous window to
+        # avoid bursts at window edges, and ``gcra`` is a token bucket that
+        # refills continuously.
+        self.strategy = options.pop("strategy", FIXED_WINDOW)
+        if self.strategy not in STRATEGIES:
+            raise InvalidConfiguration(f"Unknown rate limiting strategy: {self.strategy!r}")
+
+        # The ``local_cache_size`` option enables a process-local cache of
+        # limited keys of (at most) the given size, which is consulted before
+        # contacting Redis.
+        local_cache_size = options.pop("local_cache_size", 0)
+        self.local_cache = LocalLimitCache(local_cache_size) if local_cache_size else None
+
     def validate(self):
         try:
             with self.cluster.all() as client:
@@ -22,25 +78,95 @@ class RedisRateLimiter(RateLimiter):
         except Exception as e:
             raise InvalidConfiguration(str(e))
 
-    def is_limited(self, key, limit, project=None, window=None):
-        if window is None:
-            window = self.window
-
+    def _get_key(self, key, project=None):
         key_hex = md5_text(key).hexdigest()
-        bucket = int(time() / window)
 
         if project:
-            key = f"rl:{key_hex}:{project.id}:{bucket}"
+            return f"rl:{key_hex}:{project.id}"
         else:
-            key = f"rl:{key_hex}:{bucket}"
+            return f"rl:{key_hex}"
+
+    def is_limited(self, key, limit, project=None, window=None):
+        return self.is_limited_many([(key, limit, project, window)])[0]
+
+    def is_limited_many(self, requests):
+        timestamp = time()
+
+        results = [False] * len(requests)
+        pending = []
+        for index, (key, limit, project, window) in enumerate(requests):
+            if window is None:
+                window = self.window
+
+            key = self._get_key(key, project)
+            if self.local_cache is not None and self.local_cache.get(
+                (key, limit, window), timestamp
+            ):
+                metrics.incr("ratelimits.local_cache.hit", tags={"strategy": self.strategy})
+                results[index] = True
+                continue
+
+            pending.append((index, key, limit, window))
+
+        if not pending:
+            return results
 
         try:
-            with self.cluster.map() as client:
-                result = client.incr(key)
-                client.expire(key, window)
-            return result.value > limit
+            if self.strategy == FIXED_WINDOW:
+                responses = self.__check_fixed_window(pending, timestamp)
+            else:
+                responses = self.__check_script(pending, timestamp)
         except RedisError as e:
             # We don't want rate limited endpoints to fail when ratelimits
             # can't be updated. We do want to know when that happens.
             capture_exception(e)
-            return False
+            return results
+
+        for (index, key, limit, window), (limited, retry_after) in zip(pending, responses):
+            results[index] = limited
+            if limited and self.local_cache is not None and retry_after > 0:
+                self.local_cache.set((key, limit, window), timestamp + retry_after)
+
+        return results
+
+    def __check_fixed_window(self, pending, timestamp):
+        # Bucket keys are routed by their base key, like the keys used by the
+        # scripted strategies, so that all strategies share the same hosts.
+        with self.cluster.fanout() as client:
+            promises = []
+            for _, key, _, window in pending:
+                bucket_key = f"{key}:{int(timestamp / window)}"
+                target = client.target_key(key)
+                promises.append(target.incr(bucket_key))
+                target.expire(bucket_key, window)
+
+        return [
+            (result.value > limit, (int(timestamp / window) + 1) * window - timestamp)
+            for (_, _, limit, window), result in zip(pending, promises)
+        ]
+
+    def __check_script(self, pending, timestamp):
+        router = self.cluster.get_router()
+        hosts = defaultdict(list)
+        for position, (_, key, _, _) in enumerate(pending):
+            hosts[router.get_host_for_key(key)].append(position)
+
+        responses = [None] * len(pending)
+        for host, positions in hosts.items():
+            keys = []
+            args = [self.strategy.upper(), timestamp]
+            for position in positions:
+                _, key, limit, window = pending[position]
+                if self.strategy == SLIDING_WINDOW:
+                    # The counters of the current and the previous fixed window.
+                    bucket = int(timestamp / window)
+                    keys.extend((f"{key}:{bucket}", f"{key}:{bucket - 1}"))
+                else:
+                    keys.append(key)
+                args.extend((limit, window))
+
+            response = ratelimits(self.cluster.get_local_client(host), keys, args)
+            for position, (limited, retry_after) in zip(positions, response):
+                responses[position] = (bool(limited), float(retry_after))
+
+        return responses
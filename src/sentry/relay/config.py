@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import List
+from typing import List, Mapping, Sequence
 
 from pytz import utc
 from sentry_sdk import Hub
@@ -16,8 +16,11 @@ from sentry.ingest.inbound_filters import (
     get_filter_key,
 )
 from sentry.interfaces.security import DEFAULT_DISALLOWED_SOURCES
-from sentry.models import Project, ProjectKeyStatus
+from sentry.models import OrganizationOption, Project, ProjectKeyStatus, ProjectOption
 from sentry.relay.utils import to_camel_case_name
+from sentry.utils import metrics
+from sentry.utils.cache import cache
+from sentry.utils.hashlib import md5_text
 from sentry.utils.http import get_origins
 from sentry.utils.sdk import configure_scope
 
@@ -27,22 +30,87 @@ EXPOSABLE_FEATURES = [
 ]
 
 
-def get_exposed_features(project: Project) -> List[str]:
+#: These features are checked while building the project config
+CONFIG_FEATURES = EXPOSABLE_FEATURES + [
+    "organizations:filters-and-sampling",
+    "organizations:performance-ops-breakdown",
+    "projects:custom-inbound-filters",
+]
+
+#: Bump this to invalidate all cached config sections when the way they are
+#: computed changes
+SECTION_CACHE_VERSION = 1
+SECTION_CACHE_TTL = 60 * 60
+
+
+def get_features(project: Project, feature_names: Sequence[str]) -> Mapping[str, bool]:
+    """
+    Returns whether each of the organization and project features is enabled
+    for the project. Features are resolved with ``features.batch_has`` where
+    the feature handlers support it, and individually otherwise.
+    """
+    organization = project.organization
+    org_features = [f for f in feature_names if f.startswith("organizations:")]
+    project_features = [f for f in feature_names if f.startswith("projects:")]
+    if len(org_features) + len(project_features) != len(feature_names):
+        raise RuntimeError("Features must start with 'organizations:' or 'projects:'")
+
+    result = {}
+    if org_features:
+        batch_features = features.batch_has(org_features, organization=organization)
+        if batch_features:
+            result.update(batch_features.get(f"organization:{organization.id}", {}))
+    if project_features:
+        batch_features = features.batch_has(
+            project_features, projects=[project], organization=organization
+        )
+        if batch_features:
+            result.update(batch_features.get(f"project:{project.id}", {}))
+
+    for feature in feature_names:
+        if feature not in result:
+            if feature.startswith("organizations:"):
+                result[feature] = features.has(feature, organization)
+            else:
+                result[feature] = features.has(feature, project)
 
-    active_features = []
-    for feature in EXPOSABLE_FEATURES:
-        if feature.startswith("organizations:"):
-            if features.has(feature, project.organization):
-                active_features.append(feature)
+    return result
 
-        elif feature.startswith("projects:"):
-            if features.has(feature, project):
-                active_features.append(feature)
 
-        else:
-            raise RuntimeError("EXPOSABLE_FEATURES must start with 'organizations:' or 'projects:'")
+def get_exposed_features(project: Project, enabled_features=None) -> List[str]:
+    if enabled_features is None:
+        enabled_features = get_features(project, EXPOSABLE_FEATURES)
 
-    return active_features
+    return [feature for feature in EXPOSABLE_FEATURES if enabled_features[feature]]
+
+
+def get_options_version(values):
+    """
+    Returns a version of a mapping of options that changes whenever any of
+    the options does.
+    """
+    return md5_text(repr(sorted(values.items()))).hexdigest()
+
+
+def get_cached_section(name, project, inputs, compute):
+    """
+    Returns a section of the project config, which is only computed if it
+    isn't cached for the same inputs yet. The inputs have to include every
+    version the section depends on, since the section isn't invalidated
+    otherwise.
+    """
+    cache_key = "relay-config-section:{}:{}:{}".format(
+        name, project.id, md5_text(repr((SECTION_CACHE_VERSION, inputs))).hexdigest()
+    )
+    section = cache.get(cache_key)
+    if section is not None:
+        metrics.incr("relay.config.section", tags={"section": name, "cached": True})
+        return section
+
+    metrics.incr("relay.config.section", tags={"section": name, "cached": False})
+    section = compute()
+    cache.set(cache_key, section, SECTION_CACHE_TTL)
+    return section
 
 
 def get_project_key_config(project_key):
@@ -70,7 +138,10 @@ def get_public_key_configs(project, full_config, project_keys=None):
     return public_keys
 
 
-def get_filter_settings(project):
+def get_filter_settings(project, enabled_features=None):
+    if enabled_features is None:
+        enabled_features = get_features(project, ["projects:custom-inbound-filters"])
+
     filter_settings = {}
 
     for flt in get_all_filter_specs():
@@ -78,7 +149,7 @@ def get_filter_settings(project):
         settings = _load_filter_settings(flt, project)
         filter_settings[filter_id] = settings
 
-    if features.has("projects:custom-inbound-filters", project):
+    if enabled_features["projects:custom-inbound-filters"]:
         invalid_releases = project.get_option(f"sentry:{FilterTypes.RELEASES}")
         if invalid_releases:
             filter_settings["releases"] = {"releases": invalid_releases}
@@ -105,6 +176,31 @@ def get_quotas(project, keys=None):
     return [quota.to_json() for quota in quotas.get_quotas(project, keys=keys)]
 
 
+def get_cached_filter_settings(project, project_options_version, enabled_features):
+    return get_cached_section(
+        "filterSettings",
+        project,
+        (project_options_version, enabled_features["projects:custom-inbound-filters"]),
+        lambda: get_filter_settings(project, enabled_features),
+    )
+
+
+def get_cached_quotas(project, project_options_version, keys=None):
+    quotas_version = quotas.get_quotas_version(project, keys=keys)
+    if quotas_version is None:
+        return get_quotas(project, keys=keys)
+
+    organization_options_version = get_options_version(
+        OrganizationOption.objects.get_all_values(project.organization_id)
+    )
+    return get_cached_section(
+        "quotas",
+        project,
+        (project_options_version, organization_options_version, quotas_version),
+        lambda: get_quotas(project, keys=keys),
+    )
+
+
 def get_project_config(project, full_config=True, project_keys=None):
     """
     Constructs the ProjectConfig information.
@@ -130,6 +226,9 @@ def get_project_config(project, full_config=True, project_keys=None):
 
     public_keys = get_public_key_configs(project, full_config, project_keys=project_keys)
 
+    with Hub.current.start_span(op="get_features"):
+        enabled_features = get_features(project, CONFIG_FEATURES)
+
     with Hub.current.start_span(op="get_public_config"):
         now = datetime.utcnow().replace(tzinfo=utc)
         cfg = {
@@ -148,16 +247,12 @@ def get_project_config(project, full_config=True, project_keys=None):
                 ],
                 "piiConfig": get_pii_config(project),
                 "datascrubbingSettings": get_datascrubbing_settings(project),
-                "features": get_exposed_features(project),
+                "features": get_exposed_features(project, enabled_features),
             },
             "organizationId": project.organization_id,
             "projectId": project.id,  # XXX: Unused by Relay, required by Python store
         }
-    allow_dynamic_sampling = features.has(
-        "organizations:filters-and-sampling",
-        project.organization,
-    )
-    if allow_dynamic_sampling:
+    if enabled_features["organizations:filters-and-sampling"]:
         dynamic_sampling = project.get_option("sentry:dynamic_sampling")
         if dynamic_sampling is not None:
             cfg["config"]["dynamicSampling"] = dynamic_sampling
@@ -166,16 +261,25 @@ def get_project_config(project, full_config=True, project_keys=None):
         # This is all we need for external Relay processors
         return ProjectConfig(project, **cfg)
 
-    if features.has("organizations:performance-ops-breakdown", project.organization):
+    # Sections that are expensive to compute are cached for the versions of
+    # the options they depend on, so that rebuilding the config only
+    # recomputes the sections whose inputs have changed.
+    project_options_version = get_options_version(ProjectOption.objects.get_all_values(project))
+
+    if enabled_features["organizations:performance-ops-breakdown"]:
         cfg["config"]["breakdowns"] = project.get_option("sentry:breakdowns")
     with Hub.current.start_span(op="get_filter_settings"):
-        cfg["config"]["filterSettings"] = get_filter_settings(project)
+        cfg["config"]["filterSettings"] = get_cached_filter_settings(
+            project, project_options_version, enabled_features
+        )
     with Hub.current.start_span(op="get_grouping_config_dict_for_project"):
         cfg["config"]["groupingConfig"] = get_grouping_config_dict_for_project(project)
     with Hub.current.start_span(op="get_event_retention"):
         cfg["config"]["eventRetention"] = quotas.get_event_retention(project.organization)
     with Hub.current.start_span(op="get_all_quotas"):
-        cfg["config"]["quotas"] = get_quotas(project, keys=project_keys)
+        cfg["config"]["quotas"] = get_cached_quotas(
+            project, project_options_version, keys=project_keys
+        )
 
     return ProjectConfig(project, **cfg)
 
@@ -148,7 +148,17 @@ def run_worker(**options):
     for o in "without_gossip", "without_mingle", "without_heartbeat":
         options.pop(o, None)
 
+    from celery.signals import worker_process_init
+
     from sentry.celery import app
+    from sentry.utils.sampling_profiler import start_sampling_profiler
+
+    # Pool processes are forked from the main process, so they need to start
+    # their own profilers.
+    process_classes = ["worker"] + [f"worker:{queue}" for queue in sorted(options["queues"] or ())]
+    worker_process_init.connect(
+        lambda **kwargs: start_sampling_profiler(*process_classes), weak=False
+    )
 
     with managed_bgtasks(role="worker"):
         worker = app.Worker(
@@ -324,6 +334,9 @@ def cron(**options):
 def post_process_forwarder(**options):
     from sentry import eventstream
     from sentry.eventstream.base import ForwarderNotRequired
+    from sentry.utils.sampling_profiler import start_sampling_profiler
+
+    start_sampling_profiler("post-process-forwarder")
 
     try:
         eventstream.run_post_process_forwarder(
@@ -482,6 +495,7 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
     from sentry.ingest.ingest_consumer import get_ingest_consumer
     from sentry.utils import metrics
+    from sentry.utils.sampling_profiler import start_sampling_profiler
 
     if all_consumer_types:
         if consumer_types:
@@ -500,6 +514,8 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     else:
         executor = None
 
+    start_sampling_profiler("ingest-consumer")
+
     with metrics.global_tags(
         ingest_consumer_types=",".join(sorted(consumer_types)), _all_threads=True
     ):
@@ -84,6 +84,18 @@ local function variadic_argument_parser(argument_parser)
     end
 end
 
+local function counted_argument_parser(argument_parser)
+    return function (cursor, arguments)
+        local results = {}
+        local count = tonumber(arguments[cursor])
+        cursor = cursor + 1
+        for i = 1, count do
+            cursor, results[i] = argument_parser(cursor, arguments)
+        end
+        return cursor, results
+    end
+end
+
 local function multiple_argument_parser(...)
     local parsers = {...}
     return function (cursor, arguments)
@@ -266,9 +278,13 @@ local function add_record_to_timeline(configuration, timeline_id, record_id, val
     return ready
 end
 
+local function is_timeline_ready(configuration, timeline_id)
+    return redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) ~= false
+end
+
 local function digest_timeline(configuration, timeline_id, timeline_capacity)
     -- Check to ensure that the timeline is in the correct state.
-    if redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) == false then
+    if not is_timeline_ready(configuration, timeline_id) then
         error('err(invalid_state): timeline is not in the ready state, cannot be digested')
     end
 
@@ -338,6 +354,21 @@ local function close_digest(configuration, timeline_id, delay_minimum, record_id
     end
 end
 
+local function digest_timelines(configuration, timeline_ids, timeline_capacity)
+    -- Unlike ``digest_timeline``, a timeline that is not in the ready state
+    -- does not abort the entire batch, it is instead reported back to the
+    -- caller with an empty set of records.
+    local results = {}
+    for i, timeline_id in ipairs(timeline_ids) do
+        if is_timeline_ready(configuration, timeline_id) then
+            results[i] = {timeline_id, 1, digest_timeline(configuration, timeline_id, timeline_capacity)}
+        else
+            results[i] = {timeline_id, 0, {}}
+        end
+    end
+    return results
+end
+
 local function delete_timeline(configuration, timeline_id)
     truncate_timeline(configuration, timeline_id, 0)
     truncate_digest(configuration, timeline_id, 0)
@@ -424,6 +455,41 @@ local commands = {
             arguments.truncation_chance
         )
     end,
+    ADD_MANY = function (cursor, arguments)
+        local cursor, configuration, options, records = multiple_argument_parser(
+            configuration_argument_parser,
+            object_argument_parser({
+                {"delay_increment", argument_parser(tonumber)},
+                {"delay_maximum", argument_parser(tonumber)},
+                {"timeline_capacity", argument_parser(tonumber)},
+                {"truncation_chance", argument_parser(tonumber)},
+            }),
+            variadic_argument_parser(object_argument_parser({
+                {"timeline_id", argument_parser()},
+                {"record_id", argument_parser()},
+                {"value", argument_parser()},
+                {"timestamp", argument_parser(tonumber)},
+            }))
+        )(cursor, arguments)
+        -- Booleans can't be used here since Redis converts ``false`` into a
+        -- null reply, so readiness is reported as an integer.
+        local results = {}
+        for i, record in ipairs(records) do
+            local ready = add_record_to_timeline(
+                configuration,
+                record.timeline_id,
+                record.record_id,
+                record.value,
+                record.timestamp,
+                options.delay_increment,
+                options.delay_maximum,
+                options.timeline_capacity,
+                options.truncation_chance
+            )
+            results[i] = ready and 1 or 0
+        end
+        return results
+    end,
     DELETE = function (cursor, arguments)
         local cursor, configuration, timeline_id = multiple_argument_parser(
             configuration_argument_parser,
@@ -448,6 +514,27 @@ local commands = {
         )(cursor, arguments)
         return close_digest(configuration, timeline_id, delay_minimum, record_ids)
     end,
+    DIGEST_OPEN_MANY = function (cursor, arguments)
+        local cursor, configuration, timeline_capacity, timeline_ids = multiple_argument_parser(
+            configuration_argument_parser,
+            argument_parser(tonumber),
+            variadic_argument_parser(argument_parser())
+        )(cursor, arguments)
+        return digest_timelines(configuration, timeline_ids, timeline_capacity)
+    end,
+    DIGEST_CLOSE_MANY = function (cursor, arguments)
+        local cursor, configuration, digests = multiple_argument_parser(
+            configuration_argument_parser,
+            variadic_argument_parser(object_argument_parser({
+                {"timeline_id", argument_parser()},
+                {"delay_minimum", argument_parser(tonumber)},
+                {"record_ids", counted_argument_parser(argument_parser())},
+            }))
+        )(cursor, arguments)
+        for _, digest in ipairs(digests) do
+            close_digest(configuration, digest.timeline_id, digest.delay_minimum, digest.record_ids)
+        end
+    end,
 }
 
 local cursor, command = argument_parser(
@@ -0,0 +1,65 @@
+-- Check the quota counters of many items at once. Each item is checked and
+-- consumed atomically, exactly like ``is_rate_limited.lua`` does for a single
+-- item, except that the counters are incremented by the item's quantity.
+-- Items are processed in order, so later items observe the consumption of
+-- earlier items that share a quota.
+--
+-- Values provided as ``KEYS`` are the pairs of counter and refund keys of all
+-- quotas of all items. For every item, ``ARGV`` contains the number of quotas
+-- of the item and the quantity to consume, followed by the maximum value and
+-- expiration time of each of its quotas.
+--
+-- For example, to check an item of quantity 1 against quotas ``foo`` (limit
+-- 10) and ``bar`` (limit 20), followed by an item of quantity 5 against just
+-- ``foo``, all expiring at the Unix timestamp ``100``, the ``KEYS`` and
+-- ``ARGV`` values would be as follows:
+--
+--   KEYS = {"foo", "r:foo", "bar", "r:bar", "foo", "r:foo"}
+--   ARGV = {2, 1, 10, 100, 20, 100, 1, 5, 10, 100}
+--
+-- The result is a Lua table/array (Redis multi bulk reply) that contains one
+-- table per item, which specifies for each of the item's quotas whether or
+-- not the item was *rejected* based on the provided limit.
+local results = {}
+local key_cursor = 1
+local arg_cursor = 1
+
+while arg_cursor <= #ARGV do
+    local count = tonumber(ARGV[arg_cursor])
+    local quantity = tonumber(ARGV[arg_cursor + 1])
+    arg_cursor = arg_cursor + 2
+
+    local rejections = {}
+    local failed = false
+    for i=0, count - 1 do
+        local limit = tonumber(ARGV[arg_cursor + i * 2])
+        local rejected = false
+        -- limit=-1 means "no limit"
+        if limit >= 0 then
+            local key = KEYS[key_cursor + i * 2]
+            local refund_key = KEYS[key_cursor + i * 2 + 1]
+            rejected = (redis.call('GET', key) or 0) - (redis.call('GET', refund_key) or 0) + quantity > limit
+        end
+
+        if rejected then
+            failed = true
+        end
+        rejections[i + 1] = rejected
+    end
+
+    if not failed then
+        for i=0, count - 1 do
+            local key = KEYS[key_cursor + i * 2]
+            redis.call('INCRBY', key, quantity)
+            redis.call('EXPIREAT', key, ARGV[arg_cursor + i * 2 + 1])
+        end
+    end
+
+    results[#results + 1] = rejections
+    key_cursor = key_cursor + count * 2
+    arg_cursor = arg_cursor + count * 2
+end
+
+assert(key_cursor == #KEYS + 1, "incorrect number of keys and arguments provided")
+
+return results
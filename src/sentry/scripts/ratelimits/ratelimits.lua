@@ -0,0 +1,89 @@
+-- Check (and consume) rate limits for a batch of rate limits with one of the
+-- strategies below. ``ARGV`` contains the name of the strategy and the current
+-- timestamp, followed by the limit and window (in seconds) of each rate limit.
+-- ``KEYS`` contains the keys of each rate limit, which depend on the strategy:
+-- the keys of the current and the previous fixed window counter for
+-- ``SLIDING_WINDOW``, and the base key for ``GCRA``:
+--
+--   KEYS = {"rl:foo:24080793", "rl:foo:24080792", "rl:bar:401346", "rl:bar:401345"}
+--   ARGV = {"SLIDING_WINDOW", 1444847625.5, 10, 60, 100, 3600}
+--
+-- The result is a Lua table/array (Redis multi bulk reply) that contains a
+-- pair for each rate limit: whether the request was *limited* (1 or 0), and
+-- the number of seconds after which the request may be retried. (The latter
+-- is returned as a string, since Redis truncates Lua numbers to integers.)
+-- Limited requests do not consume any capacity.
+
+-- An approximation of a sliding log, based on the counters of the current and
+-- the previous fixed window. The count of the previous window is weighted by
+-- how much of it still overlaps with the sliding window. This uses the same
+-- counters as the fixed window strategy, so the strategies can be switched
+-- without resetting any limits.
+local function sliding_window(keys, limit, window, now)
+    local bucket = math.floor(now / window)
+    local current_key = keys[1]
+    local current = tonumber(redis.call('GET', current_key) or 0)
+    local previous = tonumber(redis.call('GET', keys[2]) or 0)
+    local elapsed = now - bucket * window
+
+    if previous * (window - elapsed) / window + current + 1 > limit then
+        local retry_after = window - elapsed
+        if current + 1 <= limit and previous > 0 then
+            -- Wait until enough of the previous window has slid out.
+            retry_after = math.max(0, window - (limit - current - 1) * window / previous - elapsed)
+        end
+        return {1, tostring(retry_after)}
+    end
+
+    redis.call('INCR', current_key)
+    -- The counter needs to survive the next window, where it is used as the
+    -- previous window's count.
+    redis.call('EXPIRE', current_key, window * 2)
+    return {0, '0'}
+end
+
+-- The generic cell rate algorithm (a token bucket that is stored as a single
+-- timestamp.) The bucket holds up to ``limit`` tokens and is refilled at a
+-- rate of ``limit`` tokens per ``window``. The key stores the theoretical
+-- arrival time (TAT) of the next request.
+local function gcra(keys, limit, window, now)
+    local key = keys[1]
+    if limit <= 0 then
+        return {1, tostring(window)}
+    end
+
+    local interval = window / limit
+    local tat = math.max(tonumber(redis.call('GET', key)) or now, now)
+    local allow_at = tat + interval - window
+    if now < allow_at then
+        return {1, tostring(allow_at - now)}
+    end
+
+    tat = tat + interval
+    redis.call('SET', key, string.format('%.6f', tat), 'EX', math.ceil(tat - now))
+    return {0, '0'}
+end
+
+-- The strategies and the number of keys they use for every rate limit.
+local strategies = {
+    SLIDING_WINDOW = {sliding_window, 2},
+    GCRA = {gcra, 1},
+}
+
+local strategy = strategies[ARGV[1]]
+assert(strategy ~= nil, 'unknown strategy')
+local check, key_count = strategy[1], strategy[2]
+local count = (#ARGV - 2) / 2
+assert(#KEYS == count * key_count, 'incorrect number of keys and arguments provided')
+
+local now = tonumber(ARGV[2])
+local results = {}
+for i = 1, count do
+    local keys = {}
+    for j = 1, key_count do
+        keys[j] = KEYS[(i - 1) * key_count + j]
+    end
+    results[i] = check(keys, tonumber(ARGV[i * 2 + 1]), tonumber(ARGV[i * 2 + 2]), now)
+end
+
+return results
@@ -53,6 +53,15 @@ To query the top 10 items from the first sketch:
 
     EVALSHA $SHA 2 1:i 1:e RANKED 5 64 50 10
 
+Several commands can be run with a single call using the BATCH command. Each
+command is given as the number of keys it takes from ``KEYS`` and the number of
+its arguments, followed by its arguments. The result is a sequence of the
+results of all commands. The EXPIREAT command sets the expiration time of its
+keys. To add "foo" to two sketches, set the expiration time of the first one
+and query the second one:
+
+    EVALSHA $SHA 8 1:i 1:e 2:i 2:e 1:i 1:e 2:i 2:e BATCH 4 6 INCR 5 64 50 1 foo 2 2 EXPIREAT 1500000000 2 5 ESTIMATE 5 64 50 foo
+
 ]]--
 
 --[[ Helpers ]]--
@@ -462,10 +471,16 @@ end
 local Router = {}
 
 function Router:new(commands)
-    return function (keys, arguments)
-        local name, arguments = head(arguments)
-        return commands[name:upper()](keys, arguments)
+    local function route(keys, arguments)
+        -- Avoid unpacking arguments, since a batch may have more of them than
+        -- fit on the stack.
+        local rest = {}
+        for i = 2, #arguments do
+            rest[i - 1] = arguments[i]
+        end
+        return commands[arguments[1]:upper()](keys, rest, route)
     end
+    return route
 end
 
 
@@ -646,4 +661,40 @@ return Router:new({
         end
     ),
 
+    --[[
+    Set the expiration time of all keys.
+    ]]--
+    EXPIREAT = function (keys, arguments)
+        for _, key in ipairs(keys) do
+            redis.call('EXPIREAT', key, arguments[1])
+        end
+        return #keys
+    end,
+
+    --[[
+    Run a sequence of commands, returning a sequence of their results.
+    ]]--
+    BATCH = function (keys, arguments, route)
+        local results = {}
+        local k, a = 1, 1
+        while a <= #arguments do
+            local key_count = tonumber(arguments[a])
+            local argument_count = tonumber(arguments[a + 1])
+
+            local command_keys = {}
+            for i = 1, key_count do
+                command_keys[i] = keys[k + i - 1]
+            end
+            local command_arguments = {}
+            for i = 1, argument_count do
+                command_arguments[i] = arguments[a + 1 + i]
+            end
+
+            table.insert(results, route(command_keys, command_arguments))
+            k = k + key_count
+            a = a + 2 + argument_count
+        end
+        return results
+    end,
+
 })(KEYS, ARGV)
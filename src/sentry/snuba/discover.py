@@ -41,6 +41,7 @@ __all__ = (
     "PaginationResult",
     "InvalidSearchQuery",
     "query",
+    "stream_query",
     "prepare_discover_query",
     "timeseries_query",
     "top_events_timeseries",
@@ -134,6 +135,16 @@ def transform_meta(results, function_alias_map):
     return meta
 
 
+def transform_row(row, translated_columns):
+    transformed = {}
+    for key, value in row.items():
+        if isinstance(value, float) and math.isnan(value):
+            value = 0
+        transformed[translated_columns.get(key, key)] = value
+
+    return transformed
+
+
 def transform_data(result, translated_columns, snuba_filter):
     """
     Transform internal names back to the public schema ones.
@@ -145,16 +156,7 @@ def transform_data(result, translated_columns, snuba_filter):
         # Translate back column names that were converted to snuba format
         col["name"] = translated_columns.get(col["name"], col["name"])
 
-    def get_row(row):
-        transformed = {}
-        for key, value in row.items():
-            if isinstance(value, float) and math.isnan(value):
-                value = 0
-            transformed[translated_columns.get(key, key)] = value
-
-        return transformed
-
-    result["data"] = [get_row(row) for row in result["data"]]
+    result["data"] = [transform_row(row, translated_columns) for row in result["data"]]
 
     rollup = snuba_filter.rollup
     if rollup and rollup > 0:
@@ -258,6 +260,70 @@ def query(
         )
 
 
+def stream_query(
+    selected_columns,
+    query,
+    params,
+    equations=None,
+    orderby=None,
+    offset=None,
+    limit=50,
+    referrer=None,
+    auto_fields=False,
+    auto_aggregations=False,
+    use_aggregate_conditions=False,
+    conditions=None,
+    functions_acl=None,
+):
+    """
+    Runs the same query as `query`, but returns an iterator over the result
+    rows that decodes each row from the snuba response as it is consumed, so
+    large results don't have to be held in memory at once.
+
+    Only the rows are returned, since the rest of the response (such as the
+    meta) may not have been decoded until all of the rows have been consumed.
+    The rows are translated back to their public names like in `query`, but
+    aren't zerofilled.
+    """
+    if not selected_columns:
+        raise InvalidSearchQuery("No columns selected")
+
+    snuba_query = prepare_discover_query(
+        selected_columns[:],
+        query,
+        params,
+        equations,
+        orderby,
+        auto_fields,
+        auto_aggregations,
+        use_aggregate_conditions,
+        conditions,
+        functions_acl,
+    )
+    snuba_filter = snuba_query.filter
+
+    with sentry_sdk.start_span(op="discover.discover", description="stream_query.snuba_query"):
+        result = raw_query(
+            start=snuba_filter.start,
+            end=snuba_filter.end,
+            groupby=snuba_filter.groupby,
+            conditions=snuba_filter.conditions,
+            aggregations=snuba_filter.aggregations,
+            selected_columns=snuba_filter.selected_columns,
+            filter_keys=snuba_filter.filter_keys,
+            having=snuba_filter.having,
+            orderby=snuba_filter.orderby,
+            dataset=Dataset.Discover,
+            limit=limit,
+            offset=offset,
+            referrer=referrer,
+            stream=True,
+        )
+
+    translated_columns = snuba_query.columns
+    return (transform_row(row, translated_columns) for row in result["data"])
+
+
 def prepare_discover_query(
     selected_columns,
     query,
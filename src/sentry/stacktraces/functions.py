@@ -1,6 +1,7 @@
 import re
 
 from sentry.stacktraces.platform import get_behavior_family_for_platform
+from sentry.utils.functional import scope_cached
 from sentry.utils.safe import setdefault_path
 
 _windecl_hash = re.compile(r"^@?(.*?)@[0-9]+$")
@@ -91,6 +92,7 @@ def split_func_tokens(s):
     return ["".join(x) for x in rv]
 
 
+@scope_cached
 def trim_function_name(function, platform, normalize_lambdas=True):
     """Given a function value from the frame's function attribute this returns
     a trimmed version that can be stored in `function_name`.  This is only used
@@ -1,18 +1,24 @@
 import logging
 from collections import OrderedDict, namedtuple
 from datetime import datetime
+from threading import Lock
 
 import sentry_sdk
 from django.utils import timezone
 
+from sentry import options
 from sentry.models import Project, Release
 from sentry.stacktraces.functions import set_in_app, trim_function_name
+from sentry.utils import metrics
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import get_path, safe_execute
 
 logger = logging.getLogger(__name__)
 
+# Seconds frame processing results are kept in the shared frame cache.
+FRAME_CACHE_TIMEOUT = 3600
+
 StacktraceInfo = namedtuple(
     "StacktraceInfo", ["stacktrace", "container", "platforms", "is_exception"]
 )
@@ -21,6 +27,41 @@ StacktraceInfo.__eq__ = lambda a, b: a is b
 StacktraceInfo.__ne__ = lambda a, b: a is not b
 
 
+class LocalFrameCache:
+    """
+    Bounded in-process LRU cache of frame processing results.  It is checked
+    before the shared cache, so that the frames recurring in most events of a
+    release are not fetched again for every event.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, max_size):
+        if max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+local_frame_cache = LocalFrameCache()
+
+
 class ProcessableFrame:
     def __init__(self, frame, idx, processor, stacktrace_info, processable_frames):
         self.frame = frame
@@ -64,7 +105,11 @@ class ProcessableFrame:
 
     def set_cache_value(self, value):
         if self.cache_key is not None:
-            cache.set(self.cache_key, value, 3600)
+            local_frame_cache.set(
+                self.cache_key, value, options.get("processing.frame-cache.local-size")
+            )
+            if options.get("processing.frame-cache.shared"):
+                cache.set(self.cache_key, value, FRAME_CACHE_TIMEOUT)
             return True
         return False
 
@@ -73,7 +118,10 @@ class ProcessableFrame:
             self.cache_key = None
             return
 
-        h = hash_values(values, seed=self.processor.__class__.__name__)
+        h = hash_values(
+            [self.processor.get_frame_cache_version(), values],
+            seed=self.processor.__class__.__name__,
+        )
         self.cache_key = rv = "pf:%s" % h
         return rv
 
@@ -143,6 +191,14 @@ class StacktraceProcessor:
         if wanted.  In particular a cache key can be set here.
         """
 
+    def get_frame_cache_version(self):
+        """Returns the versions of everything besides the frame that the
+        processing of a frame depends on, such as the release or debug files.
+        They are part of frame cache keys, so results cached for one version
+        are never reused for another.
+        """
+        return [self.project.id, self.data.get("release"), self.data.get("dist")]
+
     def process_exception(self, exception):
         """Processes an exception."""
         return False
@@ -440,10 +496,39 @@ def get_crash_frame_from_event_data(data, frame_filter=None):
         return default
 
 
-def lookup_frame_cache(keys):
+def lookup_frame_cache(keys, processor_name=None):
+    """Looks up frame processing results in the in-process frame cache and
+    then in the shared cache.  Keys that are not found are left out.
+    """
+    local_size = options.get("processing.frame-cache.local-size")
     rv = {}
+    missing = []
     for key in keys:
-        rv[key] = cache.get(key)
+        value = local_frame_cache.get(key) if local_size > 0 else None
+        if value is None:
+            missing.append(key)
+        else:
+            rv[key] = value
+    local_hits = len(rv)
+
+    if missing and options.get("processing.frame-cache.shared"):
+        for key, value in cache.get_many(missing).items():
+            if value is not None:
+                rv[key] = value
+                local_frame_cache.set(key, value, local_size)
+
+    for result, amount in (
+        ("local_hit", local_hits),
+        ("shared_hit", len(rv) - local_hits),
+        ("miss", len(keys) - len(rv)),
+    ):
+        if amount:
+            metrics.incr(
+                "stacktraces.frame_cache.lookup",
+                amount=amount,
+                tags={"result": result, "processor": processor_name},
+            )
+
     return rv
 
 
@@ -468,11 +553,14 @@ def get_stacktrace_processing_task(infos, processors):
                 processable_frame
             )
             if processable_frame.cache_key is not None:
-                to_lookup[processable_frame.cache_key] = processable_frame
+                to_lookup.setdefault(processable_frame.processor, []).append(processable_frame)
 
-    frame_cache = lookup_frame_cache(to_lookup)
-    for cache_key, processable_frame in to_lookup.items():
-        processable_frame.cache_value = frame_cache.get(cache_key)
+    for processor, processable_frames in to_lookup.items():
+        frame_cache = lookup_frame_cache(
+            {f.cache_key for f in processable_frames}, processor.__class__.__name__
+        )
+        for processable_frame in processable_frames:
+            processable_frame.cache_value = frame_cache.get(processable_frame.cache_key)
 
     return StacktraceProcessingTask(
         processable_stacktraces=by_stacktrace_info, processors=by_processor
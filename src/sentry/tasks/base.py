@@ -6,6 +6,7 @@ from celery.task import current
 
 from sentry.celery import app
 from sentry.utils import metrics
+from sentry.utils.sampling_profiler import profiling_stage
 from sentry.utils.sdk import capture_exception, configure_scope
 
 
@@ -42,7 +43,7 @@ def instrumented_task(name, stat_suffix=None, **kwargs):
 
             with metrics.timer(key, instance=instance), track_memory_usage(
                 "jobs.memory_change", instance=instance
-            ):
+            ), profiling_stage(name):
                 result = func(*args, **kwargs)
 
             return result
@@ -5,6 +5,7 @@ from django.apps import apps
 from django.db import transaction
 from django.utils import timezone
 
+from sentry import options
 from sentry.constants import ObjectStatus
 from sentry.exceptions import DeleteAborted
 from sentry.signals import pending_delete
@@ -195,7 +196,10 @@ def delete_project(object_id, transaction_id=None, **kwargs):
         raise DeleteAborted
 
     task = deletions.get(
-        model=Project, query={"id": object_id}, transaction_id=transaction_id or uuid4().hex
+        model=Project,
+        query={"id": object_id},
+        transaction_id=transaction_id or uuid4().hex,
+        bulk=options.get("deletions.bulk-relations"),
     )
     has_more = task.chunk()
     if has_more:
@@ -222,7 +226,10 @@ def delete_groups(object_ids, transaction_id=None, eventstream_state=None, **kwa
     current_batch, rest = object_ids[:max_batch_size], object_ids[max_batch_size:]
 
     task = deletions.get(
-        model=Group, query={"id__in": current_batch}, transaction_id=transaction_id
+        model=Group,
+        query={"id__in": current_batch},
+        transaction_id=transaction_id,
+        bulk=options.get("deletions.bulk-relations"),
     )
     has_more = task.chunk()
     if has_more or rest:
@@ -410,3 +417,20 @@ def delete_organization_integration(object_id, transaction_id=None, actor_id=Non
             kwargs={"object_id": object_id, "transaction_id": transaction_id, "actor_id": actor_id},
             countdown=15,
         )
+
+
+@instrumented_task(
+    name="sentry.tasks.deletion.delete_nodestore_nodes",
+    queue="cleanup",
+    default_retry_delay=60 * 5,
+    max_retries=MAX_RETRIES,
+)
+@retry
+def delete_nodestore_nodes(node_ids, **kwargs):
+    """
+    Removes event payloads from nodestore on behalf of deletion tasks running
+    in bulk mode, so the database deletion does not wait on nodestore.
+    """
+    from sentry import nodestore
+
+    nodestore.delete_multi(node_ids)
@@ -1,6 +1,7 @@
 import logging
 import time
 
+from sentry import options
 from sentry.digests import get_option_key
 from sentry.digests.backends.base import InvalidState
 from sentry.digests.notifications import build_digest, split_key
@@ -28,6 +29,12 @@ def schedule_digests():
     timeout = 300
     digests.maintenance(deadline - timeout)
 
+    batch_size = options.get("digests.delivery-batch-size")
+    if batch_size > 1:
+        for entries in digests.schedule_batches(deadline, batch_size):
+            deliver_digests.delay([entry.key for entry in entries])
+        return
+
     for entry in digests.schedule(deadline):
         deliver_digest.delay(entry.key, entry.timestamp)
 
@@ -67,3 +74,59 @@ def deliver_digest(key, schedule_timestamp=None):
                     "target_identifier": target_identifier,
                 },
             )
+
+
+@instrumented_task(name="sentry.tasks.digests.deliver_digests", queue="digests.delivery")
+def deliver_digests(keys):
+    """
+    Delivers the digests for a batch of timelines, reading and closing all of
+    the timelines with a bounded number of backend operations.
+    """
+    from sentry import digests
+    from sentry.mail import mail_adapter
+
+    targets = {}
+    minimum_delays = {}
+    for key in keys:
+        try:
+            project, target_type, target_identifier = split_key(key)
+        except Project.DoesNotExist as error:
+            logger.info("Cannot deliver digest %r due to error: %s", key, error)
+            digests.delete(key)
+            continue
+
+        targets[key] = (project, target_type, target_identifier)
+        minimum_delays[key] = ProjectOption.objects.get_value(
+            project, get_option_key("mail", "minimum_delay")
+        )
+
+    if not targets:
+        return
+
+    with snuba.options_override({"consistent": True}):
+        built = []
+        with digests.digest_many(list(targets), minimum_delay=minimum_delays) as records_by_key:
+            for key, records in list(records_by_key.items()):
+                project, target_type, target_identifier = targets[key]
+                try:
+                    built.append((key, build_digest(project, records)))
+                except Exception:
+                    # Leave this timeline open so that its records are kept
+                    # for the next delivery attempt, but don't hold up the
+                    # rest of the batch.
+                    logger.exception("Failed to build digest %r", key)
+                    del records_by_key[key]
+
+        for key, digest in built:
+            project, target_type, target_identifier = targets[key]
+            if digest:
+                mail_adapter.notify_digest(project, digest, target_type, target_identifier)
+            else:
+                logger.info(
+                    "Skipped digest delivery due to empty digest",
+                    extra={
+                        "project": project.id,
+                        "target_type": target_type.value,
+                        "target_identifier": target_identifier,
+                    },
+                )
@@ -48,3 +48,18 @@ def delete_unreferenced_blobs(blob_ids):
                 # Do nothing if the blob was deleted in another task, or
                 # if had another reference added concurrently.
                 pass
+
+
+@instrumented_task(
+    name="sentry.tasks.files.delete_files",
+    queue="files.delete",
+    default_retry_delay=60 * 5,
+    max_retries=MAX_RETRIES,
+)
+def delete_files(file_ids):
+    from sentry.models import File
+
+    # Delete one by one so the file's blobs are released through
+    # ``File.delete``.
+    for file in File.objects.filter(id__in=file_ids):
+        file.delete()
@@ -1,9 +1,9 @@
 import logging
 
-from django.db import DataError, IntegrityError, router, transaction
+from django.db import DataError, IntegrityError, connections, router, transaction
 from django.db.models import F
 
-from sentry import eventstream, similarity
+from sentry import eventstream, options, similarity
 from sentry.app import tsdb
 from sentry.tasks.base import instrumented_task, track_group_async_operation
 
@@ -13,6 +13,21 @@ delete_logger = logging.getLogger("sentry.deletions.async")
 
 EXTRA_MERGE_MODELS = []
 
+# Columns that are combined, rather than discarded, when ``bulk_merge_objects``
+# moves a row to the new group that conflicts with a row that is already
+# there. Keyed by model label, values map a column to one of the
+# ``MERGE_AGGREGATE_FUNCTIONS``.
+MERGE_AGGREGATES = {
+    "sentry.GroupEnvironment": {"first_seen": "min"},
+    "sentry.GroupRelease": {"first_seen": "min", "last_seen": "max"},
+}
+
+MERGE_AGGREGATE_FUNCTIONS = {
+    "min": "LEAST(target.{0}, source.{0})",
+    "max": "GREATEST(target.{0}, source.{0})",
+    "sum": "target.{0} + source.{0}",
+}
+
 
 @instrumented_task(
     name="sentry.tasks.merge.merge_groups",
@@ -40,6 +55,7 @@ def merge_groups(
         GroupHash,
         GroupMeta,
         GroupRedirect,
+        GroupRelease,
         GroupRuleStatus,
         GroupSubscription,
         UserReport,
@@ -101,9 +117,19 @@ def merge_groups(
             GroupMeta,
         )
 
-        has_more = merge_objects(
-            model_list, group, new_group, logger=logger, transaction_id=transaction_id
-        )
+        if options.get("merge.bulk-objects"):
+            bulk_merge_objects(
+                model_list + (GroupRelease,),
+                group,
+                new_group,
+                logger=logger,
+                transaction_id=transaction_id,
+            )
+            has_more = False
+        else:
+            has_more = merge_objects(
+                model_list, group, new_group, logger=logger, transaction_id=transaction_id
+            )
 
         if not has_more:
             # There are no more objects to merge for *this* "from" group, remove it
@@ -272,3 +298,100 @@ def merge_objects(models, group, new_group, limit=1000, logger=None, transaction
         if has_more:
             return True
     return has_more
+
+
+def _get_group_column(model):
+    all_fields = [f.name for f in model._meta.get_fields()]
+    if "group" in all_fields:
+        return model._meta.get_field("group").column
+    return "group_id"
+
+
+def _get_unique_column_sets(model, group_column):
+    """
+    Returns the sets of columns that are unique together and include the
+    group column, excluding the group column itself. A row moved to the new
+    group conflicts with an existing row when it matches on any of them.
+    """
+    column_sets = [
+        [model._meta.get_field(name).column for name in names]
+        for names in model._meta.unique_together
+    ]
+    column_sets.extend(
+        [field.column]
+        for field in model._meta.concrete_fields
+        if field.unique and not field.primary_key
+    )
+
+    return [
+        [column for column in columns if column != group_column]
+        for columns in column_sets
+        if group_column in columns
+    ]
+
+
+def bulk_merge_objects(models, group, new_group, logger=None, transaction_id=None):
+    """
+    Moves the rows of each model from ``group`` to ``new_group`` with a fixed
+    number of statements per model, rather than one object at a time as
+    ``merge_objects`` does. Rows that would violate a uniqueness constraint
+    on the new group are deleted after their ``MERGE_AGGREGATES`` columns
+    have been folded into the conflicting row.
+    """
+    params = {"source_id": group.id, "target_id": new_group.id, "project_id": group.project_id}
+
+    for model in models:
+        using = router.db_for_write(model)
+        qn = connections[using].ops.quote_name
+
+        all_fields = [f.name for f in model._meta.get_fields()]
+        table = qn(model._meta.db_table)
+        group_column = _get_group_column(model)
+
+        # See ``merge_objects``: filter on the project if the model has one.
+        source_conditions = [f"source.{qn(group_column)} = %(source_id)s"]
+        if "project_id" in all_fields or "project" in all_fields:
+            source_conditions.append(f"source.{qn('project_id')} = %(project_id)s")
+
+        assignments = ", ".join(
+            "{} = {}".format(qn(column), MERGE_AGGREGATE_FUNCTIONS[function].format(qn(column)))
+            for column, function in MERGE_AGGREGATES.get(model._meta.label, {}).items()
+        )
+
+        deleted = 0
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            for columns in _get_unique_column_sets(model, group_column):
+                conditions = " AND ".join(
+                    source_conditions
+                    + [f"target.{qn(group_column)} = %(target_id)s"]
+                    + [f"target.{qn(column)} = source.{qn(column)}" for column in columns]
+                )
+
+                if assignments:
+                    cursor.execute(
+                        f"UPDATE {table} AS target SET {assignments} "
+                        f"FROM {table} AS source WHERE {conditions}",
+                        params,
+                    )
+
+                cursor.execute(
+                    f"DELETE FROM {table} AS source USING {table} AS target WHERE {conditions}",
+                    params,
+                )
+                deleted += cursor.rowcount
+
+            cursor.execute(
+                f"UPDATE {table} AS source SET {qn(group_column)} = %(target_id)s "
+                f"WHERE {' AND '.join(source_conditions)}",
+                params,
+            )
+
+        if deleted and logger is not None:
+            delete_logger.debug(
+                "object.delete.executed",
+                extra={
+                    "count": deleted,
+                    "transaction_id": transaction_id,
+                    "model": model.__name__,
+                },
+            )
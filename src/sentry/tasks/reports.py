@@ -26,6 +26,7 @@ from sentry.app import tsdb
 from sentry.constants import DataCategory
 from sentry.models import (
     Activity,
+    Group,
     GroupStatus,
     Organization,
     OrganizationStatus,
@@ -221,7 +222,7 @@ def _query_tsdb_groups_chunked(func, issue_ids, start, stop, rollup):
     return combined
 
 
-def build_project_series(start__stop, project):
+def build_organization_series(start__stop, projects):
     start, stop = start__stop
     rollup = ONE_DAY
 
@@ -229,29 +230,50 @@ def build_project_series(start__stop, project):
     assert resolution == rollup, "resolution does not match requested value"
 
     clean = partial(clean_series, start, stop, rollup)
-    issue_ids = project.group_set.filter(
-        status=GroupStatus.RESOLVED, resolved_at__gte=start, resolved_at__lt=stop
-    ).values_list("id", flat=True)
-
-    tsdb_range_resolved = _query_tsdb_groups_chunked(tsdb.get_range, issue_ids, start, stop, rollup)
-    resolved_series = reduce(
-        merge_series,
-        map(clean, tsdb_range_resolved.values()),
-        clean([(timestamp, 0) for timestamp in series]),
+    length = len(clean([(timestamp, 0) for timestamp in series]))
+
+    project_ids = [project.id for project in projects]
+    issue_projects = dict(
+        Group.objects.filter(
+            project_id__in=project_ids,
+            status=GroupStatus.RESOLVED,
+            resolved_at__gte=start,
+            resolved_at__lt=stop,
+        ).values_list("id", "project_id")
     )
 
-    total_series = clean(
-        tsdb.get_range(tsdb.models.project, [project.id], start, stop, rollup=rollup)[project.id]
+    # Resolved counts are accumulated into one column per project, rather
+    # than merging a series per issue.
+    resolved = {project_id: [0] * length for project_id in project_ids}
+    tsdb_range_resolved = _query_tsdb_groups_chunked(
+        tsdb.get_range, list(issue_projects), start, stop, rollup
     )
+    for issue_id, issue_series in tsdb_range_resolved.items():
+        issue_series = clean(issue_series)
+        assert len(issue_series) == length, "series must be same length"
+        column = resolved[issue_projects[issue_id]]
+        for i, (timestamp, value) in enumerate(issue_series):
+            column[i] += value
+
+    total_series = tsdb.get_range(tsdb.models.project, project_ids, start, stop, rollup=rollup)
+
+    results = {}
+    for project_id in project_ids:
+        totals = clean(total_series[project_id])
+        assert len(totals) == length, "series must be same length"
+        results[project_id] = [
+            (timestamp, (resolved_count, total - resolved_count))  # unresolved
+            for (timestamp, total), resolved_count in zip(totals, resolved[project_id])
+        ]
 
-    return merge_series(
-        resolved_series,
-        total_series,
-        lambda resolved, total: (resolved, total - resolved),  # unresolved
-    )
+    return results
 
 
-def build_project_aggregates(ignore__stop, project):
+def build_project_series(start__stop, project):
+    return build_organization_series(start__stop, [project])[project.id]
+
+
+def build_organization_aggregates(ignore__stop, projects):
     # TODO: This needs to return ``None`` for periods that don't have any data
     # (because the project is not old enough) and possibly extrapolate for
     # periods that only have partial periods.
@@ -260,25 +282,34 @@ def build_project_aggregates(ignore__stop, project):
     period = timedelta(days=7)
     start = stop - (period * segments)
 
-    def get_aggregate_value(start, stop):
-        return tsdb.get_sums(tsdb.models.project, (project.id,), start, stop, rollup=ONE_DAY)[
-            project.id
-        ]
-
-    return [
-        get_aggregate_value(start + (period * i), start + (period * (i + 1) - timedelta(seconds=1)))
+    project_ids = [project.id for project in projects]
+    sums = [
+        tsdb.get_sums(
+            tsdb.models.project,
+            project_ids,
+            start + (period * i),
+            start + (period * (i + 1) - timedelta(seconds=1)),
+            rollup=ONE_DAY,
+        )
         for i in range(segments)
     ]
 
+    return {project_id: [segment[project_id] for segment in sums] for project_id in project_ids}
 
-def build_project_issue_summaries(interval, project):
+
+def build_project_aggregates(ignore__stop, project):
+    return build_organization_aggregates(ignore__stop, [project])[project.id]
+
+
+def build_organization_issue_summaries(interval, projects):
     start, stop = interval
 
-    queryset = project.group_set.exclude(status=GroupStatus.IGNORED)
+    project_ids = [project.id for project in projects]
+    queryset = Group.objects.filter(project_id__in=project_ids).exclude(status=GroupStatus.IGNORED)
 
     # Fetch all new issues.
-    new_issue_ids = set(
-        queryset.filter(first_seen__gte=start, first_seen__lt=stop).values_list("id", flat=True)
+    new_issue_projects = dict(
+        queryset.filter(first_seen__gte=start, first_seen__lt=stop).values_list("id", "project_id")
     )
 
     # Fetch all regressions. This is a little weird, since there's no way to
@@ -288,7 +319,7 @@ def build_project_issue_summaries(interval, project):
     # past week. (In theory, the activity table *could* be used to answer this
     # query without the subselect, but there's no suitable indexes to make it's
     # performance predictable.)
-    reopened_issue_ids = set(
+    reopened_issue_projects = dict(
         Activity.objects.filter(
             group__in=queryset.filter(
                 last_seen__gte=start,
@@ -300,27 +331,32 @@ def build_project_issue_summaries(interval, project):
             datetime__lt=stop,
         )
         .distinct()
-        .values_list("group_id", flat=True)
+        .values_list("group_id", "project_id")
     )
 
     rollup = ONE_DAY
     event_counts = _query_tsdb_groups_chunked(
-        tsdb.get_sums, new_issue_ids | reopened_issue_ids, start, stop, rollup
+        tsdb.get_sums, set(new_issue_projects) | set(reopened_issue_projects), start, stop, rollup
     )
+    project_totals = tsdb.get_sums(tsdb.models.project, project_ids, start, stop, rollup=rollup)
 
-    new_issue_count = sum(event_counts[id] for id in new_issue_ids)
-    reopened_issue_count = sum(event_counts[id] for id in reopened_issue_ids)
-    existing_issue_count = max(
-        tsdb.get_sums(tsdb.models.project, [project.id], start, stop, rollup=rollup)[project.id]
-        - new_issue_count
-        - reopened_issue_count,
-        0,
-    )
+    # [new, reopened, existing] for each project.
+    results = {project_id: [0, 0, 0] for project_id in project_ids}
+    for index, issue_projects in enumerate((new_issue_projects, reopened_issue_projects)):
+        for issue_id, project_id in issue_projects.items():
+            results[project_id][index] += event_counts[issue_id]
 
-    return [new_issue_count, reopened_issue_count, existing_issue_count]
+    for project_id, summaries in results.items():
+        summaries[2] = max(project_totals[project_id] - summaries[0] - summaries[1], 0)
 
+    return results
 
-def build_project_usage_outcomes(start__stop, project):
+
+def build_project_issue_summaries(interval, project):
+    return build_organization_issue_summaries(interval, [project])[project.id]
+
+
+def build_organization_usage_outcomes(start__stop, projects):
     start, stop = start__stop
 
     # XXX(epurkhiser): Tsdb used to use day buckets, where the end would
@@ -328,10 +364,12 @@ def build_project_usage_outcomes(start__stop, project):
     # capture the entire last day
     end = stop + timedelta(days=1)
 
+    project_ids = [project.id for project in projects]
     query = Query(
         dataset=Dataset.Outcomes.value,
         match=Entity("outcomes"),
         select=[
+            Column("project_id"),
             Column("outcome"),
             Column("category"),
             Function("sum", [Column("quantity")], "total"),
@@ -339,8 +377,8 @@ def build_project_usage_outcomes(start__stop, project):
         where=[
             Condition(Column("timestamp"), Op.GTE, start),
             Condition(Column("timestamp"), Op.LT, end),
-            Condition(Column("project_id"), Op.EQ, project.id),
-            Condition(Column("org_id"), Op.EQ, project.organization_id),
+            Condition(Column("project_id"), Op.IN, project_ids),
+            Condition(Column("org_id"), Op.EQ, projects[0].organization_id),
             Condition(
                 Column("outcome"), Op.IN, [Outcome.ACCEPTED, Outcome.FILTERED, Outcome.RATE_LIMITED]
             ),
@@ -350,40 +388,34 @@ def build_project_usage_outcomes(start__stop, project):
                 [*DataCategory.error_categories(), DataCategory.TRANSACTION],
             ),
         ],
-        groupby=[Column("outcome"), Column("category")],
+        groupby=[Column("project_id"), Column("outcome"), Column("category")],
         granularity=Granularity(ONE_DAY),
     )
     data = raw_snql_query(query, referrer="reports.outcomes")["data"]
 
-    return (
-        # Accepted errors
-        sum(
-            row["total"]
-            for row in data
-            if row["category"] in DataCategory.error_categories()
-            and row["outcome"] == Outcome.ACCEPTED
-        ),
-        # Dropped errors
-        sum(
-            row["total"]
-            for row in data
-            if row["category"] in DataCategory.error_categories()
-            and row["outcome"] == Outcome.RATE_LIMITED
-        ),
-        # accepted transactions
-        sum(
-            row["total"]
-            for row in data
-            if row["category"] == DataCategory.TRANSACTION and row["outcome"] == Outcome.ACCEPTED
-        ),
-        # Dropped transactions
-        sum(
-            row["total"]
-            for row in data
-            if row["category"] == DataCategory.TRANSACTION
-            and row["outcome"] == Outcome.RATE_LIMITED
-        ),
-    )
+    # Accepted errors, dropped errors, accepted transactions and dropped
+    # transactions for each project.
+    results = {project_id: [0, 0, 0, 0] for project_id in project_ids}
+    for row in data:
+        if row["category"] in DataCategory.error_categories():
+            index = 0
+        elif row["category"] == DataCategory.TRANSACTION:
+            index = 2
+        else:
+            continue
+
+        if row["outcome"] == Outcome.RATE_LIMITED:
+            index += 1
+        elif row["outcome"] != Outcome.ACCEPTED:
+            continue
+
+        results[row["project_id"]][index] += row["total"]
+
+    return {project_id: tuple(outcomes) for project_id, outcomes in results.items()}
+
+
+def build_project_usage_outcomes(start__stop, project):
+    return build_organization_usage_outcomes(start__stop, [project])[project.id]
 
 
 def get_calendar_range(ignore__stop_time, months):
@@ -426,15 +458,22 @@ def clean_calendar_data(project, series, start, stop, rollup, timestamp=None):
     return map(remove_invalid_values, clean_series(start, stop, rollup, series))
 
 
-def build_project_calendar_series(interval, project):
+def build_organization_calendar_series(interval, projects):
     start, stop = get_calendar_query_range(interval, 3)
 
     rollup = ONE_DAY
-    series = tsdb.get_range(tsdb.models.project, [project.id], start, stop, rollup=rollup)[
-        project.id
-    ]
+    series = tsdb.get_range(
+        tsdb.models.project, [project.id for project in projects], start, stop, rollup=rollup
+    )
+
+    return {
+        project.id: clean_calendar_data(project, series[project.id], start, stop, rollup)
+        for project in projects
+    }
 
-    return clean_calendar_data(project, series, start, stop, rollup)
+
+def build_project_calendar_series(interval, project):
+    return build_organization_calendar_series(interval, [project])[project.id]
 
 
 def build_report(fields):
@@ -483,6 +522,31 @@ Report, build_project_report, merge_reports = build_report(
 )
 
 
+def build_organization_reports(interval, projects):
+    """
+    Constructs the reports for a set of projects belonging to the same
+    organization, returning reports in the order that the projects were
+    provided.
+
+    Unlike ``build_project_report``, each field is computed for all projects
+    at once, so the number of TSDB, Snuba and database queries does not grow
+    with the number of projects.
+    """
+    projects = list(projects)
+    if not projects:
+        return []
+
+    columns = [
+        build_organization_series(interval, projects),
+        build_organization_aggregates(interval, projects),
+        build_organization_issue_summaries(interval, projects),
+        build_organization_usage_outcomes(interval, projects),
+        build_organization_calendar_series(interval, projects),
+    ]
+
+    return [Report(*[column[project.id] for column in columns]) for project in projects]
+
+
 class ReportBackend:
     def build(self, timestamp, duration, project):
         """
@@ -490,6 +554,13 @@ class ReportBackend:
         """
         return build_project_report(_to_interval(timestamp, duration), project)
 
+    def build_many(self, timestamp, duration, projects):
+        """
+        Constructs the reports for a set of projects in the same organization,
+        returning reports in the order that they were provided.
+        """
+        return build_organization_reports(_to_interval(timestamp, duration), projects)
+
     def prepare(self, timestamp, duration, organization):
         """
         Build and store reports for all projects in an organization.
@@ -503,6 +574,14 @@ class ReportBackend:
         """
         raise NotImplementedError
 
+    def fetch_organization_report(self, timestamp, duration, organization, projects):
+        """
+        Fetch the merged report for a set of projects in the organization, if
+        one was stored for exactly that set of projects when the reports were
+        prepared. Returns ``None`` otherwise.
+        """
+        return None
+
 
 class DummyReportBackend(ReportBackend):
     def prepare(self, timestamp, duration, organization):
@@ -510,12 +589,17 @@ class DummyReportBackend(ReportBackend):
 
     def fetch(self, timestamp, duration, organization, projects):
         assert all(project.organization_id == organization.id for project in projects)
-        return map(partial(self.build, timestamp, duration), projects)
+        return self.build_many(timestamp, duration, projects)
 
 
 class RedisReportBackend(ReportBackend):
     version = 1
 
+    # Hash field that holds the merged report of all of the organization's
+    # qualifying projects, alongside the per-project reports (which are keyed
+    # by project ID.)
+    organization_field = "organization"
+
     def __init__(self, cluster, ttl, namespace="r"):
         self.cluster = cluster
         self.ttl = ttl
@@ -535,17 +619,38 @@ class RedisReportBackend(ReportBackend):
 
         return Report(*json.loads(zlib.decompress(value)))
 
-    def prepare(self, timestamp, duration, organization):
-        reports = {}
-        for project in organization.project_set.all():
-            reports[project.id] = self.__encode(self.build(timestamp, duration, project))
+    def __encode_organization_report(self, project_ids, report):
+        return zlib.compress(json.dumps([sorted(project_ids), list(report)]).encode("utf-8"))
+
+    def __decode_organization_report(self, value):
+        if value is None:
+            return None
 
-        if not reports:
+        project_ids, report = json.loads(zlib.decompress(value))
+        return frozenset(project_ids), Report(*report)
+
+    def prepare(self, timestamp, duration, organization):
+        projects = list(organization.project_set.all())
+        if not projects:
             # XXX: HMSET requires at least one key/value pair, so we need to
             # protect ourselves here against organizations that were created
             # but haven't set up any projects yet.
             return
 
+        interval = _to_interval(timestamp, duration)
+        built = list(zip(projects, self.build_many(timestamp, duration, projects)))
+        reports = {project.id: self.__encode(report) for project, report in built}
+
+        # Most members see every project, so the merged report for all of the
+        # projects that qualify for delivery is computed once here rather than
+        # for each member.
+        qualifying = [item for item in built if has_valid_aggregates(interval, item)]
+        if qualifying:
+            reports[self.organization_field] = self.__encode_organization_report(
+                [project.id for project, report in qualifying],
+                reduce(merge_reports, [report for project, report in qualifying]),
+            )
+
         with self.cluster.map() as client:
             key = self.__make_key(timestamp, duration, organization)
             client.hmset(key, reports)
@@ -560,6 +665,22 @@ class RedisReportBackend(ReportBackend):
 
         return map(self.__decode, result.value)
 
+    def fetch_organization_report(self, timestamp, duration, organization, projects):
+        with self.cluster.map() as client:
+            result = client.hget(
+                self.__make_key(timestamp, duration, organization), self.organization_field
+            )
+
+        value = self.__decode_organization_report(result.value)
+        if value is None:
+            return None
+
+        project_ids, report = value
+        if project_ids != {project.id for project in projects}:
+            return None
+
+        return report
+
 
 backend = RedisReportBackend(redis.clusters.get("default"), 60 * 60 * 3)
 
@@ -634,7 +755,7 @@ class Duration(NamedTuple):
 durations = {(ONE_DAY * 7): Duration("weekly", "this week", "D")}
 
 
-def build_message(timestamp, duration, organization, user, reports):
+def build_message(timestamp, duration, organization, user, reports, report=None):
     start, stop = interval = _to_interval(timestamp, duration)
 
     duration_spec = durations[duration]
@@ -653,7 +774,7 @@ def build_message(timestamp, duration, organization, user, reports):
             "interval": {"start": date_format(start), "stop": date_format(stop)},
             "organization": organization,
             "personal": fetch_personal_statistics(interval, organization, user),
-            "report": to_context(organization, interval, reports),
+            "report": to_context(organization, interval, reports, report),
             "user": user,
         },
         headers={"X-SMTPAPI": json.dumps({"category": "organization_report_email"})},
@@ -742,7 +863,14 @@ def deliver_organization_user_report(timestamp, duration, organization_id, user_
         )
         return Skipped.NoReports
 
-    message = build_message(timestamp, duration, organization, user, reports)
+    message = build_message(
+        timestamp,
+        duration,
+        organization,
+        user,
+        reports,
+        backend.fetch_organization_report(timestamp, duration, organization, reports.keys()),
+    )
 
     if not dry_run:
         message.send()
@@ -854,8 +982,10 @@ def build_project_breakdown_series(reports):
     }
 
 
-def to_context(organization, interval, reports):
-    report = reduce(merge_reports, reports.values())
+def to_context(organization, interval, reports, report=None):
+    if report is None:
+        report = reduce(merge_reports, reports.values())
+
     series = [(to_datetime(timestamp), Point(*values)) for timestamp, values in report.series]
     return {
         "series": {
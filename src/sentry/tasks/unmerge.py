@@ -1,11 +1,12 @@
 import logging
 from collections import OrderedDict, defaultdict
 from functools import reduce
+from uuid import uuid4
 
 from django.db import transaction
 
-from sentry import eventstore, eventstream, similarity
-from sentry.app import tsdb
+from sentry import eventstore, eventstream, options, similarity
+from sentry.app import locks, tsdb
 from sentry.constants import DEFAULT_LOGGER_NAME, LOG_LEVELS_MAP
 from sentry.event_manager import generate_culprit
 from sentry.models import (
@@ -22,10 +23,16 @@ from sentry.models import (
     UserReport,
 )
 from sentry.tasks.base import instrumented_task
+from sentry.utils import json, redis
+from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.query import celery_run_batch_query
+from sentry.utils.retries import TimedRetryPolicy
 
 logger = logging.getLogger(__name__)
 
+# How long the state of a parallel unmerge is retained, in seconds.
+STATE_TTL = 60 * 60 * 24
+
 
 def cache(function):
     results = {}
@@ -172,61 +179,71 @@ def migrate_events(
         # then scan all events greater than that ID and migrate the ones
         # where necessary. (This still isn't even guaranteed to catch all
         # of the events due to processing latency, but it's a better shot.)
-        # Create a new destination group.
-        destination = Group.objects.create(
-            project_id=project.id,
-            short_id=project.next_short_id(),
-            **get_group_creation_attributes(caches, events),
+        (destination, eventstream_state) = create_destination(
+            caches, project, source_id, fingerprints, events, actor_id
         )
+    else:
+        # Update the existing destination group.
+        destination = Group.objects.get(id=destination_id)
+        destination.update(**get_group_backfill_attributes(caches, destination, events))
 
-        destination_id = destination.id
+    migrate_event_references(project, destination, events)
 
-        eventstream_state = eventstream.start_unmerge(
-            project.id, fingerprints, source_id, destination_id
-        )
+    return (destination.id, eventstream_state)
 
-        # Move the group hashes to the destination.
-        GroupHash.objects.filter(project_id=project.id, hash__in=fingerprints).update(
-            group=destination_id
-        )
 
-        # Create activity records for the source and destination group.
-        Activity.objects.create(
-            project_id=project.id,
-            group_id=destination_id,
-            type=Activity.UNMERGE_DESTINATION,
-            user_id=actor_id,
-            data={"fingerprints": fingerprints, "source_id": source_id},
-        )
+def create_destination(caches, project, source_id, fingerprints, events, actor_id):
+    # Create a new destination group.
+    destination = Group.objects.create(
+        project_id=project.id,
+        short_id=project.next_short_id(),
+        **get_group_creation_attributes(caches, events),
+    )
 
-        Activity.objects.create(
-            project_id=project.id,
-            group_id=source_id,
-            type=Activity.UNMERGE_SOURCE,
-            user_id=actor_id,
-            data={"fingerprints": fingerprints, "destination_id": destination_id},
-        )
-    else:
-        # Update the existing destination group.
-        destination = Group.objects.get(id=destination_id)
-        destination.update(**get_group_backfill_attributes(caches, destination, events))
+    destination_id = destination.id
 
-    event_id_set = {event.event_id for event in events}
+    eventstream_state = eventstream.start_unmerge(
+        project.id, fingerprints, source_id, destination_id
+    )
+
+    # Move the group hashes to the destination.
+    GroupHash.objects.filter(project_id=project.id, hash__in=fingerprints).update(
+        group=destination_id
+    )
+
+    # Create activity records for the source and destination group.
+    Activity.objects.create(
+        project_id=project.id,
+        group_id=destination_id,
+        type=Activity.UNMERGE_DESTINATION,
+        user_id=actor_id,
+        data={"fingerprints": fingerprints, "source_id": source_id},
+    )
+
+    Activity.objects.create(
+        project_id=project.id,
+        group_id=source_id,
+        type=Activity.UNMERGE_SOURCE,
+        user_id=actor_id,
+        data={"fingerprints": fingerprints, "destination_id": destination_id},
+    )
+
+    return (destination, eventstream_state)
 
+
+def migrate_event_references(project, destination, events):
     for event in events:
         event.group = destination
 
     event_id_set = {event.event_id for event in events}
 
     UserReport.objects.filter(project_id=project.id, event_id__in=event_id_set).update(
-        group_id=destination_id
+        group_id=destination.id
     )
     EventAttachment.objects.filter(project_id=project.id, event_id__in=event_id_set).update(
-        group_id=destination_id
+        group_id=destination.id
     )
 
-    return (destination.id, eventstream_state)
-
 
 def truncate_denormalizations(project, group):
     GroupRelease.objects.filter(group_id=group.id).delete()
@@ -268,7 +285,11 @@ def collect_group_environment_data(events):
 
 
 def repair_group_environment_data(caches, project, events):
-    for (group_id, env_name), first_release in collect_group_environment_data(events).items():
+    apply_group_environment_data(caches, project, collect_group_environment_data(events))
+
+
+def apply_group_environment_data(caches, project, data):
+    for (group_id, env_name), first_release in data.items():
         fields = {}
         if first_release:
             fields["first_release"] = caches["Release"](project.organization_id, first_release)
@@ -304,8 +325,9 @@ def get_environment_name(event):
     return Environment.get_name_or_default(event.get_tag("environment"))
 
 
-def collect_release_data(caches, project, events):
-    results = OrderedDict()
+def collect_release_data(caches, project, events, results=None):
+    if results is None:
+        results = OrderedDict()
 
     for event in events:
         release = event.get_tag("sentry:release")
@@ -321,7 +343,7 @@ def collect_release_data(caches, project, events):
 
         if key in results:
             first_seen, last_seen = results[key]
-            results[key] = (event.datetime, last_seen)
+            results[key] = (min(event.datetime, first_seen), max(event.datetime, last_seen))
         else:
             results[key] = (event.datetime, event.datetime)
 
@@ -343,6 +365,27 @@ def repair_group_release_data(caches, project, events):
             instance.update(first_seen=first_seen)
 
 
+def merge_group_release_data(project, release_data):
+    """\
+    Like ``repair_group_release_data``, but safe to call concurrently and in
+    any order: existing rows only ever have their first and last seen
+    timestamps widened.
+    """
+    for (group_id, environment, release_id), (first_seen, last_seen) in release_data.items():
+        instance, created = GroupRelease.objects.get_or_create(
+            project_id=project.id,
+            group_id=group_id,
+            environment=environment,
+            release_id=release_id,
+            defaults={"first_seen": first_seen, "last_seen": last_seen},
+        )
+
+        if not created:
+            queryset = GroupRelease.objects.filter(id=instance.id)
+            queryset.filter(first_seen__gt=first_seen).update(first_seen=first_seen)
+            queryset.filter(last_seen__lt=last_seen).update(last_seen=last_seen)
+
+
 def get_event_user_from_interface(value):
     return EventUser(
         ident=value.get("id"),
@@ -352,12 +395,15 @@ def get_event_user_from_interface(value):
     )
 
 
-def collect_tsdb_data(caches, project, events):
-    counters = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
-
-    sets = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
+def collect_tsdb_data(caches, project, events, results=None):
+    if results is None:
+        results = (
+            defaultdict(lambda: defaultdict(lambda: defaultdict(int))),
+            defaultdict(lambda: defaultdict(lambda: defaultdict(set))),
+            defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(int)))),
+        )
 
-    frequencies = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(int))))
+    counters, sets, frequencies = results
 
     for event in events:
         environment = caches["Environment"](project.organization_id, get_environment_name(event))
@@ -376,24 +422,23 @@ def collect_tsdb_data(caches, project, events):
 
         release = event.get_tag("sentry:release")
         if release:
-            # TODO: I'm also not sure if "environment" here is correct, see
-            # similar comment above during creation.
-            grouprelease = caches["GroupRelease"](
-                event.group_id,
-                get_environment_name(event),
-                caches["Release"](project.organization_id, release).id,
-            )
-
+            # The ``GroupRelease`` identifier is resolved when the data is
+            # written, since the row may not exist yet when this is collected.
             frequencies[event.datetime][tsdb.models.frequent_releases_by_group][event.group_id][
-                grouprelease.id
+                (
+                    get_environment_name(event),
+                    caches["Release"](project.organization_id, release).id,
+                )
             ] += 1
 
     return counters, sets, frequencies
 
 
 def repair_tsdb_data(caches, project, events):
-    counters, sets, frequencies = collect_tsdb_data(caches, project, events)
+    apply_tsdb_data(caches, *collect_tsdb_data(caches, project, events))
 
+
+def apply_tsdb_data(caches, counters, sets, frequencies):
     for timestamp, data in counters.items():
         for model, keys in data.items():
             for (key, environment_id), value in keys.items():
@@ -406,6 +451,18 @@ def repair_tsdb_data(caches, project, events):
                 tsdb.record(model, key, values, timestamp, environment_id=environment_id)
 
     for timestamp, data in frequencies.items():
+        releases = data.get(tsdb.models.frequent_releases_by_group)
+        if releases:
+            # TODO: I'm also not sure if "environment" here is correct, see
+            # similar comment above during creation.
+            data[tsdb.models.frequent_releases_by_group] = {
+                group_id: {
+                    caches["GroupRelease"](group_id, environment, release_id).id: count
+                    for (environment, release_id), count in items.items()
+                }
+                for group_id, items in releases.items()
+            }
+
         tsdb.record_frequency_multi(data.items(), timestamp)
 
 
@@ -441,6 +498,356 @@ def unlock_hashes(project_id, fingerprints):
     ).update(state=GroupHash.State.UNLOCKED)
 
 
+def get_state_client(state_key):
+    return redis.clusters.get("default").get_local_client_for_key(state_key)
+
+
+def get_event_key(event):
+    # Events are ordered by timestamp and event ID, consistent with the
+    # ordering used by ``celery_run_batch_query``.
+    return (to_timestamp(event.datetime), event.event_id)
+
+
+def collect_group_summary(events, summary=None):
+    """\
+    Summarize the events that are assigned to a group so that the group
+    attributes can be computed later without having all of the events at
+    hand. Summaries of disjoint sets of events can be combined with
+    ``merge_group_summaries``.
+    """
+    if summary is None:
+        summary = {"count": 0, "latest": None, "oldest": None, "oldest_release": None}
+
+    for event in events:
+        key = list(get_event_key(event))
+        summary["count"] += 1
+        if summary["latest"] is None or key > summary["latest"]:
+            summary["latest"] = key
+        if summary["oldest"] is None or key < summary["oldest"]:
+            summary["oldest"] = key
+        if event.get_tag("sentry:release") and (
+            summary["oldest_release"] is None or key < summary["oldest_release"]
+        ):
+            summary["oldest_release"] = key
+
+    return summary
+
+
+def merge_group_summaries(target, other):
+    if target is None:
+        return other
+    elif other is None:
+        return target
+
+    def pick(function, x, y):
+        values = [value for value in (x, y) if value is not None]
+        return function(values) if values else None
+
+    return {
+        "count": target["count"] + other["count"],
+        "latest": pick(max, target["latest"], other["latest"]),
+        "oldest": pick(min, target["oldest"], other["oldest"]),
+        "oldest_release": pick(min, target["oldest_release"], other["oldest_release"]),
+    }
+
+
+def get_group_summary_attributes(caches, project, group, summary, reset):
+    # The events that determine the group attributes are the latest event,
+    # the oldest event, and the oldest event that has a release. Replaying
+    # just those (in date-descending order) yields the same attributes as
+    # replaying all of them, except for the event count.
+    keys = sorted(
+        {
+            tuple(key)
+            for key in (summary["latest"], summary["oldest_release"], summary["oldest"])
+            if key is not None
+        },
+        reverse=True,
+    )
+    events = [
+        event
+        for event in (eventstore.get_event_by_id(project.id, event_id) for _, event_id in keys)
+        if event is not None
+    ]
+
+    # Events can be deleted between being summarized and being fetched here,
+    # so the timestamps are taken from the summary rather than the events.
+    timestamps = {}
+    if summary["oldest"] is not None:
+        timestamps["first_seen"] = timestamps["active_at"] = to_datetime(summary["oldest"][0])
+
+    if reset:
+        attributes = get_group_creation_attributes(caches, events) if events else {}
+        attributes.update(timestamps)
+        if summary["latest"] is not None:
+            attributes["last_seen"] = to_datetime(summary["latest"][0])
+        attributes["times_seen"] = summary["count"]
+        last_seen = attributes.get("last_seen", group.last_seen)
+    else:
+        attributes = get_group_backfill_attributes(caches, group, events) if events else {}
+        attributes.update(timestamps)
+        attributes["times_seen"] = group.times_seen + summary["count"]
+        last_seen = group.last_seen
+
+    attributes["score"] = Group.calculate_score(attributes["times_seen"], last_seen)
+    return attributes
+
+
+def collect_group_environment_summary(events, results=None):
+    """\
+    Like ``collect_group_environment_data``, but keeps the event key for
+    each first release so that results for different time slices can be
+    combined.
+    """
+    if results is None:
+        results = {}
+
+    for event in events:
+        key = "{}:{}".format(event.group_id, get_environment_name(event))
+        value = [*get_event_key(event), event.get_tag("sentry:release")]
+        if key not in results or value[:2] < results[key][:2]:
+            results[key] = value
+
+    return results
+
+
+def get_or_create_destination(
+    caches, project, source_id, fingerprints, events, actor_id, state_key
+):
+    client = get_state_client(state_key)
+
+    # Slices that encounter events for the destination before it has been
+    # created race to create it, so only the first one to get here does.
+    lock = locks.get(f"{state_key}:destination", duration=60)
+    with TimedRetryPolicy(60)(lock.acquire):
+        destination_id = client.hget(state_key, "destination_id")
+        if destination_id is not None:
+            return Group.objects.get(id=int(destination_id))
+
+        (destination, eventstream_state) = create_destination(
+            caches, project, source_id, fingerprints, events, actor_id
+        )
+
+        client.hmset(
+            state_key,
+            {
+                "destination_id": destination.id,
+                "destination_created": 1,
+                "eventstream_state": json.dumps(eventstream_state),
+            },
+        )
+
+    return destination
+
+
+def start_parallel_unmerge(
+    project, source, destination_id, fingerprints, actor_id, slices, batch_size, eventstream_state
+):
+    def get_boundary_event(orderby):
+        events = eventstore.get_unfetched_events(
+            filter=eventstore.Filter(project_ids=[project.id], group_ids=[source.id]),
+            limit=1,
+            orderby=orderby,
+            referrer="unmerge",
+        )
+        return events[0] if events else None
+
+    latest_event = get_boundary_event(["-timestamp", "-event_id"])
+    oldest_event = get_boundary_event(["timestamp", "event_id"])
+
+    # If there are no events to process, there is nothing to migrate.
+    if latest_event is None or oldest_event is None:
+        unlock_hashes(project.id, fingerprints)
+        logger.warning("Unmerge complete (eventstream state: %s)", eventstream_state)
+        if eventstream_state:
+            eventstream.end_unmerge(eventstream_state)
+
+        return destination_id
+
+    # Event timestamps have a resolution of one second, so the slice
+    # boundaries are aligned to whole seconds.
+    start = int(to_timestamp(oldest_event.datetime))
+    stop = int(to_timestamp(latest_event.datetime)) + 1
+    width = -(-(stop - start) // slices)
+    boundaries = [(i, min(i + width, stop)) for i in range(start, stop, width)]
+
+    state_key = "unmerge:{}:{}:{}".format(project.id, source.id, uuid4().hex)
+    state = {"remaining": len(boundaries), "slices": len(boundaries)}
+    if destination_id is not None:
+        state["destination_id"] = destination_id
+    if eventstream_state:
+        state["eventstream_state"] = json.dumps(eventstream_state)
+
+    client = get_state_client(state_key)
+    client.hmset(state_key, state)
+    client.expire(state_key, STATE_TTL)
+
+    for index, (slice_start, slice_stop) in enumerate(boundaries):
+        unmerge_slice.delay(
+            project.id,
+            source.id,
+            fingerprints,
+            actor_id,
+            state_key,
+            index,
+            slice_start,
+            slice_stop,
+            batch_size=batch_size,
+        )
+
+
+@instrumented_task(name="sentry.tasks.unmerge.unmerge_slice", queue="unmerge")
+def unmerge_slice(
+    project_id,
+    source_id,
+    fingerprints,
+    actor_id,
+    state_key,
+    index,
+    start,
+    stop,
+    batch_size=500,
+):
+    """\
+    Migrate the events of the source group that were received within the
+    ``[start, stop)`` time range. Denormalizations that can be combined in
+    any order are accumulated over all batches and written once the slice
+    is complete, while the ones that depend on event order are summarized
+    in the migration state and applied by ``finish_unmerge``.
+    """
+    caches = get_caches()
+
+    project = caches["Project"](project_id)
+
+    client = get_state_client(state_key)
+    destination_id = client.hget(state_key, "destination_id")
+    destination = Group.objects.get(id=int(destination_id)) if destination_id else None
+
+    summaries = {"source": None, "destination": None}
+    environments = {}
+    release_data = OrderedDict()
+    tsdb_data = None
+
+    last_event = None
+    while True:
+        last_event, events = celery_run_batch_query(
+            filter=eventstore.Filter(
+                project_ids=[project_id],
+                group_ids=[source_id],
+                start=to_datetime(start),
+                end=to_datetime(stop),
+            ),
+            batch_size=batch_size,
+            state=last_event,
+            referrer="unmerge",
+        )
+
+        if not events:
+            break
+
+        source_events = []
+        destination_events = []
+
+        for event in events:
+            (
+                destination_events if get_fingerprint(event) in fingerprints else source_events
+            ).append(event)
+
+        if destination_events:
+            if destination is None:
+                destination = get_or_create_destination(
+                    caches,
+                    project,
+                    source_id,
+                    fingerprints,
+                    destination_events,
+                    actor_id,
+                    state_key,
+                )
+
+            migrate_event_references(project, destination, destination_events)
+
+        for name, role_events in (("source", source_events), ("destination", destination_events)):
+            if role_events:
+                summaries[name] = collect_group_summary(role_events, summaries[name])
+
+        collect_group_environment_summary(events, environments)
+        collect_release_data(caches, project, events, release_data)
+        tsdb_data = collect_tsdb_data(caches, project, events, tsdb_data)
+
+        # Features can only be recorded for the events of one group at a time.
+        for role_events in (source_events, destination_events):
+            if role_events:
+                similarity.record(project, role_events)
+
+    merge_group_release_data(project, release_data)
+    if tsdb_data is not None:
+        apply_tsdb_data(caches, *tsdb_data)
+
+    client.hset(
+        state_key,
+        f"slice:{index}",
+        json.dumps({"summaries": summaries, "environments": environments}),
+    )
+
+    if client.hincrby(state_key, "remaining", -1) == 0:
+        finish_unmerge.delay(project_id, source_id, fingerprints, state_key)
+
+
+@instrumented_task(name="sentry.tasks.unmerge.finish_unmerge", queue="unmerge")
+def finish_unmerge(project_id, source_id, fingerprints, state_key):
+    caches = get_caches()
+
+    project = caches["Project"](project_id)
+
+    client = get_state_client(state_key)
+    destination_id, destination_created, eventstream_state, slices = client.hmget(
+        state_key, ["destination_id", "destination_created", "eventstream_state", "slices"]
+    )
+
+    summaries = {"source": None, "destination": None}
+    environments = {}
+    for value in client.hmget(state_key, [f"slice:{i}" for i in range(int(slices))]):
+        data = json.loads(value)
+        for name, summary in data["summaries"].items():
+            summaries[name] = merge_group_summaries(summaries[name], summary)
+
+        for key, value in data["environments"].items():
+            if key not in environments or value[:2] < environments[key][:2]:
+                environments[key] = value
+
+    if summaries["source"] is not None:
+        source = Group.objects.get(project_id=project_id, id=source_id)
+        source.update(
+            **get_group_summary_attributes(caches, project, source, summaries["source"], True)
+        )
+
+    if summaries["destination"] is not None:
+        destination = Group.objects.get(id=int(destination_id))
+        destination.update(
+            **get_group_summary_attributes(
+                caches, project, destination, summaries["destination"], bool(destination_created)
+            )
+        )
+
+    environment_data = OrderedDict()
+    for key, (timestamp, event_id, release) in environments.items():
+        group_id, environment = key.split(":", 1)
+        environment_data[(int(group_id), environment)] = release
+
+    apply_group_environment_data(caches, project, environment_data)
+
+    unlock_hashes(project_id, fingerprints)
+    eventstream_state = json.loads(eventstream_state) if eventstream_state else None
+    logger.warning("Unmerge complete (eventstream state: %s)", eventstream_state)
+    if eventstream_state:
+        eventstream.end_unmerge(eventstream_state)
+
+    client.delete(state_key)
+
+    return int(destination_id) if destination_id else None
+
+
 @instrumented_task(name="sentry.tasks.unmerge", queue="unmerge")
 def unmerge(
     project_id,
@@ -466,6 +873,19 @@ def unmerge(
         fingerprints = lock_hashes(project_id, source_id, fingerprints)
         truncate_denormalizations(project, source)
 
+        slices = options.get("unmerge.parallel-slices")
+        if slices > 1:
+            return start_parallel_unmerge(
+                project,
+                source,
+                destination_id,
+                fingerprints,
+                actor_id,
+                slices,
+                batch_size,
+                eventstream_state,
+            )
+
     last_event, events = celery_run_batch_query(
         filter=eventstore.Filter(project_ids=[project_id], group_ids=[source.id]),
         batch_size=batch_size,
@@ -430,11 +430,14 @@ class BaseTSDB(Service):
         raise NotImplementedError
 
     def get_distinct_counts_union(
-        self, model, keys, start, end=None, rollup=None, environment_id=None
+        self, model, keys, start, end=None, rollup=None, environment_id=None, merge_locally=None
     ):
         """
         Count the total number of distinct items across multiple counters
         during a time range.
+
+        ``merge_locally`` chooses how backends that can merge counters in
+        process or in their store do so; other backends ignore it.
         """
         raise NotImplementedError
 
@@ -0,0 +1,492 @@
+from array import array
+from collections import Counter, defaultdict
+from functools import partial
+from hashlib import blake2b
+
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+
+from sentry.tsdb.base import BaseTSDB
+from sentry.utils import hyperloglog
+
+_new_counter_column = partial(array, "q")
+
+
+def _get_count(column, row):
+    if column is None or row is None or row >= len(column):
+        return 0
+    return column[row]
+
+
+def _add_count(column, row, count):
+    if row >= len(column):
+        column.frombytes(bytes(column.itemsize * (row + 1 - len(column))))
+    column[row] += count
+
+
+def _hash(value):
+    return int.from_bytes(blake2b(force_bytes(value), digest_size=8).digest(), "little")
+
+
+class RingBuffer:
+    """
+    The values of all keys of a model at one rollup, stored as a ring of
+    ``size`` columns.  Every column holds the values of one rollup interval,
+    indexed by the row of a key.  Once the ring wraps around, the column of
+    the oldest interval is reused and writes to intervals older than the one
+    a column holds are dropped.
+    """
+
+    def __init__(self, size, column_type):
+        self.size = size
+        self.column_type = column_type
+        self.epochs = array("q", [-1]) * size
+        self.columns = [column_type() for _ in range(size)]
+
+    def __iter__(self):
+        for epoch, column in zip(self.epochs, self.columns):
+            if epoch != -1:
+                yield column
+
+    def get(self, epoch):
+        slot = epoch % self.size
+        if self.epochs[slot] != epoch:
+            return None
+        return self.columns[slot]
+
+    def get_or_create(self, epoch):
+        slot = epoch % self.size
+        current = self.epochs[slot]
+        if current == epoch:
+            return self.columns[slot]
+        if current > epoch:
+            return None
+        self.epochs[slot] = epoch
+        column = self.columns[slot] = self.column_type()
+        return column
+
+
+class ColumnarTSDB(BaseTSDB):
+    """
+    A columnar in-memory time-series storage.
+
+    Every model keeps a ring buffer per rollup with one column per rollup
+    interval, so memory use is bounded by the number of keys and the
+    retention of the rollups.  Simple counters are stored in integer arrays,
+    distinct counters as sets of hashes which are converted to HyperLogLogs
+    once they grow past ``sketch_sparse_limit`` elements, and frequency
+    tables as counters.
+
+    Data is not persisted, so this is only suitable for tests, benchmarks and
+    single node installations.
+    """
+
+    sketch_precision = 12
+    sketch_sparse_limit = 256
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush()
+
+    def flush(self):
+        # self.rows[model][(key, environment_id)] = row
+        self.rows = defaultdict(dict)
+
+        # self.counters[model][rollup].get(epoch)[row] = count
+        self.counters = defaultdict(partial(self._make_buffers, _new_counter_column))
+
+        # self.sketches[model][rollup].get(epoch)[row] = set of hashes or registers
+        self.sketches = defaultdict(partial(self._make_buffers, dict))
+
+        # self.frequencies[model][rollup].get(epoch)[row] = Counter()
+        self.frequencies = defaultdict(partial(self._make_buffers, dict))
+
+    def _make_buffers(self, column_type):
+        return {
+            rollup: RingBuffer(max_values + 1, column_type)
+            for rollup, max_values in self.rollups.items()
+        }
+
+    def _get_row(self, model, key, environment_id):
+        rows = self.rows[model]
+        row = rows.get((key, environment_id))
+        if row is None:
+            row = rows[(key, environment_id)] = len(rows)
+        return row
+
+    def _find_row(self, model, key, environment_id):
+        return self.rows[model].get((key, environment_id))
+
+    def _get_write_columns(self, buffers, timestamp):
+        if timestamp is None:
+            timestamp = timezone.now()
+
+        columns = []
+        for rollup, buffer in buffers.items():
+            column = buffer.get_or_create(self.normalize_to_rollup(timestamp, rollup))
+            if column is not None:
+                columns.append(column)
+        return columns
+
+    def _get_read_columns(self, buffers, rollup, series):
+        buffer = buffers.get(rollup)
+        return [
+            (
+                timestamp,
+                buffer.get(self.normalize_ts_to_rollup(timestamp, rollup))
+                if buffer is not None
+                else None,
+            )
+            for timestamp in series
+        ]
+
+    def _get_delete_columns(self, buffers, rollups):
+        for rollup, series in rollups.items():
+            buffer = buffers.get(rollup)
+            if buffer is None:
+                continue
+            for timestamp in series:
+                column = buffer.get(self.normalize_to_rollup(timestamp, rollup))
+                if column is not None:
+                    yield column
+
+    def _get_rows(self, model, keys, environment_ids):
+        return [
+            row
+            for row in (
+                self._find_row(model, key, environment_id)
+                for key in keys
+                for environment_id in environment_ids
+            )
+            if row is not None
+        ]
+
+    def incr(self, model, key, timestamp=None, count=1, environment_id=None):
+        self.validate_arguments([model], [environment_id])
+
+        rows = [self._get_row(model, key, e) for e in {environment_id, None}]
+        for column in self._get_write_columns(self.counters[model], timestamp):
+            for row in rows:
+                _add_count(column, row, count)
+
+    def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
+        environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
+            [None]
+        )
+
+        self.validate_arguments([model], environment_ids)
+
+        for environment_id in environment_ids:
+            destination_row = self._get_row(model, destination, environment_id)
+            rows = self._get_rows(model, sources, [environment_id])
+            for buffer in self.counters[model].values():
+                for column in buffer:
+                    for row in rows:
+                        count = _get_count(column, row)
+                        if count:
+                            _add_count(column, destination_row, count)
+                            column[row] = 0
+
+    def delete(self, models, keys, start=None, end=None, timestamp=None, environment_ids=None):
+        environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
+            [None]
+        )
+
+        self.validate_arguments(models, environment_ids)
+
+        rollups = self.get_active_series(start, end, timestamp)
+
+        for model in models:
+            rows = self._get_rows(model, keys, environment_ids)
+            for column in self._get_delete_columns(self.counters[model], rollups):
+                for row in rows:
+                    if row < len(column):
+                        column[row] = 0
+
+    def get_range(
+        self, model, keys, start, end, rollup=None, environment_ids=None, use_cache=False
+    ):
+        self.validate_arguments([model], environment_ids if environment_ids is not None else [None])
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        columns = self._get_read_columns(self.counters[model], rollup, series)
+
+        results = {}
+        for key in keys:
+            rows = [
+                self._find_row(model, key, environment_id)
+                for environment_id in (environment_ids or [None])
+            ]
+            results[key] = [
+                (timestamp, sum(_get_count(column, row) for row in rows))
+                for timestamp, column in columns
+            ]
+        return results
+
+    def _add_hashes(self, sketch, hashes):
+        if sketch is None:
+            sketch = set()
+
+        if isinstance(sketch, set):
+            sketch.update(hashes)
+            if len(sketch) <= self.sketch_sparse_limit:
+                return sketch
+            hashes, sketch = sketch, hyperloglog.new_registers(self.sketch_precision)
+
+        for value in hashes:
+            hyperloglog.add(sketch, value)
+        return sketch
+
+    def _merge_sketches(self, sketch, other):
+        if sketch is None:
+            return other
+        if isinstance(other, set):
+            return self._add_hashes(sketch, other)
+        if isinstance(sketch, set):
+            return self._add_hashes(other, sketch)
+        hyperloglog.merge_registers(sketch, other)
+        return sketch
+
+    def _count_union(self, sketches):
+        hashes = set()
+        registers = None
+        for sketch in sketches:
+            if sketch is None:
+                continue
+            elif isinstance(sketch, set):
+                hashes.update(sketch)
+            elif registers is None:
+                registers = bytearray(sketch)
+            else:
+                hyperloglog.merge_registers(registers, sketch)
+
+        if registers is None:
+            return len(hashes)
+
+        for value in hashes:
+            hyperloglog.add(registers, value)
+        return hyperloglog.count(registers)
+
+    def record(self, model, key, values, timestamp=None, environment_id=None):
+        self.validate_arguments([model], [environment_id])
+
+        hashes = {_hash(value) for value in values}
+        rows = [self._get_row(model, key, e) for e in {environment_id, None}]
+        for column in self._get_write_columns(self.sketches[model], timestamp):
+            for row in rows:
+                column[row] = self._add_hashes(column.get(row), hashes)
+
+    def get_distinct_counts_series(
+        self, model, keys, start, end=None, rollup=None, environment_id=None
+    ):
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        columns = self._get_read_columns(self.sketches[model], rollup, series)
+
+        results = {}
+        for key in keys:
+            row = self._find_row(model, key, environment_id)
+            results[key] = [
+                (timestamp, self._count_union([column.get(row) if column is not None else None]))
+                for timestamp, column in columns
+            ]
+        return results
+
+    def get_distinct_counts_totals(
+        self, model, keys, start, end=None, rollup=None, environment_id=None, use_cache=False
+    ):
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        columns = [
+            column
+            for _, column in self._get_read_columns(self.sketches[model], rollup, series)
+            if column is not None
+        ]
+
+        results = {}
+        for key in keys:
+            row = self._find_row(model, key, environment_id)
+            results[key] = self._count_union(column.get(row) for column in columns)
+        return results
+
+    def get_distinct_counts_union(
+        self, model, keys, start, end=None, rollup=None, environment_id=None, merge_locally=None
+    ):
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        columns = [
+            column
+            for _, column in self._get_read_columns(self.sketches[model], rollup, series)
+            if column is not None
+        ]
+        rows = self._get_rows(model, keys, [environment_id])
+
+        return self._count_union(column.get(row) for column in columns for row in rows)
+
+    def merge_distinct_counts(
+        self, model, destination, sources, timestamp=None, environment_ids=None
+    ):
+        environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
+            [None]
+        )
+
+        self.validate_arguments([model], environment_ids)
+
+        for environment_id in environment_ids:
+            destination_row = self._get_row(model, destination, environment_id)
+            rows = self._get_rows(model, sources, [environment_id])
+            for buffer in self.sketches[model].values():
+                for column in buffer:
+                    for row in rows:
+                        sketch = column.pop(row, None)
+                        if sketch is not None:
+                            column[destination_row] = self._merge_sketches(
+                                column.get(destination_row), sketch
+                            )
+
+    def delete_distinct_counts(
+        self, models, keys, start=None, end=None, timestamp=None, environment_ids=None
+    ):
+        environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
+            [None]
+        )
+
+        self.validate_arguments(models, environment_ids)
+
+        rollups = self.get_active_series(start, end, timestamp)
+
+        for model in models:
+            rows = self._get_rows(model, keys, environment_ids)
+            for column in self._get_delete_columns(self.sketches[model], rollups):
+                for row in rows:
+                    column.pop(row, None)
+
+    def record_frequency_multi(self, requests, timestamp=None, environment_id=None):
+        self.validate_arguments([model for model, request in requests], [environment_id])
+
+        for model, request in requests:
+            columns = self._get_write_columns(self.frequencies[model], timestamp)
+            for key, items in request.items():
+                items = {k: float(v) for k, v in items.items()}
+                for row in [self._get_row(model, key, e) for e in {environment_id, None}]:
+                    for column in columns:
+                        scores = column.get(row)
+                        if scores is None:
+                            scores = column[row] = Counter()
+                        scores.update(items)
+
+    def _get_frequency_series(self, model, keys, start, end, rollup, environment_id):
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        columns = self._get_read_columns(self.frequencies[model], rollup, series)
+
+        results = {}
+        for key in keys:
+            row = self._find_row(model, key, environment_id)
+            results[key] = [
+                (timestamp, column.get(row) if column is not None else None)
+                for timestamp, column in columns
+            ]
+        return results
+
+    def get_most_frequent(
+        self, model, keys, start, end=None, rollup=None, limit=None, environment_id=None
+    ):
+        self.validate_arguments([model], [environment_id])
+
+        results = {}
+        for key, series in self._get_frequency_series(
+            model, keys, start, end, rollup, environment_id
+        ).items():
+            result = Counter()
+            for timestamp, scores in series:
+                if scores is not None:
+                    result.update(scores)
+            results[key] = result.most_common(limit)
+
+        return results
+
+    def get_most_frequent_series(
+        self, model, keys, start, end=None, rollup=None, limit=None, environment_id=None
+    ):
+        self.validate_arguments([model], [environment_id])
+
+        return {
+            key: [
+                (timestamp, dict(scores.most_common(limit)) if scores is not None else {})
+                for timestamp, scores in series
+            ]
+            for key, series in self._get_frequency_series(
+                model, keys, start, end, rollup, environment_id
+            ).items()
+        }
+
+    def get_frequency_series(self, model, items, start, end=None, rollup=None, environment_id=None):
+        self.validate_arguments([model], [environment_id])
+
+        results = {}
+        for key, series in self._get_frequency_series(
+            model, list(items.keys()), start, end, rollup, environment_id
+        ).items():
+            members = items[key]
+            results[key] = [
+                (timestamp, {k: scores.get(k, 0.0) if scores is not None else 0.0 for k in members})
+                for timestamp, scores in series
+            ]
+
+        return results
+
+    def get_frequency_totals(self, model, items, start, end=None, rollup=None, environment_id=None):
+        self.validate_arguments([model], [environment_id])
+
+        results = {}
+
+        for key, series in self.get_frequency_series(
+            model, items, start, end, rollup, environment_id
+        ).items():
+            result = results[key] = {}
+            for timestamp, scores in series:
+                for member, score in scores.items():
+                    result[member] = result.get(member, 0.0) + score
+
+        return results
+
+    def merge_frequencies(self, model, destination, sources, timestamp=None, environment_ids=None):
+        environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
+            [None]
+        )
+
+        self.validate_arguments([model], environment_ids)
+
+        for environment_id in environment_ids:
+            destination_row = self._get_row(model, destination, environment_id)
+            rows = self._get_rows(model, sources, [environment_id])
+            for buffer in self.frequencies[model].values():
+                for column in buffer:
+                    for row in rows:
+                        scores = column.pop(row, None)
+                        if scores is None:
+                            continue
+                        if destination_row in column:
+                            column[destination_row].update(scores)
+                        else:
+                            column[destination_row] = scores
+
+    def delete_frequencies(
+        self, models, keys, start=None, end=None, timestamp=None, environment_ids=None
+    ):
+        environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
+            [None]
+        )
+
+        self.validate_arguments(models, environment_ids)
+
+        rollups = self.get_active_series(start, end, timestamp)
+
+        for model in models:
+            rows = self._get_rows(model, keys, environment_ids)
+            for column in self._get_delete_columns(self.frequencies[model], rollups):
+                for row in rows:
+                    column.pop(row, None)
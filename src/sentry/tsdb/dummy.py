@@ -45,7 +45,7 @@ class DummyTSDB(BaseTSDB):
         return {k: 0 for k in keys}
 
     def get_distinct_counts_union(
-        self, model, keys, start, end=None, rollup=None, environment_id=None
+        self, model, keys, start, end=None, rollup=None, environment_id=None, merge_locally=None
     ):
         self.validate_arguments([model], [environment_id])
         return 0
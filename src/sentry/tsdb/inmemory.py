@@ -139,7 +139,7 @@ class InMemoryTSDB(BaseTSDB):
         return results
 
     def get_distinct_counts_union(
-        self, model, keys, start, end=None, rollup=None, environment_id=None
+        self, model, keys, start, end=None, rollup=None, environment_id=None, merge_locally=None
     ):
         self.validate_arguments([model], [environment_id])
 
@@ -12,6 +12,7 @@ from django.utils.encoding import force_bytes
 from pkg_resources import resource_string
 
 from sentry.tsdb.base import BaseTSDB
+from sentry.utils import hyperloglog
 from sentry.utils.compat import crc32, map, zip
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.redis import SentryScript, check_cluster_versions, get_cluster_from_options
@@ -87,6 +88,11 @@ class RedisTSDB(BaseTSDB):
             ...
         }
 
+    Unions of distinct counters are merged with ``PFMERGE`` into temporary
+    keys by default. With ``merge_distinct_counts_locally``, the raw
+    HyperLogLogs are fetched and merged in process instead, which avoids
+    writing to Redis on reads. This can also be chosen per call.
+
     Frequency tables are modeled using two data structures:
 
         * top-N index: a sorted set containing the most frequently observed items,
@@ -112,6 +118,7 @@ class RedisTSDB(BaseTSDB):
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+        self.merge_distinct_counts_locally = options.pop("merge_distinct_counts_locally", False)
         super().__init__(**options)
 
     def validate(self):
@@ -463,7 +470,7 @@ class RedisTSDB(BaseTSDB):
         return {key: value.value for key, value in responses.items()}
 
     def get_distinct_counts_union(
-        self, model, keys, start, end=None, rollup=None, environment_id=None
+        self, model, keys, start, end=None, rollup=None, environment_id=None, merge_locally=None
     ):
         self.validate_arguments([model], [environment_id])
 
@@ -486,6 +493,21 @@ class RedisTSDB(BaseTSDB):
             ]
 
         cluster, _ = self.get_cluster(environment_id)
+
+        if merge_locally is None:
+            merge_locally = self.merge_distinct_counts_locally
+
+        if merge_locally:
+            with cluster.fanout() as client:
+                responses = [client.target_key(key).mget(expand_key(key)) for key in keys]
+
+            registers = hyperloglog.new_registers()
+            for response in responses:
+                for value in response.value:
+                    if value is not None:
+                        hyperloglog.merge(registers, value)
+            return hyperloglog.count(registers)
+
         router = cluster.get_router()
 
         def map_key_to_host(hosts, key):
@@ -646,6 +668,42 @@ class RedisTSDB(BaseTSDB):
         prefix = self.make_key(model, rollup, timestamp, key, environment_id)
         return map(operator.methodcaller("format", prefix), ("{}:i", "{}:e"))
 
+    def execute_frequency_commands(self, cluster, commands):
+        """
+        Runs frequency table commands with a single script call per host.
+
+        ``commands`` maps routing keys to lists of ``(keys, arguments)`` for
+        the ``cmsketch.lua`` script. Returns a mapping of the routing keys to
+        lists of the results of their commands.
+        """
+        router = cluster.get_router()
+        batches = defaultdict(list)
+        for key, cmds in commands.items():
+            batches[router.get_host_for_key(key)].append(key)
+
+        # The commands of all routing keys of a host are combined into a single
+        # ``BATCH`` script call, which is routed by any of those keys.
+        requests = {}
+        for routing_keys in batches.values():
+            keys = []
+            arguments = ["BATCH"]
+            for key in routing_keys:
+                for ks, args in commands[key]:
+                    keys.extend(ks)
+                    arguments.append(len(ks))
+                    arguments.append(len(args))
+                    arguments.extend(args)
+            requests[routing_keys[0]] = [(CountMinScript, keys, arguments)]
+
+        responses = cluster.execute_commands(requests)
+
+        results = {}
+        for routing_keys in batches.values():
+            values = iter(responses[routing_keys[0]][0].value)
+            for key in routing_keys:
+                results[key] = [next(values) for _ in commands[key]]
+        return results
+
     def record_frequency_multi(self, requests, timestamp=None, environment_id=None):
         self.validate_arguments([model for model, request in requests], [environment_id])
 
@@ -668,15 +726,17 @@ class RedisTSDB(BaseTSDB):
                     # Figure out all of the keys we need to be incrementing, as
                     # well as their expiration policies.
                     for rollup, max_values in self.rollups.items():
+                        chunk = []
                         for environment_id in environment_ids:
-                            chunk = self.make_frequency_table_keys(
-                                model, rollup, ts, key, environment_id
+                            chunk.extend(
+                                self.make_frequency_table_keys(
+                                    model, rollup, ts, key, environment_id
+                                )
                             )
-                            keys.extend(chunk)
+                        keys.extend(chunk)
 
                         expiry = self.calculate_expiry(rollup, max_values, timestamp)
-                        for k in chunk:
-                            expirations[k] = expiry
+                        expirations.setdefault(expiry, []).extend(chunk)
 
                     arguments = ["INCR"] + list(self.DEFAULT_SKETCH_PARAMETERS)
                     for member, score in items.items():
@@ -685,12 +745,12 @@ class RedisTSDB(BaseTSDB):
                     # Since we're essentially merging dictionaries, we need to
                     # append this to any value that already exists at the key.
                     cmds = commands.setdefault(key, [])
-                    cmds.append((CountMinScript, keys, arguments))
-                    for k, t in expirations.items():
-                        cmds.append(("EXPIREAT", k, t))
+                    cmds.append((keys, arguments))
+                    for expiry, ks in expirations.items():
+                        cmds.append((ks, ["EXPIREAT", expiry]))
 
             try:
-                cluster.execute_commands(commands)
+                self.execute_frequency_commands(cluster, commands)
             except Exception:
                 if durable:
                     raise
@@ -716,13 +776,13 @@ class RedisTSDB(BaseTSDB):
                 ks.extend(
                     self.make_frequency_table_keys(model, rollup, timestamp, key, environment_id)
                 )
-            commands[key] = [(CountMinScript, ks, arguments)]
+            commands[key] = [(ks, arguments)]
 
         results = {}
         cluster, _ = self.get_cluster(environment_id)
-        for key, responses in cluster.execute_commands(commands).items():
+        for key, responses in self.execute_frequency_commands(cluster, commands).items():
             results[key] = [
-                (member.decode("utf-8"), float(score)) for member, score in responses[0].value
+                (member.decode("utf-8"), float(score)) for member, score in responses[0]
             ]
 
         return results
@@ -745,7 +805,6 @@ class RedisTSDB(BaseTSDB):
         for key in keys:
             commands[key] = [
                 (
-                    CountMinScript,
                     self.make_frequency_table_keys(model, rollup, timestamp, key, environment_id),
                     arguments,
                 )
@@ -753,11 +812,11 @@ class RedisTSDB(BaseTSDB):
             ]
 
         def unpack_response(response):
-            return {item.decode("utf-8"): float(score) for item, score in response.value}
+            return {item.decode("utf-8"): float(score) for item, score in response}
 
         results = {}
         cluster, _ = self.get_cluster(environment_id)
-        for key, responses in cluster.execute_commands(commands).items():
+        for key, responses in self.execute_frequency_commands(cluster, commands).items():
             results[key] = zip(series, map(unpack_response, responses))
 
         return results
@@ -787,16 +846,16 @@ class RedisTSDB(BaseTSDB):
                     self.make_frequency_table_keys(model, rollup, timestamp, key, environment_id)
                 )
 
-            commands[key] = [(CountMinScript, ks, arguments + members)]
+            commands[key] = [(ks, arguments + members)]
 
         results = {}
 
         cluster, _ = self.get_cluster(environment_id)
-        for key, responses in cluster.execute_commands(commands).items():
+        for key, responses in self.execute_frequency_commands(cluster, commands).items():
             members = items[key]
 
             chunk = results[key] = []
-            for timestamp, scores in zip(series, responses[0].value):
+            for timestamp, scores in zip(series, responses[0]):
                 chunk.append((timestamp, dict(zip(members, map(float, scores)))))
 
         return results
@@ -449,7 +449,7 @@ class SnubaTSDB(BaseTSDB):
         )
 
     def get_distinct_counts_union(
-        self, model, keys, start, end=None, rollup=None, environment_id=None
+        self, model, keys, start, end=None, rollup=None, environment_id=None, merge_locally=None
     ):
         return self.get_data(
             model,
@@ -1,7 +1,13 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
 from django.utils.functional import empty
 
 from sentry.utils.compat import zip
 
+_scope = threading.local()
+
 
 def extract_lazy_object(lo):
     """
@@ -73,3 +79,41 @@ def cached(cache, function, *args, **kwargs):
         rv = cache[key] = function(*args)
 
     return rv
+
+
+@contextmanager
+def cache_scope():
+    """Memoizes functions decorated with ``scope_cached`` until the block
+    exits.  Nested blocks share the cache of the outermost block.
+    """
+    if getattr(_scope, "cache", None) is not None:
+        yield
+        return
+
+    _scope.cache = {}
+    try:
+        yield
+    finally:
+        _scope.cache = None
+
+
+def scope_cached(function):
+    """Memoizes a pure ``function`` while a ``cache_scope`` is active, for
+    instance to share work between grouping one event with several configs.
+    Outside of a scope the function is called as usual.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        cache = getattr(_scope, "cache", None)
+        if cache is None:
+            return function(*args, **kwargs)
+
+        key = (function, args, tuple(sorted(kwargs.items())))
+        try:
+            return cache[key]
+        except KeyError:
+            rv = cache[key] = function(*args, **kwargs)
+            return rv
+
+    return wrapper
@@ -1,3 +1,5 @@
+import re
+
 import sentry_relay
 
 
@@ -13,3 +15,156 @@ def glob_match(
         path_normalize=path_normalize,
         allow_newline=allow_newline,
     )
+
+
+_untranslated_chars = frozenset("[]{}\\")
+
+
+def _is_ascii(value):
+    # ``str.isascii`` is not available before Python 3.7.
+    try:
+        value.encode("ascii")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def translate_glob(pat, doublestar=False, path_normalize=False):
+    """
+    Translates a glob into a regular expression that agrees with `glob_match`
+    for ASCII values.  Returns `None` for patterns using syntax that is not
+    translated (character classes, alternations, escapes and non-ASCII
+    characters), which must be matched with `glob_match` instead.
+    """
+    if path_normalize:
+        pat = pat.replace("\\", "/")
+    if not _is_ascii(pat) or not _untranslated_chars.isdisjoint(pat):
+        return None
+
+    any_char = "[^/]" if doublestar else "."
+    # Tokens are either a regular expression or one of the recursive
+    # wildcards, which are resolved once the whole glob has been read.
+    tokens = []
+    i = 0
+    while i < len(pat):
+        char = pat[i]
+        i += 1
+        if char == "?":
+            tokens.append(any_char)
+        elif char != "*":
+            tokens.append(re.escape(char))
+        elif pat[i : i + 1] != "*":
+            tokens.append(any_char + "*")
+        else:
+            # A double star only recurses as a whole path segment, otherwise
+            # it is the same as two single stars.
+            i += 1
+            next_char = pat[i : i + 1]
+            if not tokens:
+                if next_char in ("", "/"):
+                    tokens.append("**/")
+                    i += 1
+                    continue
+            elif pat[i - 3] == "/" and next_char in ("", "/"):
+                i += 1
+                previous = tokens.pop()
+                if previous in ("**/", "/**"):
+                    tokens.append(previous)
+                else:
+                    tokens.append("/**" if not next_char else "/**/")
+                continue
+            tokens.append(any_char + "*")
+            tokens.append(any_char + "*")
+
+    if tokens == ["**/"]:
+        return ".*"
+    recursive = {"**/": "(?:/?|.*/)", "/**": "/.*", "/**/": "(?:/|/.*/)"}
+    return "".join(recursive.get(token, token) for token in tokens)
+
+
+class GlobSet:
+    """
+    Matches values against a list of glob patterns sharing the same options.
+
+    Patterns without wildcards are looked up by value, and the remaining
+    patterns that can be translated are combined into a single regular
+    expression, so values that match none of them are rejected with one
+    search.  Patterns that cannot be translated, and values that are not
+    ASCII, are matched with `glob_match`.
+    """
+
+    def __init__(
+        self, patterns, doublestar=False, ignorecase=False, path_normalize=False, allow_newline=True
+    ):
+        self.patterns = list(patterns)
+        self.options = {
+            "doublestar": doublestar,
+            "ignorecase": ignorecase,
+            "path_normalize": path_normalize,
+            "allow_newline": allow_newline,
+        }
+
+        flags = re.ASCII
+        if ignorecase:
+            flags |= re.IGNORECASE
+        if allow_newline:
+            flags |= re.DOTALL
+
+        self._literals = {}
+        self._translated = []
+        self._untranslated = []
+        for index, pat in enumerate(self.patterns):
+            regex = translate_glob(pat, doublestar=doublestar, path_normalize=path_normalize)
+            if regex is None:
+                self._untranslated.append(index)
+            elif "*" in pat or "?" in pat:
+                self._translated.append((index, re.compile(regex, flags)))
+            else:
+                self._literals.setdefault(self._normalize(pat), []).append(index)
+
+        self._combined = None
+        if self._translated:
+            self._combined = re.compile(
+                "|".join("(?:%s)" % regex.pattern for _, regex in self._translated), flags
+            )
+
+    def _normalize(self, value):
+        if self.options["path_normalize"]:
+            value = value.replace("\\", "/")
+        if self.options["ignorecase"]:
+            value = value.lower()
+        return value
+
+    def match(self, value):
+        """Returns the indexes of all patterns matching the value, in order."""
+        if value is None:
+            value = ""
+        if isinstance(value, bytes):
+            # ``bytes.isascii`` is not available before Python 3.7.
+            try:
+                value = value.decode("ascii")
+            except UnicodeDecodeError:
+                pass
+        if not isinstance(value, str) or not _is_ascii(value):
+            return [
+                index
+                for index, pat in enumerate(self.patterns)
+                if glob_match(value, pat, **self.options)
+            ]
+
+        rv = list(self._literals.get(self._normalize(value), ()))
+        if self._combined is not None:
+            normalized = value.replace("\\", "/") if self.options["path_normalize"] else value
+            if self._combined.fullmatch(normalized) is not None:
+                rv.extend(index for index, regex in self._translated if regex.fullmatch(normalized))
+
+        if self._untranslated:
+            rv.extend(
+                index
+                for index in self._untranslated
+                if glob_match(value, self.patterns[index], **self.options)
+            )
+
+        if len(rv) > 1:
+            rv.sort()
+        return rv
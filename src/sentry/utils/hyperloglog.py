@@ -0,0 +1,194 @@
+"""
+Utilities for merging and counting Redis HyperLogLogs outside of Redis.
+
+Redis stores HyperLogLogs as strings, so their raw representation can be
+fetched with ``GET``.  A HyperLogLog is a 16 byte header (the ``HYLL`` magic,
+the encoding and the cached cardinality) followed by 16384 registers, either
+in the dense encoding (6 bits per register) or in the sparse encoding (run
+length encoded opcodes).  See ``hyperloglog.c`` in the Redis sources for the
+details of both encodings.
+
+Registers are represented as a ``bytearray`` with one register per byte.
+Registers with a precision other than the one used by Redis can be used to
+count in process, but can not be merged with Redis HyperLogLogs.
+"""
+
+import math
+from collections import Counter
+
+__all__ = ["new_registers", "add", "merge", "merge_registers", "count"]
+
+HLL_P = 14
+HLL_Q = 64 - HLL_P
+HLL_REGISTERS = 1 << HLL_P
+HLL_HEADER_SIZE = 16
+HLL_DENSE_SIZE = HLL_HEADER_SIZE + (HLL_REGISTERS * 6 + 7) // 8
+
+HLL_DENSE = 0
+HLL_SPARSE = 1
+
+HLL_ALPHA_INF = 0.5 / math.log(2)
+
+
+def new_registers(precision=HLL_P):
+    """Returns the registers of an empty HyperLogLog."""
+    return bytearray(1 << precision)
+
+
+def add(registers, value):
+    """
+    Adds an element to ``registers``, given its (uniformly distributed) 64 bit
+    hash ``value``.
+    """
+    precision = len(registers).bit_length() - 1
+    index = value & (len(registers) - 1)
+    value = value >> precision | 1 << (64 - precision)
+    rank = (value & -value).bit_length()
+    if registers[index] < rank:
+        registers[index] = rank
+
+
+def _to_int(data):
+    return int.from_bytes(data, "little")
+
+
+def merge_registers(registers, other):
+    """Merges ``other`` into ``registers`` (in place)."""
+    # Registers are compared all at once as the bytes of two integers, which
+    # is much faster than comparing them one by one. Registers are less than
+    # 128, so setting the high bit of every register of ``registers`` before
+    # subtracting ``other`` leaves that bit set exactly where the register of
+    # ``registers`` is the larger one, without borrowing from the next byte.
+    size = len(registers)
+    ones = _to_int(b"\x01" * size)
+    a = _to_int(registers)
+    b = _to_int(other)
+    mask = (((a | ones << 7) - b) >> 7 & ones) * 0xFF
+    registers[:] = (a & mask | b & (ones * 0xFF ^ mask)).to_bytes(size, "little")
+
+
+def _make_table(function):
+    return bytes(function(b) for b in range(256))
+
+
+# Every 3 bytes of the dense encoding hold 4 registers, with the least
+# significant bits first. These tables extract the parts of the registers
+# that each byte holds.
+_DENSE_TABLES = (
+    _make_table(lambda b: b & 63),
+    _make_table(lambda b: b >> 6),
+    _make_table(lambda b: (b & 15) << 2),
+    _make_table(lambda b: b >> 4),
+    _make_table(lambda b: (b & 3) << 4),
+    _make_table(lambda b: b >> 2),
+)
+
+
+def _get_dense_registers(value):
+    if len(value) != HLL_DENSE_SIZE:
+        raise ValueError("Invalid dense HyperLogLog length")
+
+    data = bytes(memoryview(value)[HLL_HEADER_SIZE:])
+    b0, b1, b2 = data[0::3], data[1::3], data[2::3]
+    t0, t1, t2, t3, t4, t5 = _DENSE_TABLES
+    size = len(b0)
+
+    # The parts of registers that are split across two bytes don't overlap,
+    # so they can be combined as integers.
+    rv = bytearray(HLL_REGISTERS)
+    rv[0::4] = b0.translate(t0)
+    rv[1::4] = (_to_int(b0.translate(t1)) | _to_int(b1.translate(t2))).to_bytes(size, "little")
+    rv[2::4] = (_to_int(b1.translate(t3)) | _to_int(b2.translate(t4))).to_bytes(size, "little")
+    rv[3::4] = b2.translate(t5)
+    return rv
+
+
+def _merge_sparse(registers, value):
+    index = 0
+    position = HLL_HEADER_SIZE
+    size = len(value)
+    while position < size:
+        opcode = value[position]
+        if opcode & 0xC0 == 0:
+            # ZERO: a run of 1-64 empty registers.
+            index += (opcode & 0x3F) + 1
+            position += 1
+        elif opcode & 0xC0 == 0x40:
+            # XZERO: a run of 1-16384 empty registers.
+            index += ((opcode & 0x3F) << 8 | value[position + 1]) + 1
+            position += 2
+        else:
+            # VAL: a run of 1-4 registers with a value of 1-32.
+            register = ((opcode >> 2) & 0x1F) + 1
+            end = index + (opcode & 0x3) + 1
+            if end > HLL_REGISTERS:
+                break
+            for i in range(index, end):
+                if registers[i] < register:
+                    registers[i] = register
+            index = end
+            position += 1
+
+    if index != HLL_REGISTERS:
+        raise ValueError("Invalid sparse HyperLogLog")
+
+
+def merge(registers, value):
+    """
+    Merges the raw Redis representation of a HyperLogLog into ``registers``
+    (in place), which is equivalent to ``PFMERGE``.
+    """
+    if len(value) < HLL_HEADER_SIZE or value[:4] != b"HYLL":
+        raise ValueError("Invalid HyperLogLog")
+
+    encoding = value[4]
+    if encoding == HLL_SPARSE:
+        _merge_sparse(registers, value)
+    elif encoding == HLL_DENSE:
+        merge_registers(registers, _get_dense_registers(value))
+    else:
+        raise ValueError("Unknown HyperLogLog encoding")
+
+
+def _sigma(x):
+    if x == 1.0:
+        return math.inf
+    y = 1.0
+    z = x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if previous == z:
+            return z
+
+
+def _tau(x):
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y = 1.0
+    z = 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if previous == z:
+            return z / 3
+
+
+def count(registers):
+    """
+    Estimates the cardinality of ``registers`` with the estimator used by
+    ``PFCOUNT`` (since Redis 5.0).
+    """
+    histogram = Counter(registers)
+    m = len(registers)
+    q = 64 - (m.bit_length() - 1)
+    z = m * _tau((m - histogram[q + 1]) / m)
+    for j in range(q, 0, -1):
+        z += histogram[j]
+        z *= 0.5
+    z += m * _sigma(histogram[0] / m)
+    return int(math.floor(HLL_ALPHA_INF * m * m / z + 0.5))
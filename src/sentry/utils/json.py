@@ -6,11 +6,13 @@
 
 import datetime
 import decimal
+import re
 import uuid
 from enum import Enum
 from typing import Any
 
 import sentry_sdk
+from django.conf import settings
 from django.utils.encoding import force_text
 from django.utils.functional import Promise
 from django.utils.safestring import mark_safe
@@ -19,6 +21,11 @@ from simplejson import JSONDecodeError, JSONEncoder, _default_decoder  # NOQA
 
 from bitfield.types import BitHandler
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def better_default_encoder(o):
     if isinstance(o, uuid.UUID):
@@ -89,16 +96,136 @@ _default_escaped_encoder = JSONEncoderForHTML(
 JSONData = Any  # https://github.com/python/typing/issues/182
 
 
+class SimplejsonBackend:
+    name = "simplejson"
+
+    def dump(self, value, fp):
+        for chunk in _default_encoder.iterencode(value):
+            fp.write(chunk)
+
+    def dumps(self, value):
+        return _default_encoder.encode(value)
+
+    def loads(self, value):
+        return _default_decoder.decode(value)
+
+
+class OrjsonBackend:
+    """
+    Encodes and decodes with ``orjson``, which is several times faster than
+    ``simplejson``. Values that ``orjson`` can't handle the same way (such as
+    integers beyond 64 bits, lone surrogates, or ``NaN`` literals in the
+    input) are passed to ``simplejson`` instead.
+
+    The encoded output differs from ``simplejson`` only in that non-ASCII
+    characters are written as UTF-8 rather than escaped, which is still valid
+    JSON.
+    """
+
+    name = "orjson"
+
+    # ``orjson`` decodes integers beyond 64 bits as floats rather than
+    # rejecting them, so documents that may contain one are decoded with
+    # ``simplejson`` to preserve their precision. A run of digits is found by
+    # mapping every digit to ``0`` and everything else to a space, which is
+    # much cheaper than searching with a regular expression.
+    digits_table = bytes(ord("0") if 48 <= i <= 57 else ord(" ") for i in range(256))
+    long_number = b"0" * 19
+
+    # ``orjson`` serializes UUIDs natively in their hyphenated form, without
+    # calling the default encoder, while ``better_default_encoder`` writes
+    # them in hex. Output that may contain such a UUID is encoded with
+    # ``simplejson`` instead, which is much cheaper to detect in the output
+    # than by searching the value for UUIDs.
+    hyphenated_uuid = re.compile(rb'"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"')
+
+    def __init__(self):
+        self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def default(self, o):
+        # ``simplejson`` encodes named tuples as objects, and decimals as
+        # numbers, by default. Decimals are written as they would be decoded
+        # by ``simplejson``: integers if they have no fractional digits, and
+        # floats otherwise.
+        if isinstance(o, tuple) and hasattr(o, "_asdict"):
+            return o._asdict()
+        elif isinstance(o, decimal.Decimal):
+            if not o.is_finite():
+                raise TypeError(repr(o) + " is not JSON serializable")
+            return int(o) if o.as_tuple().exponent >= 0 else float(o)
+        return better_default_encoder(o)
+
+    def dump(self, value, fp):
+        fp.write(self.dumps(value))
+
+    def dumps(self, value):
+        try:
+            data = orjson.dumps(value, default=self.default, option=self.options)
+        except TypeError:
+            return _default_encoder.encode(value)
+
+        if self.hyphenated_uuid.search(data) is not None:
+            return _default_encoder.encode(value)
+        return data.decode("utf-8")
+
+    def loads(self, value):
+        try:
+            data = value.encode("utf-8") if isinstance(value, str) else value
+        except UnicodeEncodeError:
+            data = None
+
+        if data is not None and self.long_number not in data.translate(self.digits_table):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+
+        return _default_decoder.decode(value)
+
+
+backends = {"simplejson": SimplejsonBackend}
+if orjson is not None:
+    backends["orjson"] = OrjsonBackend
+
+
+def get_backend(name):
+    """
+    Returns an instance of the named backend, or of the ``simplejson``
+    backend if the named one isn't available.
+    """
+    return backends.get(name, SimplejsonBackend)()
+
+
+_default_backends = {}
+
+
+def get_default_backend():
+    """
+    Returns the backend selected with the ``SENTRY_JSON_BACKEND`` setting,
+    which is used by ``dump``, ``dumps``, ``load`` and ``loads``. Until the
+    settings are configured, ``simplejson`` is used. HTML-safe encoding
+    always uses ``simplejson``.
+    """
+    name = (
+        getattr(settings, "SENTRY_JSON_BACKEND", "simplejson")
+        if settings.configured
+        else "simplejson"
+    )
+    backend = _default_backends.get(name)
+    if backend is None:
+        backend = _default_backends[name] = get_backend(name)
+    return backend
+
+
 def dump(value: JSONData, fp, **kwargs):
-    for chunk in _default_encoder.iterencode(value):
-        fp.write(chunk)
+    get_default_backend().dump(value, fp)
 
 
 def dumps(value: JSONData, escape: bool = False, **kwargs) -> str:
     # Legacy use. Do not use. Use dumps_htmlsafe
     if escape:
         return _default_escaped_encoder.encode(value)
-    return _default_encoder.encode(value)
+    return get_default_backend().dumps(value)
 
 
 def load(fp, **kwargs) -> JSONData:
@@ -107,7 +234,7 @@ def load(fp, **kwargs) -> JSONData:
 
 def loads(value: str, **kwargs) -> JSONData:
     with sentry_sdk.start_span(op="sentry.utils.json.loads"):
-        return _default_decoder.decode(value)
+        return get_default_backend().loads(value)
 
 
 def dumps_htmlsafe(value):
@@ -1,26 +1,32 @@
-__all__ = ["timing", "incr"]
+__all__ = ["timing", "incr", "gauge"]
 
 
 import functools
 import logging
 import time
 from contextlib import contextmanager
-from queue import Queue
 from random import random
-from threading import Thread, local
+from threading import local
 from typing import Mapping, Optional
 
 from django.conf import settings
 
+from sentry.metrics.buffer import MetricsBuffer
+
 metrics_skip_all_internal = getattr(settings, "SENTRY_METRICS_SKIP_ALL_INTERNAL", False)
 metrics_skip_internal_prefixes = tuple(settings.SENTRY_METRICS_SKIP_INTERNAL_PREFIXES)
 
 _THREAD_LOCAL_TAGS = local()
 _GLOBAL_TAGS = []
+# Incremented whenever the tags of all threads change, so that the merged
+# tags cached by each thread can be invalidated.
+_GLOBAL_TAGS_VERSION = 0
 
 
 @contextmanager
 def global_tags(_all_threads=False, **tags):
+    global _GLOBAL_TAGS_VERSION
+
     if _all_threads:
         stack = _GLOBAL_TAGS
     else:
@@ -30,13 +36,28 @@ def global_tags(_all_threads=False, **tags):
             stack = _THREAD_LOCAL_TAGS.stack
 
     stack.append(tags)
+    _THREAD_LOCAL_TAGS.merged = None
+    if _all_threads:
+        _GLOBAL_TAGS_VERSION += 1
     try:
         yield
     finally:
         stack.pop()
+        _THREAD_LOCAL_TAGS.merged = None
+        if _all_threads:
+            _GLOBAL_TAGS_VERSION += 1
 
 
 def _get_current_global_tags():
+    """
+    Returns the tags of all enclosing ``global_tags`` blocks. The dictionary
+    is cached until the tags change, so it must not be modified.
+    """
+    version = _GLOBAL_TAGS_VERSION
+    merged = getattr(_THREAD_LOCAL_TAGS, "merged", None)
+    if merged is not None and merged[0] == version:
+        return merged[1]
+
     rv = {}
 
     for tags in _GLOBAL_TAGS:
@@ -45,9 +66,20 @@ def _get_current_global_tags():
     for tags in getattr(_THREAD_LOCAL_TAGS, "stack", None) or ():
         rv.update(tags)
 
+    _THREAD_LOCAL_TAGS.merged = (version, rv)
     return rv
 
 
+def _merge_tags(tags):
+    # Only metrics with tags of their own need a new dictionary.
+    current_tags = _get_current_global_tags()
+    if not tags:
+        return current_tags
+    if not current_tags:
+        return tags
+    return {**current_tags, **tags}
+
+
 def get_default_backend():
     from sentry.utils.imports import import_string
 
@@ -59,6 +91,23 @@ def get_default_backend():
 backend = get_default_backend()
 
 
+def get_default_buffer():
+    if not settings.SENTRY_METRICS_FLUSH_INTERVAL:
+        return None
+
+    return MetricsBuffer(
+        backend.flush_buffer,
+        name="backend",
+        flush_interval=settings.SENTRY_METRICS_FLUSH_INTERVAL,
+        max_keys=settings.SENTRY_METRICS_BUFFER_MAX_KEYS,
+    )
+
+
+# Metrics are sampled by the backend unless they are buffered. Buffered metrics
+# are all aggregated, since they are sent in bulk anyway.
+buffer = get_default_buffer()
+
+
 def _get_key(key):
     prefix = settings.SENTRY_METRICS_PREFIX
     if prefix:
@@ -77,35 +126,35 @@ def _sampled_value(value, sample_rate):
 
 
 class InternalMetrics:
+    """
+    Records metrics in the ``internal`` TSDB model.  Increments are summed in
+    process and written with one bulk call every second.
+    """
+
     def __init__(self):
-        self._started = False
-
-    def _start(self):
-        self.q = q = Queue()
-
-        def worker():
-            from sentry import tsdb
-
-            while True:
-                key, instance, tags, amount, sample_rate = q.get()
-                amount = _sampled_value(amount, sample_rate)
-                if instance:
-                    full_key = f"{key}.{instance}"
-                else:
-                    full_key = key
-                try:
-                    tsdb.incr(tsdb.models.internal, full_key, count=amount)
-                except Exception:
-                    logger = logging.getLogger("sentry.errors")
-                    logger.exception("Unable to incr internal metric")
-                finally:
-                    q.task_done()
-
-        t = Thread(target=worker)
-        t.setDaemon(True)
-        t.start()
-
-        self._started = True
+        self._buffer = MetricsBuffer(
+            self._flush,
+            name="internal",
+            flush_interval=1,
+            max_keys=settings.SENTRY_METRICS_BUFFER_MAX_KEYS,
+        )
+
+    def _flush(self, counters, timings):
+        from sentry import tsdb
+
+        items = []
+        for key, instance, tags, amount in counters:
+            if instance:
+                full_key = f"{key}.{instance}"
+            else:
+                full_key = key
+            items.append((tsdb.models.internal, full_key, {"count": amount}))
+
+        try:
+            tsdb.incr_multi(items)
+        except Exception:
+            logger = logging.getLogger("sentry.errors")
+            logger.exception("Unable to incr internal metric")
 
     def incr(
         self,
@@ -115,9 +164,8 @@ class InternalMetrics:
         amount=1,
         sample_rate=settings.SENTRY_METRICS_SAMPLE_RATE,
     ):
-        if not self._started:
-            self._start()
-        self.q.put((key, instance, tags, amount, sample_rate))
+        # Tags are not stored in TSDB, so they are not part of the series.
+        self._buffer.incr(key, instance, None, _sampled_value(amount, sample_rate))
 
 
 internal = InternalMetrics()
@@ -131,9 +179,7 @@ def incr(
     skip_internal: bool = True,
     sample_rate: float = settings.SENTRY_METRICS_SAMPLE_RATE,
 ) -> None:
-    current_tags = _get_current_global_tags()
-    if tags is not None:
-        current_tags.update(tags)
+    current_tags = _merge_tags(tags)
 
     should_send_internal = (
         not metrics_skip_all_internal
@@ -146,21 +192,39 @@ def incr(
         internal.incr(key, instance, current_tags, amount, sample_rate)
 
     try:
-        backend.incr(key, instance, current_tags, amount, sample_rate)
-        if should_send_internal:
-            backend.incr("internal_metrics.incr", key, None, 1, sample_rate)
+        if buffer is not None:
+            buffer.incr(key, instance, current_tags, amount)
+            if should_send_internal:
+                buffer.incr("internal_metrics.incr", key, None, 1)
+        else:
+            backend.incr(key, instance, current_tags, amount, sample_rate)
+            if should_send_internal:
+                backend.incr("internal_metrics.incr", key, None, 1, sample_rate)
     except Exception:
         logger = logging.getLogger("sentry.errors")
         logger.exception("Unable to record backend metric")
 
 
 def timing(key, value, instance=None, tags=None, sample_rate=settings.SENTRY_METRICS_SAMPLE_RATE):
-    current_tags = _get_current_global_tags()
-    if tags is not None:
-        current_tags.update(tags)
+    current_tags = _merge_tags(tags)
 
     try:
-        backend.timing(key, value, instance, current_tags, sample_rate)
+        if buffer is not None:
+            buffer.timing(key, value, instance, current_tags)
+        else:
+            backend.timing(key, value, instance, current_tags, sample_rate)
+    except Exception:
+        logger = logging.getLogger("sentry.errors")
+        logger.exception("Unable to record backend metric")
+
+
+def gauge(key, value, instance=None, tags=None, sample_rate=settings.SENTRY_METRICS_SAMPLE_RATE):
+    # Gauges are levels that are only worth recording when they change, so
+    # they are sent directly instead of being aggregated by the buffer.
+    current_tags = _merge_tags(tags)
+
+    try:
+        backend.gauge(key, value, instance, current_tags, sample_rate)
     except Exception:
         logger = logging.getLogger("sentry.errors")
         logger.exception("Unable to record backend metric")
@@ -168,7 +232,7 @@ def timing(key, value, instance=None, tags=None, sample_rate=settings.SENTRY_MET
 
 @contextmanager
 def timer(key, instance=None, tags=None, sample_rate=settings.SENTRY_METRICS_SAMPLE_RATE):
-    current_tags = _get_current_global_tags()
+    current_tags = dict(_get_current_global_tags())
     if tags is not None:
         current_tags.update(tags)
 
@@ -222,8 +222,12 @@ def bulk_delete_objects(
             params.append(value)
 
     for column, value in filters.items():
-        query.append(f"{quote_name(column)} = %s")
-        params.append(value)
+        if column.endswith("__in"):
+            query.append(f"{quote_name(column[:-4])} = any(%s)")
+            params.append(list(value))
+        else:
+            query.append(f"{quote_name(column)} = %s")
+            params.append(value)
 
     query = """
         delete from %(table)s
@@ -252,3 +256,30 @@ def bulk_delete_objects(
         )
 
     return has_more
+
+
+def bulk_delete_objects_by_id(model, id_list, transaction_id=None, logger=None):
+    """
+    Deletes all rows of ``model`` whose primary key is in ``id_list`` with a
+    single statement. Like ``bulk_delete_objects`` this bypasses Django's
+    cascades, so callers are responsible for removing dependent rows first.
+    """
+    if not id_list:
+        return 0
+
+    connection = connections[router.db_for_write(model)]
+
+    cursor = connection.cursor()
+    cursor.execute("delete from %s where id = any(%%s)" % (model._meta.db_table,), [list(id_list)])
+
+    if logger is not None and _leaf_re.search(model.__name__) is None:
+        logger.info(
+            "object.delete.bulk_executed",
+            extra={
+                "model": model.__name__,
+                "transaction_id": transaction_id,
+                "count": cursor.rowcount,
+            },
+        )
+
+    return cursor.rowcount
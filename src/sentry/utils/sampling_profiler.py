@@ -0,0 +1,186 @@
+"""
+A low overhead sampling profiler for long running processes.
+
+A background thread periodically captures the stacks of all other threads of
+the process and aggregates them in the collapsed stack format understood by
+flamegraph tools (one ``frame;frame;frame count`` line per unique stack).
+Aggregated stacks are written to local disk on an interval.
+
+The profiler is switched on at runtime through the ``profiling.sampler.targets``
+option, which lists the process classes to sample (e.g. ``web``,
+``ingest-consumer``, ``post-process-forwarder``, ``worker`` or
+``worker:<queue>`` for the workers of a single Celery queue).  Processes call
+``start_sampling_profiler`` with their classes on startup; the profiler stays
+idle until one of them is targeted.
+
+Samples are prefixed with the stage the sampled thread is in, which is set with
+``profiling_stage`` around Celery tasks and consumer stages.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from time import sleep, time
+
+logger = logging.getLogger(__name__)
+
+# How often the profiler re-reads its options, in seconds.
+OPTIONS_CHECK_INTERVAL = 10
+
+# Samples deeper than this are truncated at the root.
+MAX_STACK_DEPTH = 128
+
+_stages = {}
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+@contextmanager
+def profiling_stage(name):
+    """
+    Tags all samples of the current thread taken within the block with
+    ``name``. Stages do not nest, the innermost stage is reported.
+    """
+    ident = threading.get_ident()
+    previous = _stages.get(ident)
+    _stages[ident] = name
+    try:
+        yield
+    finally:
+        if previous is None:
+            _stages.pop(ident, None)
+        else:
+            _stages[ident] = previous
+
+
+def _get_frame_label(code, labels, module):
+    label = labels.get(code)
+    if label is None:
+        label = labels[code] = f"{module}:{code.co_name}"
+    return label
+
+
+class SamplingProfiler:
+    def __init__(self, process_classes):
+        self.process_classes = tuple(process_classes)
+        self.pid = os.getpid()
+        self.stacks = {}
+        self.samples = 0
+        self.__labels = {}
+        self.__thread = None
+
+    def start(self):
+        self.__thread = threading.Thread(
+            target=self.run, name="sentry-sampling-profiler", daemon=True
+        )
+        self.__thread.start()
+
+    def get_config(self):
+        """
+        Returns the ``(interval, flush_interval, output_dir)`` to sample with,
+        or ``None`` if none of the process classes are targeted.
+        """
+        from sentry import options
+
+        targets = options.get("profiling.sampler.targets")
+        if not any(process_class in targets for process_class in self.process_classes):
+            return None
+
+        return (
+            options.get("profiling.sampler.interval"),
+            options.get("profiling.sampler.flush-interval"),
+            options.get("profiling.sampler.output-dir")
+            or os.path.join(tempfile.gettempdir(), "sentry-profiles"),
+        )
+
+    def sample(self):
+        own_ident = threading.get_ident()
+        labels = self.__labels
+        stacks = self.stacks
+
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(
+                    _get_frame_label(frame.f_code, labels, frame.f_globals.get("__name__", "?"))
+                )
+                frame = frame.f_back
+
+            stage = _stages.get(ident)
+            if stage is not None:
+                stack.append(stage)
+
+            stack.reverse()
+            key = ";".join(stack)
+            stacks[key] = stacks.get(key, 0) + 1
+
+        self.samples += 1
+
+    def flush(self, output_dir):
+        stacks, self.stacks = self.stacks, {}
+        if not stacks:
+            return None
+
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(
+            output_dir, f"{self.process_classes[0]}-{self.pid}-{int(time() * 1000)}.collapsed"
+        )
+        with open(path + ".tmp", "w") as f:
+            for stack, count in stacks.items():
+                f.write(f"{stack} {count}\n")
+        os.replace(path + ".tmp", path)
+        return path
+
+    def run(self):
+        config = None
+        next_check = next_flush = 0
+
+        while True:
+            try:
+                now = time()
+                if now >= next_check:
+                    previous, config = config, self.get_config()
+                    next_check = now + OPTIONS_CHECK_INTERVAL
+                    if previous is None and config is not None:
+                        next_flush = now + config[1]
+                    elif previous is not None and config is None:
+                        self.flush(previous[2])
+
+                if config is None:
+                    sleep(OPTIONS_CHECK_INTERVAL)
+                    continue
+
+                interval, flush_interval, output_dir = config
+                self.sample()
+                if now >= next_flush:
+                    self.flush(output_dir)
+                    next_flush = now + flush_interval
+
+                sleep(interval)
+            except Exception:
+                logger.exception("sampling_profiler.error")
+                self.stacks = {}
+                sleep(OPTIONS_CHECK_INTERVAL)
+
+
+def start_sampling_profiler(*process_classes):
+    """
+    Starts the sampling profiler of the current process, which samples while
+    any of ``process_classes`` is targeted by the ``profiling.sampler.targets``
+    option.  Safe to call in forked children, which get their own profiler.
+    """
+    global _profiler
+
+    with _profiler_lock:
+        if _profiler is not None and _profiler.pid == os.getpid():
+            return _profiler
+        _profiler = SamplingProfiler(process_classes)
+        _profiler.start()
+        return _profiler
@@ -1,10 +1,15 @@
+import codecs
 import functools
 import logging
 import os
 import re
+import threading
 import time
+import uuid
+import weakref
 from collections import OrderedDict, namedtuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime, timedelta
@@ -23,6 +28,7 @@ from sentry_sdk import Hub
 from snuba_sdk.legacy import json_to_snql
 from snuba_sdk.query import Query
 
+from sentry import options
 from sentry.models import (
     Environment,
     Group,
@@ -36,7 +42,7 @@ from sentry.models import (
 from sentry.net.http import connection_from_url
 from sentry.snuba.dataset import Dataset
 from sentry.snuba.events import Columns
-from sentry.utils import json, metrics
+from sentry.utils import json, metrics, redis
 from sentry.utils.compat import map
 from sentry.utils.dates import outside_retention_with_modified_start, to_timestamp
 from sentry.utils.snql import SNQLOption, should_use_snql
@@ -327,6 +333,138 @@ _snuba_pool = connection_from_url(
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
 
 
+def get_referrer_config(referrers, referrer):
+    """
+    Returns the key and value of the entry in a mapping of referrers that
+    applies to the referrer, or ``(None, None)`` if none does. Keys ending
+    with a period match all referrers starting with them.
+    """
+    if not referrer:
+        return None, None
+
+    if referrer in referrers:
+        return referrer, referrers[referrer]
+
+    for prefix, value in referrers.items():
+        if prefix.endswith(".") and referrer.startswith(prefix):
+            return prefix, value
+
+    return None, None
+
+
+QUERY_PRIORITIES = {"interactive": 0, "background": 1}
+
+QuerySlot = namedtuple("QuerySlot", ["budget_key"])
+
+
+class QueryScheduler:
+    """
+    Decides when the queries of a process may be sent to Snuba.
+
+    At most ``limit`` queries run at once. Queries that are waiting start in
+    order of their referrer's priority class and then in the order they were
+    requested, so interactive queries are sent before background ones. A
+    referrer can also be given a budget of concurrent queries, which is
+    shared by all referrers matching the same key of the
+    ``snuba.query-scheduler.referrers`` option, for example::
+
+        {"tsdb-modelid:": {"priority": "background", "budget": 2}}
+
+    If ``snuba.query-scheduler.adaptive-concurrency`` is enabled, the limit
+    is halved whenever Snuba reports that it is overloaded, and grows back
+    by one for each round of successful queries.
+    """
+
+    def __init__(self, max_concurrency, min_concurrency=1, decrease_interval=1.0):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.decrease_interval = decrease_interval
+        self.limit = float(max_concurrency)
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+        self.running = 0
+        self.running_by_key = {}
+        self.waiting = []
+        self.sequence = 0
+
+    def get_policy(self, referrer):
+        key, config = get_referrer_config(options.get("snuba.query-scheduler.referrers"), referrer)
+        config = config or {}
+        priority = config.get("priority", "interactive")
+        return (
+            priority if priority in QUERY_PRIORITIES else "interactive",
+            key,
+            config.get("budget", self.max_concurrency),
+        )
+
+    def can_start(self, entry):
+        _, _, budget_key, budget = entry
+        return self.running_by_key.get(budget_key, 0) < budget
+
+    def acquire(self, referrer: Optional[str]) -> QuerySlot:
+        """
+        Blocks until a query with the referrer may be sent, and returns the
+        slot that has to be released once it has finished.
+        """
+        priority, budget_key, budget = self.get_policy(referrer)
+        start = time.time()
+        with self.condition:
+            self.sequence += 1
+            entry = (QUERY_PRIORITIES[priority], self.sequence, budget_key, budget)
+            self.waiting.append(entry)
+            self.waiting.sort()
+            while True:
+                if self.running < int(self.limit):
+                    runnable = next(filter(self.can_start, self.waiting), None)
+                    if runnable is entry:
+                        break
+                self.condition.wait()
+
+            self.waiting.remove(entry)
+            self.running += 1
+            self.running_by_key[budget_key] = self.running_by_key.get(budget_key, 0) + 1
+            # Another waiter may be able to start as well.
+            self.condition.notify_all()
+
+        metrics.timing(
+            "snuba.scheduler.queue_wait",
+            time.time() - start,
+            tags={"referrer": referrer or "<unknown>", "priority": priority},
+        )
+        return QuerySlot(budget_key)
+
+    def release(self, slot: QuerySlot, overloaded: bool = False) -> None:
+        with self.condition:
+            self.running -= 1
+            self.running_by_key[slot.budget_key] -= 1
+            if not self.running_by_key[slot.budget_key]:
+                del self.running_by_key[slot.budget_key]
+
+            if options.get("snuba.query-scheduler.adaptive-concurrency"):
+                self.adjust_limit(overloaded)
+
+            self.condition.notify_all()
+
+    def adjust_limit(self, overloaded):
+        previous = int(self.limit)
+        if overloaded:
+            # A burst of failures from the same overload only halves the
+            # limit once.
+            now = time.time()
+            if now - self.last_decrease < self.decrease_interval:
+                return
+            self.last_decrease = now
+            self.limit = max(self.min_concurrency, self.limit / 2)
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+        if int(self.limit) != previous:
+            metrics.gauge("snuba.scheduler.concurrency_limit", int(self.limit))
+
+
+_query_scheduler = QueryScheduler(max_concurrency=10)
+
+
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
 
 
@@ -629,11 +767,15 @@ def raw_query(
     referrer=None,
     is_grouprelease=False,
     use_cache=False,
+    stream=False,
     **kwargs,
 ) -> Mapping[str, Any]:
     """
     Sends a query to snuba.  See `SnubaQueryParams` docstring for param
     descriptions.
+
+    If `stream` is set, the rows in `data` are decoded from the response as
+    they are iterated over instead of all at once. See `_stream_response`.
     """
     snuba_params = SnubaQueryParams(
         dataset=dataset,
@@ -655,6 +797,7 @@ def raw_query(
         referrer=referrer,
         use_cache=use_cache,
         snql_option=snql_option,
+        stream=stream,
     )[0]
 
 
@@ -687,15 +830,239 @@ def get_cache_key(query: SnubaQuery) -> str:
     return f"sqc:{sha1(hashable.encode('utf-8')).hexdigest()}"
 
 
+def get_coalescing_timeout(referrer: Optional[str]) -> Optional[float]:
+    """
+    Returns how long queries with the referrer wait for an identical query
+    that is already running to finish, or ``None`` if they aren't coalesced.
+
+    Referrers are configured with the ``snuba.query-coalescing.referrers``
+    option, which maps referrers to timeouts in seconds. Keys ending with a
+    period match all referrers starting with them.
+    """
+    _, timeout = get_referrer_config(options.get("snuba.query-coalescing.referrers"), referrer)
+    return timeout
+
+
+# Identical queries that are currently being run by this process, by cache key.
+_running_queries: MutableMapping[str, Future] = {}
+_running_queries_lock = threading.Lock()
+
+# Releases a lease only if it is still held by the query that acquired it.
+_release_lease_script = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class QueryCoalescer:
+    """
+    Runs a batch of queries so that identical queries that are running at the
+    same time are only sent to Snuba once.
+
+    Within a process, the first caller of a query runs it and any others wait
+    for its result. Across processes, the caller that takes a lease on the
+    query in Redis runs it and publishes its result, and callers in other
+    processes poll for that result. Callers that don't receive a result
+    within the timeout, or whose leader fails in another process, run the
+    query themselves. Callers waiting on a leader in the same process get
+    its error instead, since the same query would most likely fail again.
+    """
+
+    poll_interval = 0.01
+    max_poll_interval = 0.2
+
+    def __init__(self, referrer: str, timeout: float):
+        self.referrer = referrer
+        self.timeout = timeout
+        self.cluster = redis.redis_clusters.get("default")
+
+    def run(
+        self,
+        snuba_param_list: Sequence[SnubaQueryBody],
+        execute: Callable[[Sequence[SnubaQueryBody]], ResultSet],
+    ) -> ResultSet:
+        keys = [get_cache_key(params[0]) for params in snuba_param_list]
+        results = {}
+        # Results are shared in their encoded form, so that each caller gets
+        # its own copy to modify.
+        encoded_results = {}
+
+        leading = []
+        following = []
+        with _running_queries_lock:
+            for position, key in enumerate(keys):
+                future = _running_queries.get(key)
+                if future is None:
+                    _running_queries[key] = Future()
+                    leading.append(position)
+                else:
+                    following.append((position, future))
+
+        try:
+            remote = []
+            local = []
+            for position in leading:
+                token = self.acquire_lease(keys[position])
+                if token is None:
+                    remote.append(position)
+                else:
+                    local.append((position, token))
+
+            # Queries that are led by another process are waited for after
+            # this process has run the queries that it leads.
+            if local:
+                metrics.incr(
+                    "snuba.query_coalescing.leader",
+                    amount=len(local),
+                    tags={"referrer": self.referrer},
+                )
+                try:
+                    local_results = execute([snuba_param_list[position] for position, _ in local])
+                    for (position, _), result in zip(local, local_results):
+                        results[position] = result
+                        encoded_results[position] = json.dumps(result)
+                        self.publish(keys[position], encoded_results[position])
+                finally:
+                    for position, token in local:
+                        self.release_lease(keys[position], token)
+
+            missing = []
+            for position in remote:
+                encoded_result = self.wait_for_result(keys[position])
+                if encoded_result is None:
+                    missing.append(position)
+                else:
+                    results[position] = json.loads(encoded_result)
+                    encoded_results[position] = encoded_result
+            self.record_coalesced("remote", len(remote) - len(missing))
+
+            if missing:
+                missing_results = execute([snuba_param_list[position] for position in missing])
+                for position, result in zip(missing, missing_results):
+                    results[position] = result
+                    encoded_results[position] = json.dumps(result)
+        except Exception as error:
+            self.finish(keys, leading, error=error)
+            raise
+        else:
+            self.finish(keys, leading, encoded_results=encoded_results)
+
+        missing = []
+        for position, future in following:
+            try:
+                results[position] = json.loads(future.result(timeout=self.timeout))
+            except FutureTimeoutError:
+                missing.append(position)
+        self.record_coalesced("local", len(following) - len(missing))
+
+        if missing:
+            missing_results = execute([snuba_param_list[position] for position in missing])
+            for position, result in zip(missing, missing_results):
+                results[position] = result
+
+        return [results[position] for position in range(len(keys))]
+
+    def finish(self, keys, leading, encoded_results=None, error=None):
+        with _running_queries_lock:
+            futures = [_running_queries.pop(keys[position]) for position in leading]
+
+        for position, future in zip(leading, futures):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(encoded_results[position])
+
+    def record_coalesced(self, scope, count):
+        if count:
+            metrics.incr(
+                "snuba.query_coalescing.coalesced",
+                amount=count,
+                tags={"referrer": self.referrer, "scope": scope},
+            )
+
+    def get_keys(self, key):
+        # The braces keep both keys of a query on the same node of a cluster.
+        return f"{{{key}}}:lease", f"{{{key}}}:result"
+
+    def acquire_lease(self, key: str) -> Optional[str]:
+        """
+        Returns a token for the lease on the query if it was acquired, or
+        ``None`` if another process is already running the query. Queries
+        are run without coalescing if Redis can't be reached.
+        """
+        lease_key, _ = self.get_keys(key)
+        token = uuid.uuid4().hex
+        try:
+            if self.cluster.set(lease_key, token, nx=True, px=int(self.timeout * 1000)):
+                return token
+        except Exception:
+            logger.warning("snuba.query_coalescing.redis-error", exc_info=True)
+            return token
+        return None
+
+    def release_lease(self, key: str, token: str) -> None:
+        lease_key, _ = self.get_keys(key)
+        try:
+            self.cluster.eval(_release_lease_script, 1, lease_key, token)
+        except Exception:
+            logger.warning("snuba.query_coalescing.redis-error", exc_info=True)
+
+    def publish(self, key: str, encoded_result: str) -> None:
+        _, result_key = self.get_keys(key)
+        try:
+            self.cluster.set(result_key, encoded_result, px=int(self.timeout * 1000))
+        except Exception:
+            logger.warning("snuba.query_coalescing.redis-error", exc_info=True)
+
+    def wait_for_result(self, key: str) -> Optional[str]:
+        """
+        Polls for the encoded result of a query that is being run by another
+        process. Returns ``None`` if the timeout expires or the lease is released
+        without a result being published.
+        """
+        lease_key, result_key = self.get_keys(key)
+        deadline = time.time() + self.timeout
+        interval = self.poll_interval
+        while True:
+            try:
+                with self.cluster.pipeline(transaction=False) as pipeline:
+                    # The lease is checked first, since it is only released
+                    # after the result has been published.
+                    pipeline.exists(lease_key)
+                    pipeline.get(result_key)
+                    leased, result = pipeline.execute()
+            except Exception:
+                logger.warning("snuba.query_coalescing.redis-error", exc_info=True)
+                return None
+
+            if result is not None:
+                return result
+
+            if not leased:
+                metrics.incr("snuba.query_coalescing.abandoned", tags={"referrer": self.referrer})
+                return None
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                metrics.incr("snuba.query_coalescing.timeout", tags={"referrer": self.referrer})
+                return None
+
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.max_poll_interval)
+
+
 def bulk_raw_query(
     snuba_param_list: Sequence[SnubaQueryParams],
     referrer: Optional[str] = None,
     use_cache: Optional[bool] = False,
     snql_option: Optional[SNQLOption] = None,
+    stream: bool = False,
 ) -> ResultSet:
     params = map(_prepare_query_params, snuba_param_list)
     return _apply_cache_and_build_results(
-        params, referrer=referrer, use_cache=use_cache, snql_option=snql_option
+        params, referrer=referrer, use_cache=use_cache, snql_option=snql_option, stream=stream
     )
 
 
@@ -704,6 +1071,7 @@ def _apply_cache_and_build_results(
     referrer: Optional[str] = None,
     use_cache: Optional[bool] = False,
     snql_option: Optional[SNQLOption] = None,
+    stream: bool = False,
 ) -> ResultSet:
     headers = {}
     if referrer:
@@ -714,7 +1082,8 @@ def _apply_cache_and_build_results(
 
     results = []
 
-    if use_cache:
+    # Streamed results are only decoded as they are consumed, so they can't be cached.
+    if use_cache and not stream:
         cache_keys = [get_cache_key(query_params) for _, query_params in query_param_list]
         cache_data = cache.get_many(cache_keys)
         to_query: List[Tuple[int, SnubaQueryBody, Optional[str]]] = []
@@ -731,7 +1100,16 @@ def _apply_cache_and_build_results(
         to_query = [(query_pos, query_params, None) for query_pos, query_params in query_param_list]
 
     if to_query:
-        query_results = _bulk_snuba_query(map(itemgetter(1), to_query), headers, snql_option)
+        coalescing_timeout = None if stream else get_coalescing_timeout(referrer)
+        if coalescing_timeout is None:
+            query_results = _bulk_snuba_query(
+                map(itemgetter(1), to_query), headers, snql_option, stream=stream
+            )
+        else:
+            query_results = QueryCoalescer(referrer, coalescing_timeout).run(
+                map(itemgetter(1), to_query),
+                lambda params: _bulk_snuba_query(params, headers, snql_option),
+            )
         for result, (query_pos, _, cache_key) in zip(query_results, to_query):
             if cache_key:
                 cache.set(cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
@@ -747,6 +1125,7 @@ def _bulk_snuba_query(
     snuba_param_list: Sequence[SnubaQueryBody],
     headers: Mapping[str, str],
     snql_option: Optional[SNQLOption] = None,
+    stream: bool = False,
 ) -> ResultSet:
     with sentry_sdk.start_span(
         op="start_snuba_query",
@@ -773,52 +1152,66 @@ def _bulk_snuba_query(
             # hack to pass this value in for now
             headers["snql_entity"] = snql_option.entity
 
+        # The dryrun compares the SQL of both queries, so it always reads the
+        # whole response.
+        stream = stream and query_fn is not _snql_dryrun_query
+        if stream:
+            query_fn = functools.partial(query_fn, preload_content=False)
+
+        # Queries are only handed to the thread pool once the scheduler lets
+        # them start, so that they don't wait for a thread in the pool's order.
+        slots = []
         if len(snuba_param_list) > 1:
-            query_results = list(
-                _query_thread_pool.map(
-                    query_fn,
-                    [(params, Hub(Hub.current), headers) for params in snuba_param_list],
+            futures = []
+            for params in snuba_param_list:
+                slot = _query_scheduler.acquire(query_referrer)
+                slots.append(slot)
+                futures.append(
+                    _query_thread_pool.submit(
+                        _run_scheduled_query,
+                        slot,
+                        query_fn,
+                        (params, Hub(Hub.current), headers),
+                        stream,
+                    )
                 )
-            )
+            query_results = [future.result() for future in futures]
         else:
             # No need to submit to the thread pool if we're just performing a single query
-            query_results = [query_fn((snuba_param_list[0], Hub(Hub.current), headers))]
+            slot = _query_scheduler.acquire(query_referrer)
+            slots.append(slot)
+            query_results = [
+                _run_scheduled_query(
+                    slot, query_fn, (snuba_param_list[0], Hub(Hub.current), headers), stream
+                )
+            ]
 
-    results = []
-    for response, _, reverse in query_results:
+    if stream:
+        # Streamed queries keep their slot until their rows have been read.
+        results = []
+        pending = iter(zip(query_results, slots))
         try:
-            body = json.loads(response.data)
-            if SNUBA_INFO:
-                if "sql" in body:
-                    logger.info(
-                        "{}.sql: {}".format(headers.get("referer", "<unknown>"), body["sql"])
+            for (response, _, reverse), slot in pending:
+                results.append(
+                    _stream_response(
+                        response,
+                        reverse,
+                        headers,
+                        on_close=functools.partial(_query_scheduler.release, slot),
                     )
-                if "error" in body:
-                    logger.info(
-                        "{}.err: {}".format(headers.get("referer", "<unknown>"), body["error"])
-                    )
-        except ValueError:
-            if response.status != 200:
-                logger.error("snuba.query.invalid-json")
-                raise SnubaError("Failed to parse snuba error response")
-            raise UnexpectedResponseError(f"Could not decode JSON response: {response.data}")
-
-        if response.status != 200:
-            if body.get("error"):
-                error = body["error"]
-                if response.status == 429:
-                    raise RateLimitExceeded(error["message"])
-                elif error["type"] == "schema":
-                    raise SchemaValidationError(error["message"])
-                elif error["type"] == "clickhouse":
-                    raise clickhouse_error_codes_map.get(error["code"], QueryExecutionError)(
-                        error["message"]
-                    )
-                else:
-                    raise SnubaError(error["message"])
-            else:
-                raise SnubaError(f"HTTP {response.status}")
+                )
+        except Exception:
+            # The responses after the failed one won't be read.
+            for (response, _, _), slot in pending:
+                if response.status == 200:
+                    _close_response(response)
+                    _query_scheduler.release(slot)
+            raise
+        return results
 
+    results = []
+    for response, _, reverse in query_results:
+        body = _decode_response(response, headers)
         # Forward and reverse translation maps from model ids to snuba keys, per column
         body["data"] = [reverse(d) for d in body["data"]]
         results.append(body)
@@ -826,10 +1219,284 @@ def _bulk_snuba_query(
     return results
 
 
+def _log_response_info(body, headers):
+    if "sql" in body:
+        logger.info("{}.sql: {}".format(headers.get("referer", "<unknown>"), body["sql"]))
+    if "error" in body:
+        logger.info("{}.err: {}".format(headers.get("referer", "<unknown>"), body["error"]))
+
+
+def _decode_response(response: urllib3.response.HTTPResponse, headers: Mapping[str, str]):
+    try:
+        body = json.loads(response.data)
+        if SNUBA_INFO:
+            _log_response_info(body, headers)
+    except ValueError:
+        if response.status != 200:
+            logger.error("snuba.query.invalid-json")
+            raise SnubaError("Failed to parse snuba error response")
+        raise UnexpectedResponseError(f"Could not decode JSON response: {response.data}")
+
+    if response.status != 200:
+        if body.get("error"):
+            error = body["error"]
+            if response.status == 429:
+                raise RateLimitExceeded(error["message"])
+            elif error["type"] == "schema":
+                raise SchemaValidationError(error["message"])
+            elif error["type"] == "clickhouse":
+                raise clickhouse_error_codes_map.get(error["code"], QueryExecutionError)(
+                    error["message"]
+                )
+            else:
+                raise SnubaError(error["message"])
+        else:
+            raise SnubaError(f"HTTP {response.status}")
+
+    return body
+
+
+# The amount of the response body that is read from the connection at a time
+# when streaming.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class JSONStreamReader:
+    """
+    Decodes a JSON document incrementally from an iterable of byte chunks.
+
+    Values are decoded one at a time with the regular decoder, and only as
+    much of the document as is needed to decode the next value is buffered.
+    """
+
+    whitespace_re = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        """
+        Reads at least as much again as is currently buffered, so that
+        retrying a value that didn't fit doesn't take quadratic time.
+        """
+        if self.exhausted:
+            return False
+
+        # Drop what has already been decoded before growing the buffer.
+        self.buffer = self.buffer[self.pos :]
+        self.pos = 0
+
+        pieces = [self.buffer]
+        target = max(len(self.buffer) * 2, 1)
+        size = len(self.buffer)
+        while size < target:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                pieces.append(self.decoder.decode(b"", final=True))
+                self.exhausted = True
+                break
+            piece = self.decoder.decode(chunk)
+            pieces.append(piece)
+            size += len(piece)
+
+        self.buffer = "".join(pieces)
+        return True
+
+    def next_char(self):
+        """
+        Consumes and returns the next character that isn't whitespace, or an
+        empty string at the end of the document.
+        """
+        while True:
+            self.pos = self.whitespace_re.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                self.pos += 1
+                return self.buffer[self.pos - 1]
+            if not self.fill():
+                return ""
+
+    def expect(self, expected):
+        char = self.next_char()
+        if char != expected:
+            raise ValueError(f"Expected {expected!r} at offset {self.pos}, found {char!r}")
+
+    def peek(self):
+        char = self.next_char()
+        if char:
+            self.pos -= 1
+        return char
+
+    def value(self):
+        while True:
+            try:
+                value, end = json._default_decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self.fill():
+                    continue
+                raise
+            # A value that ends with the buffer may be incomplete, such as a
+            # number whose remaining digits haven't been read yet.
+            if end < len(self.buffer) or not self.fill():
+                self.pos = end
+                return value
+
+    def items(self, key):
+        """
+        Iterates over the items of the object, other than the named array.
+        The named array is yielded as ``(key, None)`` when it is reached, and
+        must be consumed with ``elements`` before iteration continues.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            name = self.value()
+            self.expect(":")
+            if name == key:
+                self.expect("[")
+                yield name, None
+            else:
+                yield name, self.value()
+
+            char = self.next_char()
+            if char == "}":
+                return
+            elif char != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self.pos}, found {char!r}")
+
+    def elements(self):
+        if self.peek() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield self.value()
+
+            char = self.next_char()
+            if char == "]":
+                return
+            elif char != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {self.pos}, found {char!r}")
+
+
+def _close_response(response: urllib3.response.HTTPResponse) -> None:
+    # A connection is released to the pool once its response has been read to
+    # the end. If it hasn't been, the connection is closed before it is
+    # released, so that the rest of the response isn't read by the next query.
+    response.close()
+    response.release_conn()
+
+
+def _stream_response(
+    response: urllib3.response.HTTPResponse,
+    reverse: Translator,
+    headers: Mapping[str, str],
+    on_close: Optional[Callable[[], None]] = None,
+):
+    """
+    Returns the body of a successful response with `data` as an iterator
+    that decodes and translates each row as it is consumed, so neither the
+    raw response nor the full result set needs to be held in memory.
+
+    Other keys of the body are available once they have been decoded. Keys
+    that Snuba sends after `data` (such as `totals` or `sql`) are only added
+    once all of the rows have been consumed.
+
+    The response of a successful query is closed, and `on_close` called,
+    once the rows have been consumed, closed or garbage collected.
+    """
+    if response.status != 200:
+        # Error responses are small, so they are read as a whole to raise the
+        # appropriate error.
+        _decode_response(response, headers)
+
+    def close():
+        _close_response(response)
+        if on_close is not None:
+            on_close()
+
+    body = {}
+    reader = JSONStreamReader(response.stream(STREAM_CHUNK_SIZE))
+    items = reader.items("data")
+
+    def rows():
+        try:
+            yield from (reverse(d) for d in reader.elements())
+            for key, value in items:
+                body[key] = value
+        except ValueError as error:
+            raise UnexpectedResponseError(f"Could not decode JSON response: {error}")
+        finally:
+            closer()
+
+        if SNUBA_INFO:
+            _log_response_info(body, headers)
+
+    data = rows()
+    # Closes the response at most once, even if the rows are dropped before
+    # they have been read to the end.
+    closer = weakref.finalize(data, close)
+
+    try:
+        for key, value in items:
+            if key == "data":
+                body["data"] = data
+                break
+            body[key] = value
+        else:
+            body["data"] = iter(())
+            closer()
+    except ValueError as error:
+        closer()
+        raise UnexpectedResponseError(f"Could not decode JSON response: {error}")
+
+    return body
+
+
 RawResult = Tuple[urllib3.response.HTTPResponse, Callable[[Any], Any], Callable[[Any], Any]]
 
 
-def _snuba_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> RawResult:
+def _is_overloaded(response: urllib3.response.HTTPResponse) -> bool:
+    if response.status == 429:
+        return True
+    elif response.status == 200:
+        return False
+
+    # Error responses are small, and reading them here keeps them available
+    # for decoding later.
+    try:
+        error = json.loads(response.data)["error"]
+        return (
+            error["type"] == "clickhouse"
+            and clickhouse_error_codes_map.get(error["code"]) is QueryTooManySimultaneous
+        )
+    except (ValueError, KeyError, TypeError):
+        return False
+
+
+def _run_scheduled_query(slot, query_fn, params, stream=False) -> RawResult:
+    try:
+        result = query_fn(params)
+    except Exception:
+        _query_scheduler.release(slot)
+        raise
+
+    # The slot of a successful streamed query is released by
+    # `_stream_response` once the response has been read.
+    if not (stream and result[0].status == 200):
+        _query_scheduler.release(slot, overloaded=_is_overloaded(result[0]))
+    return result
+
+
+def _snuba_query(
+    params: Tuple[SnubaQuery, Hub, Mapping[str, str]], preload_content: bool = True
+) -> RawResult:
     query_data, thread_hub, headers = params
     query_params, forward, reverse = query_data
     try:
@@ -845,7 +1512,13 @@ def _snuba_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> RawResult
                 for param_key, param_data in query_params.items():
                     span.set_data(param_key, param_data)
                 return (
-                    _snuba_pool.urlopen("POST", "/query", body=body, headers=headers),
+                    _snuba_pool.urlopen(
+                        "POST",
+                        "/query",
+                        body=body,
+                        headers=headers,
+                        preload_content=preload_content,
+                    ),
                     forward,
                     reverse,
                 )
@@ -853,19 +1526,23 @@ def _snuba_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> RawResult
         raise SnubaError(err)
 
 
-def _snql_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> RawResult:
+def _snql_query(
+    params: Tuple[SnubaQuery, Hub, Mapping[str, str]], preload_content: bool = True
+) -> RawResult:
     # Eventually we can get rid of this wrapper, but for now it's cleaner to unwrap
     # the params here than in the calling function.
     query_data, thread_hub, headers = params
     query, forward, reverse = query_data
     assert isinstance(query, Query)
     try:
-        return _raw_snql_query(query, thread_hub, headers), forward, reverse
+        return _raw_snql_query(query, thread_hub, headers, preload_content), forward, reverse
     except Exception as err:
         raise SnubaError(err)
 
 
-def _legacy_snql_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> RawResult:
+def _legacy_snql_query(
+    params: Tuple[SnubaQuery, Hub, Mapping[str, str]], preload_content: bool = True
+) -> RawResult:
     # Run the SnQL query and if something fails try the legacy version.
     query_data, thread_hub, headers = params
     query_params, forward, reverse = query_data
@@ -890,10 +1567,10 @@ def _legacy_snql_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> Raw
         metrics.incr(
             "snuba.snql.legacy.failure", tags={"referrer": referrer, "reason": "parsing.error"}
         )
-        return _snuba_query(params)
+        return _snuba_query(params, preload_content)
 
     try:
-        result = _raw_snql_query(query, Hub(thread_hub), headers)
+        result = _raw_snql_query(query, Hub(thread_hub), headers, preload_content)
     except Exception as e:
         logger.warning(
             "snuba.snql.sending.error",
@@ -907,7 +1584,7 @@ def _legacy_snql_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> Raw
         metrics.incr(
             "snuba.snql.legacy.failure", tags={"referrer": referrer, "reason": "sending.error"}
         )
-        return _snuba_query(params)
+        return _snuba_query(params, preload_content)
 
     return result, forward, reverse
 
@@ -1023,7 +1700,7 @@ def _snql_dryrun_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str]]) -> Raw
 
 
 def _raw_snql_query(
-    query: Query, thread_hub: Hub, headers: Mapping[str, str]
+    query: Query, thread_hub: Hub, headers: Mapping[str, str], preload_content: bool = True
 ) -> urllib3.response.HTTPResponse:
     with timer("snql_query"):
         referrer = headers.get("referer", "<unknown>")
@@ -1035,7 +1712,13 @@ def _raw_snql_query(
         with thread_hub.start_span(op="snuba_snql", description=f"query {referrer}") as span:
             span.set_tag("referrer", referrer)
             span.set_tag("snql", str(query))
-            return _snuba_pool.urlopen("POST", f"/{query.dataset}/snql", body=body, headers=headers)
+            return _snuba_pool.urlopen(
+                "POST",
+                f"/{query.dataset}/snql",
+                body=body,
+                headers=headers,
+                preload_content=preload_content,
+            )
 
 
 def query(
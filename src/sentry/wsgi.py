@@ -44,3 +44,9 @@ class FileWrapperWSGIHandler(WSGIHandler):
 
 # Run WSGI handler for the application
 application = FileWrapperWSGIHandler()
+
+# uWSGI loads the application in each worker (lazy-apps), so every worker
+# starts its own profiler.
+from sentry.utils.sampling_profiler import start_sampling_profiler
+
+start_sampling_profiler("web")
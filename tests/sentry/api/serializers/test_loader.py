@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+from django.http import HttpRequest
+
+from sentry import app
+from sentry.api.serializers.loader import AttributeLoader, clear_request_futures
+from sentry.testutils import TestCase
+from sentry.utils.compat import mock
+
+
+class AttributeLoaderTest(TestCase):
+    def test_synchronous(self):
+        loader = AttributeLoader("test")
+        future = loader.load("thread", lambda: threading.current_thread())
+        assert future.done()
+        assert future.result() is threading.current_thread()
+
+    def test_concurrent(self):
+        with self.options({"api.serializer-loader.workers": 2}):
+            loader = AttributeLoader("test")
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait(value):
+            # Only completes if both loads are running at the same time.
+            barrier.wait()
+            return value
+
+        futures = [loader.load(key, wait, key) for key in ("a", "b")]
+        assert [future.result(timeout=5) for future in futures] == ["a", "b"]
+
+    def test_deduplicates_loads(self):
+        function = mock.Mock(return_value=1)
+
+        loader = AttributeLoader("test")
+        future = loader.load("key", function, 1, value=2)
+        assert loader.load("key", function, 1, value=2) is future
+        assert future.result() == 1
+        function.assert_called_once_with(1, value=2)
+
+    def test_loads_with_other_arguments(self):
+        loader = AttributeLoader("test")
+        assert loader.load("key", sum, [1, 2]).result() == 3
+        assert loader.load("key", sum, [3, 4]).result() == 7
+        # Loads with unhashable arguments are not shared.
+        assert loader.load("key", len, [{}]).result() == 1
+
+    def test_deduplicates_loads_within_request(self):
+        function = mock.Mock(return_value=1)
+
+        AttributeLoader("test").load("key", function, 1)
+        AttributeLoader("test").load("key", function, 1)
+        assert function.call_count == 2
+
+        app.env.request = HttpRequest()
+        try:
+            future = AttributeLoader("test").load("key", function, 1)
+            assert AttributeLoader("other").load("key", function, 1) is future
+            assert function.call_count == 3
+
+            clear_request_futures()
+            AttributeLoader("test").load("key", function, 1)
+            assert function.call_count == 4
+        finally:
+            app.env.request = None
+            clear_request_futures()
+
+    def test_shared_executor(self):
+        with self.options({"api.serializer-loader.workers": 2}):
+            first = AttributeLoader("test")
+            second = AttributeLoader("test")
+        assert first.concurrent
+        assert (
+            first.load("a", lambda: threading.current_thread())
+            .result(timeout=5)
+            .name.startswith("serializer-loader")
+        )
+        assert first._AttributeLoader__executor is second._AttributeLoader__executor
+
+        with self.options({"api.serializer-loader.workers": 1}):
+            third = AttributeLoader("test")
+        assert third._AttributeLoader__executor is not first._AttributeLoader__executor
+        assert first._AttributeLoader__executor._shutdown
+
+    def test_exception(self):
+        def fail():
+            raise ValueError("failed")
+
+        for workers in (0, 1):
+            with self.options({"api.serializer-loader.workers": workers}):
+                loader = AttributeLoader("test")
+
+            future = loader.load("key", fail)
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+    @mock.patch("sentry.api.serializers.loader.metrics.timing")
+    def test_records_timing(self, timing):
+        AttributeLoader("test").load("key", lambda: None)
+        timing.assert_called_once_with(
+            "api.serializer.loader.duration",
+            mock.ANY,
+            tags={"serializer": "test", "loader": "key"},
+        )
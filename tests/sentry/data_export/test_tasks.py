@@ -400,7 +400,7 @@ class AssembleDownloadTest(TestCase, SnubaTestCase):
         error = emailer.call_args[1]["message"]
         assert error == "Invalid date range. Please try a more recent date range."
 
-    @patch("sentry.snuba.discover.query")
+    @patch("sentry.snuba.discover.stream_query")
     @patch("sentry.data_export.models.ExportedData.email_failure")
     def test_discover_invalid_search_query(self, emailer, mock_query):
         de = ExportedData.objects.create(
@@ -1,6 +1,7 @@
 from uuid import uuid4
 
 from sentry import nodestore
+from sentry.deletions.base import BaseRelation, ModelRelation, merge_relations
 from sentry.deletions.defaults.group import EventDataDeletionTask
 from sentry.eventstore.models import Event
 from sentry.models import (
@@ -101,6 +102,30 @@ class DeleteGroupTest(TestCase, SnubaTestCase):
         assert not nodestore.get(self.node_id2)
         assert nodestore.get(self.node_id3), "Does not remove from second group"
 
+    def test_bulk(self):
+        group = self.event.group
+        other_group = self.store_event(
+            data={"timestamp": iso_format(before_now(minutes=1)), "fingerprint": ["group3"]},
+            project_id=self.project.id,
+        ).group
+        GroupMeta.objects.create(group=other_group, key="foo", value="bar")
+
+        with self.tasks(), self.options({"deletions.bulk-relations": True}):
+            delete_groups(object_ids=[group.id, other_group.id])
+
+        assert not UserReport.objects.filter(group_id=group.id).exists()
+        assert not UserReport.objects.filter(event_id=self.event.event_id).exists()
+        assert not EventAttachment.objects.filter(event_id=self.event.event_id).exists()
+        assert not File.objects.filter(name="hello.png").exists()
+
+        assert not GroupMeta.objects.filter(group_id__in=[group.id, other_group.id]).exists()
+        assert not GroupRedirect.objects.filter(group_id=group.id).exists()
+        assert not GroupHash.objects.filter(group_id=group.id).exists()
+        assert not Group.objects.filter(id__in=[group.id, other_group.id]).exists()
+        assert not nodestore.get(self.node_id)
+        assert not nodestore.get(self.node_id2)
+        assert nodestore.get(self.node_id3), "Does not remove from second group"
+
     @mock.patch("os.environ.get")
     @mock.patch("sentry.nodestore.delete_multi")
     def test_cleanup(self, nodestore_delete_multi, os_environ):
@@ -111,3 +136,27 @@ class DeleteGroupTest(TestCase, SnubaTestCase):
             delete_groups(object_ids=[group.id])
 
         assert nodestore_delete_multi.call_count == 0
+
+
+class MergeRelationsTest(TestCase):
+    def test_merges_single_filter_relations(self):
+        relations = merge_relations(
+            [
+                ModelRelation(GroupHash, {"group_id": 1}),
+                ModelRelation(GroupMeta, {"group_id": 1}),
+                ModelRelation(GroupHash, {"group_id": 2}),
+                BaseRelation({"group_id": 1, "project_id": 1}, EventDataDeletionTask),
+                ModelRelation(GroupHash, {"group_id": 2, "project_id": 1}),
+            ]
+        )
+
+        assert [r.params.get("model") for r in relations] == [
+            GroupHash,
+            GroupMeta,
+            None,
+            GroupHash,
+        ]
+        assert relations[0].params["query"] == {"group_id__in": [1, 2]}
+        assert relations[1].params["query"] == {"group_id": 1}
+        assert relations[2].task is EventDataDeletionTask
+        assert relations[3].params["query"] == {"group_id": 2, "project_id": 1}
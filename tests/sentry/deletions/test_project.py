@@ -87,3 +87,36 @@ class DeleteProjectTest(TestCase):
         assert Commit.objects.filter(id=commit.id).exists()
         assert not ProjectDebugFile.objects.filter(id=dif.id).exists()
         assert not File.objects.filter(id=file.id).exists()
+
+    def test_bulk_runs_model_delete(self):
+        project = self.create_project(name="test")
+        event = self.store_event(data={}, project_id=project.id)
+        file = File.objects.create(name="debug-file", type="project.dif")
+        dif = ProjectDebugFile.objects.create(
+            file=file,
+            debug_id="uuid",
+            code_id="codeid",
+            cpu_name="cpu",
+            object_name="object",
+            project=project,
+        )
+        file_attachment = File.objects.create(name="hello.png", type="image/png")
+        EventAttachment.objects.create(
+            event_id=event.event_id,
+            project_id=event.project_id,
+            file_id=file_attachment.id,
+            type=file_attachment.type,
+            name="hello.png",
+        )
+
+        deletion = ScheduledDeletion.schedule(project, days=0)
+        deletion.update(in_progress=True)
+
+        with self.tasks(), self.options({"deletions.bulk-relations": True}):
+            run_deletion(deletion.id)
+
+        assert not Project.objects.filter(id=project.id).exists()
+        assert not ProjectDebugFile.objects.filter(id=dif.id).exists()
+        assert not File.objects.filter(id=file.id).exists()
+        assert not EventAttachment.objects.filter(project_id=project.id).exists()
+        assert not File.objects.filter(id=file_attachment.id).exists()
@@ -151,3 +151,77 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_add_many(self):
+        backend = RedisBackend()
+
+        t = time.time()
+        record_1 = Record("record:1", "value", t)
+        record_2 = Record("record:2", "value", t)
+        record_3 = Record("record:3", "value", t)
+
+        assert backend.add_many(
+            [("timeline:1", record_1), ("timeline:1", record_2), ("timeline:2", record_3)]
+        ) == [True, False, True]
+
+        with backend.digest("timeline:1", 0) as records:
+            assert set(records) == {record_1, record_2}
+
+        with backend.digest("timeline:2", 0) as records:
+            assert set(records) == {record_3}
+
+    def test_digest_many(self):
+        backend = RedisBackend()
+
+        t = time.time()
+        record_1 = Record("record:1", "value", t)
+        record_2 = Record("record:2", "value", t)
+        backend.add("timeline:1", record_1)
+        backend.add("timeline:2", record_2)
+
+        with backend.digest_many(["timeline:1", "timeline:2", "timeline:3"], 0) as digests:
+            assert digests == {"timeline:1": [record_1], "timeline:2": [record_2]}
+
+        # Both timelines have been closed and are scheduled again.
+        assert {entry.key for entry in backend.schedule(time.time())} == {
+            "timeline:1",
+            "timeline:2",
+        }
+
+        with backend.digest_many(["timeline:1", "timeline:2"], 0) as digests:
+            assert digests == {"timeline:1": [], "timeline:2": []}
+
+    def test_digest_many_skipped_timeline(self):
+        backend = RedisBackend()
+
+        t = time.time()
+        record_1 = Record("record:1", "value", t)
+        record_2 = Record("record:2", "value", t)
+        backend.add("timeline:1", record_1)
+        backend.add("timeline:2", record_2)
+
+        with backend.digest_many(["timeline:1", "timeline:2"], 0) as digests:
+            del digests["timeline:2"]
+
+        # The skipped timeline is still in the ready state with its records.
+        with backend.digest("timeline:2", 0) as records:
+            assert set(records) == {record_2}
+
+        with pytest.raises(InvalidState):
+            with backend.digest("timeline:1", 0):
+                pass
+
+    def test_schedule_batches(self):
+        backend = RedisBackend()
+
+        for i in range(5):
+            key = f"timeline:{i}"
+            backend.add(key, Record("record:1", "value", time.time()))
+            with backend.digest(key, 0):
+                pass
+
+        batches = list(backend.schedule_batches(time.time(), 2))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert {entry.key for batch in batches for entry in batch} == {
+            f"timeline:{i}" for i in range(5)
+        }
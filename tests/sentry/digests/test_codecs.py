@@ -0,0 +1,46 @@
+from sentry.digests.codecs import CompressedPickleCodec, EventReferenceCodec
+from sentry.digests.notifications import Notification, bind_events, event_to_record
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.datetime import before_now, iso_format
+from sentry.utils.samples import load_data
+
+
+class EventReferenceCodecTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        data = load_data("python")
+        data["timestamp"] = iso_format(before_now(minutes=1))
+        self.event = self.store_event(data=data, project_id=self.project.id)
+        self.rule = self.event.project.rule_set.all()[0]
+        self.record = event_to_record(self.event, [self.rule])
+
+    def test_roundtrip(self):
+        codec = EventReferenceCodec()
+        value = codec.decode(codec.encode(self.record.value))
+
+        assert isinstance(value, Notification)
+        assert value.rules == [self.rule.id]
+        assert value.event.project_id == self.event.project_id
+        assert value.event.event_id == self.event.event_id
+        assert value.event.group_id == self.event.group_id
+
+    def test_bind_events(self):
+        codec = EventReferenceCodec()
+        record = self.record._replace(value=codec.decode(codec.encode(self.record.value)))
+
+        bind_events([record])
+
+        assert record.value.event.data._node_data is not None
+        assert record.value.event.data["event_id"] == self.event.event_id
+
+    def test_decodes_pickled_values(self):
+        value = EventReferenceCodec().decode(CompressedPickleCodec().encode(self.record.value))
+
+        assert value.rules == [self.rule.id]
+        assert value.event.event_id == self.event.event_id
+
+    def test_size(self):
+        compact = len(EventReferenceCodec().encode(self.record.value))
+        pickled = len(CompressedPickleCodec().encode(self.record.value))
+
+        assert compact * 10 < pickled
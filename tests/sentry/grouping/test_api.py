@@ -0,0 +1,34 @@
+from sentry.eventstore.models import Event
+from sentry.grouping.api import copy_event_for_grouping
+
+
+def test_copy_event_for_grouping():
+    frames = [{"function": "main", "in_app": True, "data": {"orig_in_app": -1}}]
+    event = Event(
+        project_id=1,
+        event_id="a" * 32,
+        data={
+            "exception": {"values": [{"type": "Error", "stacktrace": {"frames": frames}}]},
+            "threads": {"values": [{"id": 1, "stacktrace": {"frames": frames}}]},
+            "stacktrace": {"frames": frames},
+            "breadcrumbs": {"values": [{"message": "foo"}]},
+        },
+    )
+
+    copied = copy_event_for_grouping(event)
+    assert copied.data.data == event.data.data
+
+    for stacktrace in (
+        copied.data["exception"]["values"][0]["stacktrace"],
+        copied.data["threads"]["values"][0]["stacktrace"],
+        copied.data["stacktrace"],
+    ):
+        stacktrace["frames"][0]["in_app"] = False
+        stacktrace["frames"][0]["data"]["category"] = "foo"
+    copied.data["fingerprint"] = ["foo"]
+
+    assert frames == [{"function": "main", "in_app": True, "data": {"orig_in_app": -1}}]
+    assert "fingerprint" not in event.data
+
+    # Data that grouping does not modify is shared.
+    assert copied.data["breadcrumbs"] is event.data["breadcrumbs"]
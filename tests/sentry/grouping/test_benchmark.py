@@ -1,7 +1,19 @@
+import tracemalloc
+from copy import deepcopy
+
 import pytest
 
-from sentry.grouping.api import get_default_grouping_config_dict
+from sentry import eventstore
+from sentry.event_manager import EventManager
+from sentry.grouping.api import (
+    get_default_grouping_config_dict,
+    get_grouping_variants_for_event,
+    load_grouping_config,
+)
+from sentry.grouping.component import GroupingComponent
+from sentry.grouping.enhancer import ENHANCEMENT_BASES, Enhancements
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
+from sentry.stacktraces.processing import normalize_stacktraces_for_grouping
 from tests.sentry.grouping import grouping_input as grouping_inputs
 
 CONFIGS = {key: get_default_grouping_config_dict(key) for key in sorted(CONFIGURATIONS.keys())}
@@ -37,3 +49,149 @@ def run_configuration(grouping_input, config):
     event.project = None
 
     event.get_hashes()
+
+
+def _get_custom_enhancements(size):
+    rules = []
+    for i in range(size):
+        rules.append(f"module:com.example.module{i}.*            +app")
+        rules.append(f"family:native function:handle_{i}_*       -group")
+        rules.append(f"package:**/libvendor{i}.so                -app")
+    return Enhancements.from_config_string("\n".join(rules), bases=["common:2019-03-23"])
+
+
+ENHANCEMENTS = {
+    **{base: Enhancements([], bases=[base]) for base in sorted(ENHANCEMENT_BASES)},
+    "custom-30": _get_custom_enhancements(10),
+    "custom-600": _get_custom_enhancements(200),
+}
+
+
+def _get_deep_stacktrace(platform, depth=200):
+    if platform == "java":
+        return [
+            {
+                "function": f"method{i}",
+                "module": f"com.example.module{i % 50}.Handler",
+                "filename": f"Handler{i}.java",
+                "in_app": i % 3 == 0,
+            }
+            for i in range(depth)
+        ]
+    return [
+        {
+            "function": f"handle_{i % 40}_request(int)",
+            "package": f"/usr/lib/libvendor{i % 20}.so",
+            "abs_path": f"/src/module{i}.cpp",
+            "in_app": i % 3 == 0,
+        }
+        for i in range(depth)
+    ]
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("platform", ["java", "native"])
+@pytest.mark.parametrize("enhancements_name", sorted(ENHANCEMENTS))
+def test_benchmark_enhancements(enhancements_name, platform, benchmark):
+    enhancements = ENHANCEMENTS[enhancements_name]
+    frames = _get_deep_stacktrace(platform)
+
+    def setup():
+        return (enhancements, deepcopy(frames), platform), {}
+
+    benchmark.pedantic(run_enhancements, setup=setup, rounds=20)
+
+
+def run_enhancements(enhancements, frames, platform):
+    enhancements.apply_modifications_to_frame(frames, platform, None)
+    components = [GroupingComponent(id="frame", contributes=True) for _ in frames]
+    enhancements.update_frame_components_contributions(components, frames, platform, None)
+
+
+def _get_deep_event(platform):
+    return {
+        "platform": platform,
+        "exception": {
+            "values": [
+                {
+                    "type": "Error",
+                    "value": "deep stacktrace",
+                    "stacktrace": {"frames": _get_deep_stacktrace(platform)},
+                }
+            ]
+        },
+    }
+
+
+def _get_normalized_inputs(config):
+    """
+    Returns the normalized data of the grouping fixture inputs and of
+    synthetic events with deep stacktraces, before stacktraces are normalized
+    for grouping.
+    """
+    inputs = [dict(grouping_input.data) for grouping_input in grouping_inputs]
+    inputs.extend(_get_deep_event(platform) for platform in ("java", "native"))
+
+    rv = []
+    for data in inputs:
+        if data.pop("_grouping", None):
+            # Inputs with custom enhancements do not test the config itself.
+            continue
+        manager = EventManager(data=data, grouping_config=config)
+        manager.normalize()
+        rv.append(dict(manager.get_data()))
+    return rv
+
+
+def _record_peak_memory(benchmark, func, args_list):
+    """
+    Stores the peak of memory allocated by a single call of ``func`` in the
+    benchmark's ``extra_info``.  Tracing allocations slows calls down, so this
+    is done apart from timed rounds.
+    """
+    peak_memory = 0
+    for args in args_list:
+        tracemalloc.start()
+        func(*args)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    benchmark.extra_info["peak_memory_bytes"] = peak_memory
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize(
+    "config_name", sorted(CONFIGURATIONS.keys()), ids=lambda x: x.replace("-", "_")
+)
+def test_benchmark_normalize_stacktraces(config_name, benchmark):
+    config = load_grouping_config(CONFIGS[config_name])
+    inputs = _get_normalized_inputs(CONFIGS[config_name])
+    input_iter = iter(inputs)
+
+    def setup():
+        return (deepcopy(next(input_iter)), config), {}
+
+    _record_peak_memory(
+        benchmark, normalize_stacktraces_for_grouping, [(deepcopy(d), config) for d in inputs]
+    )
+    benchmark.pedantic(normalize_stacktraces_for_grouping, setup=setup, rounds=len(inputs))
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize(
+    "config_name", sorted(CONFIGURATIONS.keys()), ids=lambda x: x.replace("-", "_")
+)
+def test_benchmark_grouping_variants(config_name, benchmark):
+    config = load_grouping_config(CONFIGS[config_name])
+    events = []
+    for data in _get_normalized_inputs(CONFIGS[config_name]):
+        normalize_stacktraces_for_grouping(data, config)
+        event = eventstore.create_event(data=data)
+        event.project = None
+        events.append(event)
+    event_iter = iter(events)
+
+    def setup():
+        return (next(event_iter), config), {}
+
+    _record_peak_memory(benchmark, get_grouping_variants_for_event, [(e, config) for e in events])
+    benchmark.pedantic(get_grouping_variants_for_event, setup=setup, rounds=len(events))
@@ -400,3 +400,43 @@ def test_range_matching_direct():
         ],
         "python",
     )
+
+
+def test_rule_index():
+    enhancement = Enhancements.from_config_string(
+        """
+        family:native function:std::*                   -app
+        family:native package:**/Frameworks/**          -app
+        module:com.example.*                           +app
+        function:handle_request | [ function:dispatch ] -group
+        family:native                                   -group
+        !function:main                                  +group
+        """
+    )
+    rules = enhancement._updater_rules
+    frames = [
+        {"function": "main", "platform": "native"},
+        {"function": "std::panicking", "package": "/App/Frameworks/Foo.framework/Foo"},
+        {"function": "handle_request", "module": "com.example.views"},
+        {"function": "dispatch", "module": "org.example"},
+    ]
+    match_frames = [create_match_frame(frame, "java") for frame in frames]
+    candidates = enhancement._get_rule_indexes()[1].get_candidates(match_frames)
+
+    assert [list(frame_indexes) for frame_indexes in candidates] == [
+        [1],
+        [1],
+        [2],
+        [2],
+        [0],
+        [0, 1, 2, 3],
+    ]
+
+    for rule, frame_indexes in zip(rules, candidates):
+        assert rule.get_matching_frame_actions(
+            match_frames, "java", cache={}, frame_indexes=frame_indexes
+        ) == rule.get_matching_frame_actions(match_frames, "java", cache={})
+
+    enhancement = Enhancements.from_config_string("function:foo -group")
+    other = Enhancements.loads(enhancement.dumps())
+    assert other._get_rule_indexes() is enhancement._get_rule_indexes()
@@ -121,6 +121,64 @@ logger:test2 -> logger-, {{ logger }}, -, {{ level }}
     }
 
 
+def test_first_matching_rule_wins():
+    rules = FingerprintingRules.from_config_string(
+        """
+function:foo* !path:**/vendor/** -> own-foo
+function:foo* -> foo
+type:DatabaseUnavailable function:connect -> database
+level:ERROR logger:sentry.* -> logger
+"""
+    )
+    event = {
+        "platform": "python",
+        "level": "error",
+        "logger": "sentry.tasks",
+        "exception": {
+            "values": [
+                {
+                    "type": "DatabaseUnavailable",
+                    "stacktrace": {
+                        "frames": [
+                            {"function": "connect", "abs_path": "/app/vendor/db.py"},
+                            {"function": "foo_bar", "abs_path": "/app/vendor/lib.py"},
+                        ]
+                    },
+                }
+            ]
+        },
+    }
+
+    rule, fingerprint, _ = rules.get_fingerprint_values_for_event(event)
+    assert rule is rules.rules[1]
+    assert fingerprint == ["foo"]
+
+    event["exception"]["values"][0]["stacktrace"]["frames"][1]["abs_path"] = "src/lib.py"
+    rule, fingerprint, _ = rules.get_fingerprint_values_for_event(event)
+    assert rule is rules.rules[0]
+
+    event["exception"]["values"][0]["stacktrace"]["frames"].pop()
+    rule, fingerprint, _ = rules.get_fingerprint_values_for_event(event)
+    assert fingerprint == ["database"]
+
+    del event["exception"]
+    rule, fingerprint, _ = rules.get_fingerprint_values_for_event(event)
+    assert fingerprint == ["logger"]
+
+    event["level"] = "warning"
+    assert rules.get_fingerprint_values_for_event(event) is None
+
+
+def test_compiled_matcher_is_shared():
+    config = "message:*timeout* -> timeout"
+    rules = FingerprintingRules.from_config_string(config)
+    other_rules = FingerprintingRules.from_json(rules.to_json())
+    assert rules._get_matcher() is other_rules._get_matcher()
+
+    rules = FingerprintingRules.from_config_string("message:*refused* -> refused")
+    assert rules._get_matcher() is not other_rules._get_matcher()
+
+
 def test_discover_field_parsing(insta_snapshot):
     rules = FingerprintingRules.from_config_string(
         """
@@ -0,0 +1,129 @@
+"""
+End-to-end ingestion benchmark.
+
+Replays a corpus of sample events through the ingest consumer, the event
+processing tasks and ``post_process_group``. Kafka is replaced by feeding
+message batches to ``IngestConsumerWorker`` directly, Snuba by the base event
+stream, which dispatches ``post_process_group`` without writing anywhere, and
+TSDB by the in-memory TSDB of the test settings. Celery tasks run eagerly.
+
+No other external services are called. Native events are left out of the
+corpus, since they would be sent to Symbolicator, and JavaScript sources are
+not scraped from the web. Redis is not replaced: locks and rate limits use
+the local Redis that the test suite already requires, while caches, the
+processing store and buffers don't use Redis in the test settings.
+
+Run with ``pytest tests/sentry/ingest/test_benchmark.py --benchmark-json=<path>``
+to get machine readable results. Besides pytest-benchmark's timings of whole
+batches, ``extra_info`` holds the throughput in events per second, latency
+percentiles of the stages timed by the pipeline's own metrics, and the peak
+memory allocated while ingesting a batch.
+"""
+
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+
+import pytest
+
+from sentry.event_manager import EventManager
+from sentry.eventstream.base import EventStream
+from sentry.ingest.ingest_consumer import IngestConsumerWorker
+from sentry.utils import json, metrics
+from sentry.utils.samples import load_data
+from tests.sentry.grouping.test_benchmark import benchmark_available
+
+PLATFORMS = ["python", "javascript", "java", "php", "ruby", "android"]
+
+BATCH_SIZE = 50
+
+ROUNDS = 10
+
+
+def _get_corpus(project):
+    corpus = []
+    for platform in PLATFORMS:
+        data = load_data(platform)
+        data.pop("event_id", None)
+        manager = EventManager(data, project=project)
+        manager.normalize()
+        corpus.append(dict(manager.get_data()))
+    return corpus
+
+
+def _get_batch(corpus, project):
+    batch = []
+    for index in range(BATCH_SIZE):
+        event_id = uuid.uuid4().hex
+        payload = dict(corpus[index % len(corpus)], event_id=event_id)
+        batch.append(
+            {
+                "type": "event",
+                "payload": json.dumps(payload),
+                "start_time": time.time(),
+                "event_id": event_id,
+                "project_id": project.id,
+                "remote_addr": "127.0.0.1",
+            }
+        )
+    return batch
+
+
+def _get_percentiles(values):
+    values = sorted(values)
+    return {
+        f"p{percentile}": values[min(len(values) - 1, len(values) * percentile // 100)]
+        for percentile in (50, 90, 99)
+    }
+
+
+@pytest.fixture
+def stage_timings(monkeypatch):
+    """Records the durations of all stages timed with ``metrics.timer``."""
+    timings = defaultdict(list)
+    timing = metrics.timing
+
+    def record(key, value, instance=None, tags=None, sample_rate=1):
+        # Tasks are timed as ``jobs.duration`` with the task name as instance.
+        timings[instance if key == "jobs.duration" else key].append(value)
+        timing(key, value, instance, tags, sample_rate)
+
+    monkeypatch.setattr("sentry.utils.metrics.timing", record)
+    return timings
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+def test_benchmark_ingestion(default_project, task_runner, stage_timings, monkeypatch, benchmark):
+    monkeypatch.setattr("sentry.event_manager.eventstream.insert", EventStream().insert)
+    default_project.update_option("sentry:scrape_javascript", False)
+
+    corpus = _get_corpus(default_project)
+    worker = IngestConsumerWorker()
+    durations = []
+
+    def run(batch):
+        start = time.monotonic()
+        worker.flush_batch(batch)
+        durations.append(time.monotonic() - start)
+
+    with task_runner():
+        # Warm up caches and measure allocations outside of timed rounds, as
+        # tracing allocations slows the pipeline down considerably.
+        tracemalloc.start()
+        worker.flush_batch(_get_batch(corpus, default_project))
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stage_timings.clear()
+
+        benchmark.pedantic(
+            run, setup=lambda: ((_get_batch(corpus, default_project),), {}), rounds=ROUNDS
+        )
+
+    benchmark.extra_info["events_per_second"] = BATCH_SIZE * len(durations) / sum(durations)
+    benchmark.extra_info["peak_memory_bytes_per_batch"] = peak_memory
+    benchmark.extra_info["stages"] = {
+        stage: dict(_get_percentiles(values), count=len(values))
+        for stage, values in sorted(stage_timings.items())
+    }
@@ -9,7 +9,7 @@ from exam import fixture
 
 from sentry.api.serializers import serialize
 from sentry.api.serializers.models.userreport import UserReportWithGroupSerializer
-from sentry.digests.notifications import build_digest, event_to_record
+from sentry.digests.notifications import build_digest, event_to_record, unsplit_key
 from sentry.event_manager import EventManager, get_event_type
 from sentry.mail import mail_adapter, send_notification_as_email
 from sentry.mail.adapter import ActionTargetType
@@ -682,9 +682,62 @@ class MailAdapterRuleNotifyTest(BaseMailAdapterTest, TestCase):
         event = self.store_event(data={}, project_id=self.project.id)
         rule = Rule.objects.create(project=self.project, label="my rule")
 
+        digests.add_many.return_value = [False]
+
         futures = [RuleFuture(rule, {})]
         self.adapter.rule_notify(event, futures, ActionTargetType.ISSUE_OWNERS)
-        assert digests.add.call_count == 1
+        assert digests.add_many.call_count == 1
+
+    @mock.patch("sentry.mail.adapter.deliver_digest")
+    @mock.patch("sentry.mail.adapter.digests")
+    def test_digest_many(self, digests, deliver_digest):
+        digests.enabled.return_value = True
+        digests.add_many.return_value = [True, False, False]
+
+        event = self.store_event(data={}, project_id=self.project.id)
+        rule = Rule.objects.create(project=self.project, label="my rule")
+        other_rule = Rule.objects.create(project=self.project, label="my other rule")
+
+        futures = [
+            RuleFuture(rule, {"target_type": ActionTargetType.ISSUE_OWNERS}),
+            RuleFuture(
+                rule, {"target_type": ActionTargetType.MEMBER, "target_identifier": self.user.id}
+            ),
+            RuleFuture(other_rule, {"target_type": ActionTargetType.ISSUE_OWNERS}),
+        ]
+        self.adapter.rule_notify_many(event, futures)
+
+        assert digests.add_many.call_count == 1
+        items = digests.add_many.call_args[0][0]
+        assert [key for key, record in items] == [
+            unsplit_key(self.project, ActionTargetType.ISSUE_OWNERS, None),
+            unsplit_key(self.project, ActionTargetType.MEMBER, self.user.id),
+            unsplit_key(self.project, ActionTargetType.ISSUE_OWNERS, None),
+        ]
+        assert [record.value.rules for key, record in items] == [
+            [rule.id],
+            [rule.id],
+            [other_rule.id],
+        ]
+        deliver_digest.delay.assert_called_once_with(items[0][0])
+
+    @mock.patch("sentry.mail.adapter.MailAdapter.notify")
+    def test_notify_many_without_digests(self, notify):
+        event = self.store_event(data={}, project_id=self.project.id)
+        rule = Rule.objects.create(project=self.project, label="my rule")
+        other_rule = Rule.objects.create(project=self.project, label="my other rule")
+
+        self.adapter.rule_notify_many(
+            event,
+            [
+                RuleFuture(rule, {"target_type": ActionTargetType.ISSUE_OWNERS}),
+                RuleFuture(other_rule, {"target_type": ActionTargetType.ISSUE_OWNERS}),
+            ],
+        )
+
+        # Rules that notify the same target still send one notification each.
+        assert notify.call_count == 2
+        assert [call[0][0].rules for call in notify.call_args_list] == [[rule], [other_rule]]
 
 
 class MailAdapterShouldNotifyTest(BaseMailAdapterTest, TestCase):
@@ -0,0 +1,60 @@
+from sentry.metrics.buffer import MetricsBuffer
+from sentry.testutils import TestCase
+from sentry.utils.compat.mock import Mock
+
+
+class MetricsBufferTest(TestCase):
+    def setUp(self):
+        self.flush_func = Mock()
+        self.buffer = MetricsBuffer(
+            self.flush_func, name="test", flush_interval=3600, max_keys=3, max_timing_values=10
+        )
+
+    def test_aggregates_counters(self):
+        self.buffer.incr("foo", tags={"a": "1", "b": "2"})
+        self.buffer.incr("foo", tags={"b": "2", "a": "1"}, amount=2)
+        self.buffer.incr("foo", instance="bar")
+        self.buffer.flush()
+
+        (counters, timings), _ = self.flush_func.call_args
+        assert sorted(counters, key=repr) == [
+            ("foo", "bar", {}, 1),
+            ("foo", None, {"a": "1", "b": "2"}, 3),
+        ]
+        assert timings == []
+
+        self.flush_func.reset_mock()
+        self.buffer.flush()
+        assert not self.flush_func.called
+
+    def test_summarizes_timings(self):
+        for value in range(5):
+            self.buffer.timing("small", value)
+        for value in range(40):
+            self.buffer.timing("large", value)
+        self.buffer.flush()
+
+        (counters, timings), _ = self.flush_func.call_args
+        timings = {key: (values, sample_rate) for key, _, _, values, sample_rate in timings}
+        assert timings["small"] == ([0, 1, 2, 3, 4], 1.0)
+        values, sample_rate = timings["large"]
+        assert len(values) == 10
+        assert set(values) <= set(range(40))
+        assert sample_rate == 0.25
+
+    def test_drops_new_series_when_full(self):
+        self.buffer.incr("a")
+        self.buffer.incr("b")
+        self.buffer.timing("c", 1.0)
+        self.buffer.incr("d")
+        self.buffer.timing("e", 1.0)
+        self.buffer.incr("a")
+        self.buffer.flush()
+
+        (counters, timings), _ = self.flush_func.call_args
+        assert sorted(counters) == [
+            ("a", None, {}, 2),
+            ("b", None, {}, 1),
+            ("metrics.buffer.dropped", "test", {}, 2),
+        ]
+        assert timings == [("c", None, {}, [1.0], 1.0)]
@@ -2,7 +2,7 @@ from datadog.util.hostname import get_hostname
 
 from sentry.metrics.datadog import DatadogMetricsBackend
 from sentry.testutils import TestCase
-from sentry.utils.compat.mock import patch
+from sentry.utils.compat.mock import call, patch
 
 
 class DatadogMetricsBackendTest(TestCase):
@@ -22,3 +22,26 @@ class DatadogMetricsBackendTest(TestCase):
         mock_timing.assert_called_once_with(
             "sentrytest.foo", 30, sample_rate=1, tags=["instance:bar"], host=get_hostname()
         )
+
+    @patch("datadog.threadstats.base.ThreadStats.gauge")
+    def test_gauge(self, mock_gauge):
+        self.backend.gauge("foo", 5, instance="bar")
+        mock_gauge.assert_called_once_with(
+            "sentrytest.foo", 5, sample_rate=1, tags=["instance:bar"], host=get_hostname()
+        )
+
+    @patch("datadog.threadstats.base.ThreadStats.timing")
+    @patch("datadog.threadstats.base.ThreadStats.increment")
+    def test_flush_buffer(self, mock_incr, mock_timing):
+        self.backend.flush_buffer([], [("foo", "bar", {}, [2, 3], 0.25)])
+        mock_incr.assert_called_once_with(
+            "sentrytest.metrics.buffer.unsampled",
+            6,
+            sample_rate=1,
+            tags=["instance:foo"],
+            host=get_hostname(),
+        )
+        assert mock_timing.call_args_list == [
+            call("sentrytest.foo", value, sample_rate=1, tags=["instance:bar"], host=get_hostname())
+            for value in (2, 3)
+        ]
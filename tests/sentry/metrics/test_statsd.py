@@ -16,3 +16,18 @@ class StatsdMetricsBackendTest(TestCase):
     def test_timing(self, mock_timing):
         self.backend.timing("foo", 30)
         mock_timing.assert_called_once_with("sentrytest.foo", 30, 1)
+
+    @patch("statsd.StatsClient.gauge")
+    def test_gauge(self, mock_gauge):
+        self.backend.gauge("foo", 5)
+        mock_gauge.assert_called_once_with("sentrytest.foo", 5, 1)
+
+    @patch("statsd.StatsClient._send")
+    def test_flush_buffer(self, mock_send):
+        self.backend.flush_buffer(
+            [("foo", None, {}, 3)], [("bar", None, {}, [0.5], 1.0), ("baz", None, {}, [2], 0.25)]
+        )
+        mock_send.assert_called_once_with(
+            "sentrytest.foo:3|c\nsentrytest.metrics.buffer.unsampled:3|c\n"
+            "sentrytest.bar:0.500000|ms\nsentrytest.baz:2.000000|ms"
+        )
@@ -4,7 +4,7 @@ from exam import fixture, patcher
 
 from sentry.constants import DataCategory
 from sentry.quotas.base import QuotaConfig, QuotaScope
-from sentry.quotas.redis import RedisQuota, is_rate_limited
+from sentry.quotas.redis import RedisQuota, is_rate_limited, is_rate_limited_many
 from sentry.testutils import TestCase
 from sentry.utils.compat import map, mock
 from sentry.utils.redis import clusters
@@ -78,6 +78,41 @@ def test_is_rate_limited_script():
     assert map(bool, is_rate_limited(client, ("orange", "apple"), (1, now + 60))) == [False]
 
 
+def test_is_rate_limited_many_script():
+    now = int(time.time())
+
+    cluster = clusters.get("default")
+    client = cluster.get_local_client(next(iter(cluster.hosts)))
+
+    keys = ("foo", "r:foo", "bar", "r:bar", "foo", "r:foo")
+    args = (2, 1, 10, now + 60, 20, now + 120, 1, 5, 10, now + 60)
+
+    # Neither item should be rate limited, and the second item should observe
+    # the consumption of the first one.
+    assert [list(map(bool, r)) for r in is_rate_limited_many(client, keys, args)] == [
+        [False, False],
+        [False],
+    ]
+    assert client.get("foo") == b"6"
+    assert client.get("bar") == b"1"
+
+    # The second item exceeds ``foo`` now, while the first one still fits.
+    assert [list(map(bool, r)) for r in is_rate_limited_many(client, keys, args)] == [
+        [False, False],
+        [True],
+    ]
+    assert client.get("foo") == b"7"
+    assert client.get("bar") == b"2"
+    assert 59 <= client.ttl("foo") <= 60
+    assert 119 <= client.ttl("bar") <= 120
+
+    # Refunds are taken into account.
+    client.set("r:foo", 5)
+    assert [list(map(bool, r)) for r in is_rate_limited_many(client, keys[4:], args[6:])] == [
+        [False]
+    ]
+
+
 class RedisQuotaTest(TestCase):
     quota = fixture(RedisQuota)
 
@@ -318,3 +353,58 @@ class RedisQuotaTest(TestCase):
         # count for these quotas and None for the others.
         # The ``- 1`` is because we refunded once.
         assert usage == [n - 1 if q.id else None for q in quotas] + [0, 0]
+
+    def test_is_rate_limited_many(self):
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (3, 60)
+        self.get_organization_quota.return_value = (10, 60)
+
+        other_project = self.create_project(organization=self.organization)
+
+        results = self.quota.is_rate_limited_many(
+            [
+                (self.project, None, DataCategory.ERROR, 1),
+                (self.project, None, DataCategory.ERROR, 2),
+                (self.project, None, DataCategory.ERROR, 1),
+                (other_project, None, None, None),
+            ],
+            timestamp=timestamp,
+        )
+
+        assert [r.is_limited for r in results] == [False, False, True, False]
+        assert results[2].reason_code == "project_quota"
+
+        quotas = self.quota.get_quotas(self.project)
+        usage = self.quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp)
+        assert usage == [3, 4]
+
+    @mock.patch("sentry.quotas.redis.is_rate_limited_many")
+    @mock.patch.object(RedisQuota, "get_quotas", return_value=[])
+    def test_is_rate_limited_many_without_any_quota(self, get_quotas, is_rate_limited_many):
+        results = self.quota.is_rate_limited_many([(self.project, None, None, None)])
+        assert not is_rate_limited_many.called
+        assert [r.is_limited for r in results] == [False]
+
+    def test_refund_many(self):
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (200, 60)
+        self.get_organization_quota.return_value = (300, 60)
+
+        n = 10
+        for _ in range(n):
+            self.quota.is_rate_limited(self.project, timestamp=timestamp)
+
+        self.quota.refund_many(
+            [
+                (self.project, None, None, None),
+                (self.project, None, DataCategory.ERROR, 2),
+                (self.project, None, DataCategory.ATTACHMENT, 100),
+            ],
+            timestamp=timestamp,
+        )
+
+        quotas = self.quota.get_quotas(self.project)
+        usage = self.quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp)
+        assert usage == [n - 3, n - 3]
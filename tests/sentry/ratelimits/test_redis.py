@@ -1,5 +1,6 @@
-from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.ratelimits.redis import LocalLimitCache, RedisRateLimiter
 from sentry.testutils import TestCase
+from sentry.utils.compat import mock
 
 
 class RedisRateLimiterTest(TestCase):
@@ -13,3 +14,90 @@ class RedisRateLimiterTest(TestCase):
     def test_simple_key(self):
         assert not self.backend.is_limited("foo", 1)
         assert self.backend.is_limited("foo", 1)
+
+    def test_is_limited_many(self):
+        assert self.backend.is_limited_many(
+            [("foo", 1, None, None), ("foo", 1, None, None), ("bar", 1, self.project, None)]
+        ) == [False, True, False]
+
+
+class SlidingWindowRateLimiterTest(TestCase):
+    def setUp(self):
+        self.backend = RedisRateLimiter(strategy="sliding_window")
+
+    def test_simple_key(self):
+        assert not self.backend.is_limited("foo", 2)
+        assert not self.backend.is_limited("foo", 2)
+        assert self.backend.is_limited("foo", 2)
+
+    def test_previous_window(self):
+        with mock.patch("sentry.ratelimits.redis.time", return_value=6000.0):
+            assert self.backend.is_limited_many([("foo", 3, None, 60)] * 4) == [
+                False,
+                False,
+                False,
+                True,
+            ]
+
+        # A quarter into the next window, three quarters of the previous
+        # window's requests still count.
+        with mock.patch("sentry.ratelimits.redis.time", return_value=6075.0):
+            assert self.backend.is_limited("foo", 3, window=60)
+
+        with mock.patch("sentry.ratelimits.redis.time", return_value=6080.0):
+            assert not self.backend.is_limited("foo", 3, window=60)
+
+    def test_shares_fixed_window_counters(self):
+        fixed_window = RedisRateLimiter()
+        with mock.patch("sentry.ratelimits.redis.time", return_value=6000.0):
+            assert not fixed_window.is_limited("foo", 2, window=60)
+            assert not fixed_window.is_limited("foo", 2, window=60)
+            assert self.backend.is_limited("foo", 2, window=60)
+
+
+class GCRARateLimiterTest(TestCase):
+    def setUp(self):
+        self.backend = RedisRateLimiter(strategy="gcra")
+
+    def test_burst_and_refill(self):
+        with mock.patch("sentry.ratelimits.redis.time", return_value=6000.0):
+            assert self.backend.is_limited_many([("foo", 3, self.project, 60)] * 4) == [
+                False,
+                False,
+                False,
+                True,
+            ]
+
+        # One token is refilled every 20 seconds.
+        with mock.patch("sentry.ratelimits.redis.time", return_value=6020.0):
+            assert not self.backend.is_limited("foo", 3, self.project, 60)
+            assert self.backend.is_limited("foo", 3, self.project, 60)
+
+
+class LocalCacheRateLimiterTest(TestCase):
+    def setUp(self):
+        self.backend = RedisRateLimiter(strategy="gcra", local_cache_size=10)
+
+    @mock.patch("sentry.ratelimits.redis.ratelimits")
+    def test_skips_redis_for_limited_keys(self, ratelimits):
+        ratelimits.return_value = [(1, b"30")]
+        assert self.backend.is_limited("foo", 1)
+        assert ratelimits.call_count == 1
+
+        assert self.backend.is_limited("foo", 1)
+        assert ratelimits.call_count == 1
+
+        # Different limits are cached separately.
+        ratelimits.return_value = [(0, b"0")]
+        assert not self.backend.is_limited("foo", 2)
+        assert ratelimits.call_count == 2
+
+    def test_local_cache_expiry(self):
+        cache = LocalLimitCache(2)
+        cache.set("foo", 10)
+        cache.set("bar", 10)
+        cache.set("baz", 10)
+
+        assert not cache.get("foo", 5)
+        assert cache.get("bar", 5)
+        assert not cache.get("bar", 10)
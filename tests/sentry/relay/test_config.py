@@ -1,8 +1,11 @@
 import pytest
 
 from sentry.models import ProjectKey
-from sentry.relay.config import get_project_config
+from sentry.relay import config
+from sentry.relay.config import get_features, get_project_config
 from sentry.testutils.helpers import Feature
+from sentry.utils.cache import cache
+from sentry.utils.compat import mock
 from sentry.utils.safe import get_path
 
 PII_CONFIG = """
@@ -105,3 +108,52 @@ def test_project_config_with_breakdown(default_project, insta_snapshot):
 
     cfg = cfg.to_dict()
     insta_snapshot(cfg["config"]["breakdowns"])
+
+
+@pytest.mark.django_db
+def test_project_config_caches_filter_settings(default_project):
+    cache.clear()
+
+    with mock.patch.object(
+        config, "get_filter_settings", wraps=config.get_filter_settings
+    ) as get_filter_settings:
+        first = get_project_config(default_project, full_config=True).to_dict()
+        second = get_project_config(default_project, full_config=True).to_dict()
+        assert get_filter_settings.call_count == 1
+        assert first["config"]["filterSettings"] == second["config"]["filterSettings"]
+
+        # Changing a project option recomputes the section.
+        default_project.update_option("sentry:blacklisted_ips", ["127.0.0.1"])
+        cfg = get_project_config(default_project, full_config=True).to_dict()
+        assert get_filter_settings.call_count == 2
+        assert cfg["config"]["filterSettings"]["clientIps"] == {"blacklistedIps": ["127.0.0.1"]}
+
+        # So does a change of the features it depends on.
+        with Feature({"projects:custom-inbound-filters": True}):
+            get_project_config(default_project, full_config=True)
+        assert get_filter_settings.call_count == 3
+
+
+@pytest.mark.django_db
+def test_get_features_uses_batch_has(default_project):
+    batch_results = {
+        f"organization:{default_project.organization_id}": {
+            "organizations:metrics-extraction": True
+        }
+    }
+
+    def batch_has(feature_names, projects=None, organization=None, **kwargs):
+        return None if projects else batch_results
+
+    with mock.patch("sentry.features.batch_has", side_effect=batch_has), Feature(
+        {"projects:custom-inbound-filters": True}
+    ):
+        enabled_features = get_features(
+            default_project,
+            ["organizations:metrics-extraction", "projects:custom-inbound-filters"],
+        )
+
+    assert enabled_features == {
+        "organizations:metrics-extraction": True,
+        "projects:custom-inbound-filters": True,
+    }
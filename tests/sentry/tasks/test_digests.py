@@ -4,7 +4,7 @@ import sentry
 from sentry.digests.backends.redis import RedisBackend
 from sentry.digests.notifications import event_to_record
 from sentry.models.rule import Rule
-from sentry.tasks.digests import deliver_digest
+from sentry.tasks.digests import deliver_digest, deliver_digests
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
 from sentry.utils.compat.mock import patch
@@ -44,3 +44,23 @@ class DeliverDigestTest(TestCase):
     @patch.object(sentry, "digests")
     def test_member_key(self, digests):
         self.run_test(f"mail:p:{self.project.id}:Member:{self.user.id}", digests)
+
+    @patch.object(sentry, "digests")
+    def test_batch(self, digests):
+        backend = RedisBackend()
+        rule = Rule.objects.create(project=self.project, label="Test Rule", data={})
+        event = self.store_event(
+            data={"timestamp": iso_format(before_now(days=1)), "fingerprint": ["group-1"]},
+            project_id=self.project.id,
+        )
+        keys = [f"mail:p:{self.project.id}", f"mail:p:{self.project.id}:IssueOwners:"]
+        backend.add_many(
+            [(key, event_to_record(event, [rule])) for key in keys],
+            increment_delay=0,
+            maximum_delay=0,
+        )
+        digests.digest_many = backend.digest_many
+        with self.tasks():
+            deliver_digests(keys)
+        assert len(mail.outbox) == 2
+        assert all("1 new alert since" in message.subject for message in mail.outbox)
@@ -1,5 +1,16 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
 from sentry import eventstore, eventstream
-from sentry.models import Group, GroupEnvironment, GroupMeta, GroupRedirect, UserReport
+from sentry.models import (
+    Group,
+    GroupEnvironment,
+    GroupMeta,
+    GroupRedirect,
+    GroupRelease,
+    UserReport,
+)
 from sentry.similarity import _make_index_backend
 from sentry.tasks.merge import merge_groups
 from sentry.testutils import TestCase
@@ -45,6 +56,58 @@ class MergeGroupTest(TestCase):
             .values_list("environment_id", flat=True)
         ) == [1, 2]
 
+    def test_bulk_merge_objects(self):
+        now = timezone.now()
+        group1 = self.create_group(self.project)
+        group2 = self.create_group(self.project)
+
+        GroupEnvironment.objects.create(
+            group_id=group1.id, environment_id=1, first_seen=now - timedelta(days=2)
+        )
+        GroupEnvironment.objects.create(group_id=group1.id, environment_id=2, first_seen=now)
+        GroupEnvironment.objects.create(
+            group_id=group2.id, environment_id=1, first_seen=now - timedelta(days=1)
+        )
+
+        for group, first_seen, last_seen in [
+            (group1, now - timedelta(days=3), now - timedelta(days=2)),
+            (group2, now - timedelta(days=1), now),
+        ]:
+            GroupRelease.objects.create(
+                project_id=self.project.id,
+                group_id=group.id,
+                release_id=1,
+                environment="production",
+                first_seen=first_seen,
+                last_seen=last_seen,
+            )
+
+        GroupMeta.objects.create(group=group1, key="github:tid", value="134")
+        GroupMeta.objects.create(group=group1, key="other:tid", value="567")
+        GroupMeta.objects.create(group=group2, key="other:tid", value="abc")
+
+        with self.tasks(), self.options({"merge.bulk-objects": True}):
+            merge_groups([group1.id], group2.id)
+
+        assert not Group.objects.filter(id=group1.id).exists()
+
+        assert list(
+            GroupEnvironment.objects.filter(group_id=group2.id)
+            .order_by("environment")
+            .values_list("environment_id", "first_seen")
+        ) == [(1, now - timedelta(days=2)), (2, now)]
+
+        assert list(
+            GroupRelease.objects.filter(group_id__in=[group1.id, group2.id]).values_list(
+                "group_id", "first_seen", "last_seen"
+            )
+        ) == [(group2.id, now - timedelta(days=3), now)]
+
+        assert dict(GroupMeta.objects.filter(group=group2).values_list("key", "value")) == {
+            "github:tid": "134",
+            "other:tid": "abc",
+        }
+
     def test_merge_with_event_integrity(self):
         project = self.create_project()
         event1 = self.store_event(
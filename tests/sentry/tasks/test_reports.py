@@ -13,10 +13,13 @@ from sentry.models import GroupStatus, Project, UserOption
 from sentry.tasks.reports import (
     DISABLED_ORGANIZATIONS_USER_OPTION_KEY,
     DummyReportBackend,
+    RedisReportBackend,
     Report,
     Skipped,
     build_message,
+    build_organization_reports,
     build_project_issue_summaries,
+    build_project_report,
     build_project_series,
     change,
     clean_series,
@@ -27,6 +30,7 @@ from sentry.tasks.reports import (
     has_valid_aggregates,
     index_to_month,
     merge_mappings,
+    merge_reports,
     merge_sequences,
     merge_series,
     month_to_index,
@@ -37,6 +41,7 @@ from sentry.tasks.reports import (
 from sentry.testutils.cases import OutcomesSnubaTest, SnubaTestCase, TestCase
 from sentry.testutils.factories import DEFAULT_EVENT_DATA
 from sentry.testutils.helpers.datetime import iso_format
+from sentry.utils import redis
 from sentry.utils.compat import map, mock
 from sentry.utils.dates import floor_to_utc_day, to_datetime, to_timestamp
 from sentry.utils.outcomes import Outcome
@@ -360,6 +365,55 @@ class ReportTestCase(TestCase, SnubaTestCase):
             map(lambda x: x[1] == (2, 0), response)
         ), "must show two issues resolved in one rollup window"
 
+    def test_build_organization_reports_matches_project_reports(self):
+        now = timezone.now()
+        interval = (floor_to_utc_day(now - timedelta(days=7)), floor_to_utc_day(now))
+
+        projects = [self.project, self.create_project(organization=self.organization)]
+        for i, project in enumerate(projects):
+            for j in range(i + 1):
+                event = self.store_event(
+                    data={
+                        "message": "message",
+                        "timestamp": iso_format(now - timedelta(days=3)),
+                        "fingerprint": [f"group-{j}"],
+                    },
+                    project_id=project.id,
+                )
+            tsdb.incr(tsdb.models.project, project.id, now - timedelta(days=3), count=i + 2)
+
+        group = event.group
+        group.status = GroupStatus.RESOLVED
+        group.resolved_at = now - timedelta(days=2)
+        group.save()
+
+        reports = build_organization_reports(interval, projects)
+        assert reports == [build_project_report(interval, project) for project in projects]
+        assert reports[0] != reports[1]
+
+        assert build_organization_reports(interval, []) == []
+
+    def test_redis_backend_caches_organization_report(self):
+        backend = RedisReportBackend(redis.clusters.get("default"), 60)
+        timestamp = to_timestamp(floor_to_utc_day(timezone.now()))
+        duration = 60 * 60 * 24 * 7
+
+        projects = [self.project, self.create_project(organization=self.organization)]
+        for project in projects:
+            tsdb.incr(tsdb.models.project, project.id, to_datetime(timestamp) - timedelta(days=3))
+
+        backend.prepare(timestamp, duration, self.organization)
+
+        reports = list(backend.fetch(timestamp, duration, self.organization, projects))
+        report = backend.fetch_organization_report(timestamp, duration, self.organization, projects)
+        assert report.aggregates == [0, 0, 0, 2]
+        assert report == functools.reduce(merge_reports, reports)
+
+        assert (
+            backend.fetch_organization_report(timestamp, duration, self.organization, projects[:1])
+            is None
+        )
+
 
 class ReportAcceptanceTest(OutcomesSnubaTest, SnubaTestCase):
     @mock.patch("sentry.tasks.reports.backend", DummyReportBackend())
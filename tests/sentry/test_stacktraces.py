@@ -2,11 +2,15 @@ import pytest
 
 from sentry.grouping.api import get_default_grouping_config_dict, load_grouping_config
 from sentry.stacktraces.processing import (
+    StacktraceProcessor,
     find_stacktraces_in_data,
     get_crash_frame_from_event_data,
+    get_stacktrace_processing_task,
+    local_frame_cache,
     normalize_stacktraces_for_grouping,
 )
 from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
 
 
 class FindStacktracesTest(TestCase):
@@ -157,6 +161,63 @@ class FindStacktracesTest(TestCase):
         assert len(infos[0].stacktrace["frames"]) == 3
 
 
+class UppercaseProcessor(StacktraceProcessor):
+    def handles_frame(self, frame, stacktrace_info):
+        return "function" in frame
+
+    def preprocess_frame(self, processable_frame):
+        processable_frame.set_cache_key_from_values((processable_frame["function"],))
+
+    def process_frame(self, processable_frame, processing_task):
+        if processable_frame.cache_value is None:
+            processable_frame.set_cache_value(processable_frame["function"].upper())
+
+
+class FrameCacheTest(TestCase):
+    def setUp(self):
+        local_frame_cache.clear()
+
+    def get_processing_task(self, release="1.0"):
+        data = {
+            "release": release,
+            "stacktrace": {"frames": [{"function": "a"}, {"function": "b"}, {"function": "a"}]},
+        }
+        infos = find_stacktraces_in_data(data)
+        processor = UppercaseProcessor(data, infos, project=self.project)
+        return get_stacktrace_processing_task(infos, [processor])
+
+    def process(self, processing_task):
+        for frame in processing_task.iter_processable_frames():
+            frame.processor.process_frame(frame, processing_task)
+        return [frame.cache_value for frame in processing_task.iter_processable_frames()]
+
+    def test_shared_across_events(self):
+        with override_options(
+            {"processing.frame-cache.local-size": 10, "processing.frame-cache.shared": False}
+        ):
+            assert self.process(self.get_processing_task()) == [None, None, None]
+            assert self.process(self.get_processing_task()) == ["A", "B", "A"]
+            assert self.process(self.get_processing_task(release="2.0")) == [None, None, None]
+
+    def test_local_cache_is_bounded(self):
+        with override_options(
+            {"processing.frame-cache.local-size": 1, "processing.frame-cache.shared": False}
+        ):
+            self.process(self.get_processing_task())
+            assert self.process(self.get_processing_task()) == ["A", None, "A"]
+
+    def test_shared_cache(self):
+        with override_options(
+            {"processing.frame-cache.local-size": 0, "processing.frame-cache.shared": True}
+        ):
+            self.process(self.get_processing_task())
+            assert self.process(self.get_processing_task()) == ["A", "B", "A"]
+
+    def test_disabled_by_default(self):
+        self.process(self.get_processing_task())
+        assert self.process(self.get_processing_task()) == [None, None, None]
+
+
 class NormalizeInApptest(TestCase):
     def test_normalize_with_system_frames(self):
         data = {
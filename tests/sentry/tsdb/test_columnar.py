@@ -0,0 +1,220 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+from sentry.testutils import TestCase
+from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
+from sentry.tsdb.columnar import ColumnarTSDB, RingBuffer
+from sentry.utils.dates import to_timestamp
+
+
+def test_ring_buffer():
+    buffer = RingBuffer(3, dict)
+    assert buffer.get(10) is None
+
+    column = buffer.get_or_create(10)
+    column[0] = "a"
+    assert buffer.get(10) is column
+    assert buffer.get_or_create(10) is column
+    assert list(buffer) == [column]
+
+    # Epoch 13 reuses the column of epoch 10, after which 10 is dropped.
+    assert buffer.get_or_create(13) == {}
+    assert buffer.get(10) is None
+    assert buffer.get_or_create(10) is None
+
+
+class ColumnarTSDBTest(TestCase):
+    def setUp(self):
+        self.db = ColumnarTSDB(
+            rollups=(
+                # time in seconds, samples to keep
+                (10, 30),  # 5 minutes at 10 seconds
+                (ONE_MINUTE, 120),  # 2 hours at 1 minute
+                (ONE_HOUR, 24),  # 1 days at 1 hour
+                (ONE_DAY, 30),  # 30 days at 1 day
+            )
+        )
+
+    def test_simple(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+
+        def timestamp(d):
+            t = int(to_timestamp(d))
+            return t - (t % 3600)
+
+        self.db.incr(TSDBModel.project, 1, dts[0])
+        self.db.incr(TSDBModel.project, 1, dts[1], count=2)
+        self.db.incr(TSDBModel.project, 1, dts[1], environment_id=1)
+        self.db.incr(TSDBModel.project, 1, dts[2])
+        self.db.incr_multi(
+            [(TSDBModel.project, 1), (TSDBModel.project, 2)], dts[3], count=3, environment_id=1
+        )
+
+        results = self.db.get_range(TSDBModel.project, [1, 2], dts[0], dts[-1])
+        assert results == {
+            1: [
+                (timestamp(dts[0]), 1),
+                (timestamp(dts[1]), 3),
+                (timestamp(dts[2]), 1),
+                (timestamp(dts[3]), 3),
+            ],
+            2: [(timestamp(dts[i]), 3 if i == 3 else 0) for i in range(4)],
+        }
+
+        results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
+        assert results == {1: 4, 2: 3}
+
+        self.db.merge(TSDBModel.project, 1, [2], now, environment_ids=[0, 1])
+
+        results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1])
+        assert results == {1: 11, 2: 0}
+
+        results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
+        assert results == {1: 7, 2: 0}
+
+        self.db.delete([TSDBModel.project], [1, 2], dts[0], dts[-1], environment_ids=[0, 1])
+
+        results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1])
+        assert results == {1: 0, 2: 0}
+
+    def test_count_distinct(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+
+        model = TSDBModel.users_affected_by_group
+
+        def timestamp(d):
+            t = int(to_timestamp(d))
+            return t - (t % 3600)
+
+        self.db.record(model, 1, ("foo", "bar"), dts[0])
+        self.db.record(model, 1, ("baz",), dts[1], environment_id=1)
+        self.db.record_multi(((model, 1, ("foo", "bar")), (model, 2, ("bar",))), dts[2])
+        self.db.record(model, 2, ("foo",), dts[3])
+
+        assert self.db.get_distinct_counts_series(model, [1], dts[0], dts[-1], rollup=3600) == {
+            1: [
+                (timestamp(dts[0]), 2),
+                (timestamp(dts[1]), 1),
+                (timestamp(dts[2]), 2),
+                (timestamp(dts[3]), 0),
+            ]
+        }
+
+        results = self.db.get_distinct_counts_totals(model, [1, 2], dts[0], dts[-1], rollup=3600)
+        assert results == {1: 3, 2: 2}
+
+        results = self.db.get_distinct_counts_totals(
+            model, [1, 2], dts[0], dts[-1], rollup=3600, environment_id=1
+        )
+        assert results == {1: 1, 2: 0}
+
+        assert self.db.get_distinct_counts_union(model, [], dts[0], dts[-1], rollup=3600) == 0
+        assert self.db.get_distinct_counts_union(model, [1, 2], dts[0], dts[-1], rollup=3600) == 3
+
+        self.db.merge_distinct_counts(model, 1, [2], dts[0], environment_ids=[1])
+
+        results = self.db.get_distinct_counts_totals(model, [1, 2], dts[0], dts[-1], rollup=3600)
+        assert results == {1: 3, 2: 0}
+
+        self.db.delete_distinct_counts([model], [1, 2], dts[0], dts[-1], environment_ids=[1])
+
+        results = self.db.get_distinct_counts_totals(model, [1, 2], dts[0], dts[-1])
+        assert results == {1: 0, 2: 0}
+
+    def test_count_distinct_sketches(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        model = TSDBModel.users_affected_by_group
+
+        self.db.record(model, 1, range(1000), now)
+        self.db.record(model, 2, range(500, 600), now)
+        self.db.record(model, 3, range(2000, 3000), now)
+
+        results = self.db.get_distinct_counts_totals(model, [1, 2], now, rollup=3600)
+        assert 950 < results[1] < 1050
+        assert results[2] == 100
+
+        assert 950 < self.db.get_distinct_counts_union(model, [1, 2], now, rollup=3600) < 1050
+        assert 1900 < self.db.get_distinct_counts_union(model, [1, 3], now, rollup=3600) < 2100
+
+        self.db.merge_distinct_counts(model, 2, [1, 3], now)
+        results = self.db.get_distinct_counts_totals(model, [1, 2, 3], now, rollup=3600)
+        assert results[1] == results[3] == 0
+        assert 1900 < results[2] < 2100
+
+    def test_frequency_tables(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        model = TSDBModel.frequent_issues_by_project
+
+        rollup = 3600
+        timestamp = int(to_timestamp(now) // rollup) * rollup
+
+        self.db.record_frequency_multi(
+            ((model, {"organization:1": {"project:1": 1, "project:2": 2, "project:3": 3}}),), now
+        )
+        self.db.record_frequency_multi(
+            (
+                (
+                    model,
+                    {
+                        "organization:1": {"project:1": 1, "project:4": 1},
+                        "organization:2": {"project:5": 1},
+                    },
+                ),
+            ),
+            now - timedelta(hours=1),
+        )
+
+        assert self.db.get_most_frequent(
+            model, ("organization:1", "organization:2"), now, limit=2, rollup=rollup
+        ) == {"organization:1": [("project:3", 3.0), ("project:2", 2.0)], "organization:2": []}
+
+        assert self.db.get_most_frequent_series(
+            model,
+            ("organization:2", "organization:3"),
+            now - timedelta(hours=1),
+            now,
+            rollup=rollup,
+        ) == {
+            "organization:2": [(timestamp - rollup, {"project:5": 1.0}), (timestamp, {})],
+            "organization:3": [(timestamp - rollup, {}), (timestamp, {})],
+        }
+
+        assert (
+            self.db.get_frequency_totals(
+                model,
+                {"organization:1": ("project:1", "project:4", "project:5")},
+                now - timedelta(hours=1),
+                now,
+                rollup=rollup,
+            )
+            == {"organization:1": {"project:1": 2.0, "project:4": 1.0, "project:5": 0.0}}
+        )
+
+        self.db.merge_frequencies(model, "organization:1", ["organization:2"], now)
+
+        results = self.db.get_most_frequent(
+            model,
+            ("organization:1", "organization:2"),
+            now - timedelta(hours=1),
+            now,
+            rollup=rollup,
+        )
+        assert dict(results["organization:1"]) == {
+            "project:1": 2.0,
+            "project:2": 2.0,
+            "project:3": 3.0,
+            "project:4": 1.0,
+            "project:5": 1.0,
+        }
+        assert results["organization:2"] == []
+
+        self.db.delete_frequencies(
+            [model], ["organization:1"], now - timedelta(hours=1), now, environment_ids=[]
+        )
+
+        assert self.db.get_most_frequent(
+            model, ("organization:1",), now - timedelta(hours=1), now, rollup=rollup
+        ) == {"organization:1": []}
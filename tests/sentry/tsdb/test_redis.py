@@ -262,6 +262,26 @@ class RedisTSDBTest(TestCase):
             == 0
         )
 
+        for merge_locally in (False, True):
+            assert (
+                self.db.get_distinct_counts_union(
+                    model, [1, 2], dts[0], dts[-1], rollup=3600, merge_locally=merge_locally
+                )
+                == 3
+            )
+            assert (
+                self.db.get_distinct_counts_union(
+                    model,
+                    [1, 2],
+                    dts[0],
+                    dts[-1],
+                    rollup=3600,
+                    environment_id=1,
+                    merge_locally=merge_locally,
+                )
+                == 1
+            )
+
         self.db.merge_distinct_counts(model, 1, [2], dts[0], environment_ids=[0, 1])
 
         assert self.db.get_distinct_counts_series(model, [1], dts[0], dts[-1], rollup=3600) == {
@@ -587,6 +607,80 @@ class RedisTSDBTest(TestCase):
             model, ("organization:1", "organization:2"), now, environment_id=1
         ) == {"organization:1": [], "organization:2": []}
 
+    def test_frequency_tables_batch(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        model = TSDBModel.frequent_issues_by_project
+
+        rollup = 3600
+        timestamp = int(to_timestamp(now) // rollup) * rollup
+
+        # Enough keys that their commands are batched on every host.
+        keys = [f"organization:{i}" for i in range(30)]
+        router = self.db.cluster.get_router()
+        assert len({router.get_host_for_key(key) for key in keys}) == len(self.db.cluster.hosts)
+
+        self.db.record_frequency_multi(
+            ((model, {key: {"project:1": i + 1, "project:2": 1} for i, key in enumerate(keys)}),),
+            now - timedelta(hours=1),
+        )
+        self.db.record_frequency_multi(
+            ((model, {key: {"project:1": 1} for key in keys[::2]}),),
+            now,
+        )
+
+        def get_expected(i):
+            return {"project:1": i + 1 + (1 if i % 2 == 0 else 0), "project:2": 1}
+
+        results = self.db.get_most_frequent(
+            model, keys, now - timedelta(hours=1), now, rollup=rollup
+        )
+        assert set(results) == set(keys)
+        for i, key in enumerate(keys):
+            assert dict(results[key]) == get_expected(i)
+
+        items = {key: ("project:1", "project:2", "project:3") for key in keys}
+        results = self.db.get_frequency_series(
+            model, items, now - timedelta(hours=1), now, rollup=rollup
+        )
+        for i, key in enumerate(keys):
+            assert results[key] == [
+                (timestamp - rollup, {"project:1": i + 1, "project:2": 1.0, "project:3": 0.0}),
+                (
+                    timestamp,
+                    {"project:1": 1.0 if i % 2 == 0 else 0.0, "project:2": 0.0, "project:3": 0.0},
+                ),
+            ]
+
+        items = {key: ("project:1", "project:2", "project:3") for key in keys}
+        results = self.db.get_frequency_totals(
+            model, items, now - timedelta(hours=1), now, rollup=rollup
+        )
+        assert results == {key: {**get_expected(i), "project:3": 0.0} for i, key in enumerate(keys)}
+
+    def test_record_frequency_multi_expiry(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        model = TSDBModel.frequent_issues_by_project
+        self.db.models_with_environment_support = self.db.models_with_environment_support | {model}
+
+        self.db.record_frequency_multi(
+            ((model, {"organization:1": {"project:1": 1}, "organization:2": {"project:2": 1}}),),
+            now,
+            environment_id=1,
+        )
+
+        ts = int(to_timestamp(now))
+        for key in ("organization:1", "organization:2"):
+            client = self.db.cluster.get_local_client_for_key(key)
+            for rollup, max_values in self.db.rollups.items():
+                expiry = self.db.calculate_expiry(rollup, max_values, now)
+                for environment_id in (None, 1):
+                    # Small tables only have an index, and no estimators.
+                    index_key, estimators_key = self.db.make_frequency_table_keys(
+                        model, rollup, ts, key, environment_id
+                    )
+                    assert 0 < client.ttl(index_key) <= expiry - ts
+                    assert not client.exists(estimators_key)
+
     def test_frequency_table_import_export_no_estimators(self):
         client = self.db.cluster.get_local_client_for_key("key")
 
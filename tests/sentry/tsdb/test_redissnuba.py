@@ -1,6 +1,11 @@
+from datetime import datetime, timedelta
+
+import pytz
+
 from sentry.tsdb.base import TSDBModel
-from sentry.tsdb.redissnuba import READ, method_specifications, selector_func
+from sentry.tsdb.redissnuba import READ, RedisSnubaTSDB, method_specifications, selector_func
 from sentry.tsdb.snuba import SnubaTSDB
+from sentry.utils.compat import mock
 
 
 def get_callargs(model):
@@ -36,3 +41,19 @@ def test_redissnuba_connects_to_correct_backend():
                 assert "snuba" == selector_func(method, get_callargs(model))
             else:
                 assert "dummy" == selector_func(method, get_callargs(model))
+
+
+def test_redissnuba_passes_backend_specific_arguments():
+    tsdb = RedisSnubaTSDB()
+    end = datetime.now(pytz.utc)
+    start = end - timedelta(days=1)
+
+    # Users affected are read from Snuba, which ignores ``merge_locally``.
+    snuba = tsdb.backends["snuba"]
+    with mock.patch.object(snuba, "get_distinct_counts_union", autospec=True) as union:
+        tsdb.get_distinct_counts_union(
+            TSDBModel.users_affected_by_group, [1], start, end, merge_locally=True
+        )
+    union.assert_called_once_with(
+        TSDBModel.users_affected_by_group, [1], start, end, merge_locally=True
+    )
@@ -0,0 +1,139 @@
+import datetime
+import decimal
+import io
+import uuid
+from collections import namedtuple
+from enum import Enum
+
+import pytest
+from django.test import override_settings
+from django.utils.translation import ugettext_lazy as _
+
+from bitfield.types import BitHandler
+from sentry.utils import json
+
+Point = namedtuple("Point", "x y")
+
+VALUES = [
+    None,
+    True,
+    0,
+    -(2 ** 63),
+    2 ** 64 - 1,
+    2 ** 70,
+    1.5,
+    float("nan"),
+    float("inf"),
+    "",
+    "word",
+    "caf\xe9 ☃",
+    "\ud800",
+    "<script>alert('&');</script>",
+    [1, [2, [3]]],
+    (1, 2),
+    {"a": {"b": None}},
+    {1: "int key", None: "null key"},
+    datetime.datetime(2011, 1, 1, 1, 1, 1, 123),
+    datetime.date(2011, 1, 1),
+    datetime.time(1, 1, 1, 500),
+    {"foo"},
+    frozenset(["foo"]),
+    decimal.Decimal("1.50"),
+    decimal.Decimal("100"),
+    decimal.Decimal("12345678901234567890"),
+    Enum("foo", "a b c").b,
+    BitHandler(5, ["a", "b", "c"]),
+    _("word"),
+    Point(1, 2),
+    len,
+    uuid.UUID("8a5e6a8c-6b1f-4f7e-9a4e-5f2d6c1b3e90"),
+    {"a": [1, (uuid.UUID("8a5e6a8c-6b1f-4f7e-9a4e-5f2d6c1b3e90"),)]},
+    {uuid.UUID("8a5e6a8c-6b1f-4f7e-9a4e-5f2d6c1b3e90")},
+    Point(uuid.UUID("8a5e6a8c-6b1f-4f7e-9a4e-5f2d6c1b3e90"), [2]),
+]
+
+DOCUMENTS = [
+    "null",
+    '{"a":[1,2.5,"x",true,null]}',
+    '"caf\\u00e9 \\u2603"',
+    '"\\ud800"',
+    "18446744073709551616",
+    "-9223372036854775809",
+    "1e400",
+    b'{"bytes":1}',
+]
+
+BACKENDS = sorted(json.backends)
+
+
+def get_id(value):
+    return repr(value)[:40]
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+@pytest.mark.parametrize("value", VALUES, ids=get_id)
+def test_dumps_matches_simplejson(name, value):
+    backend = json.get_backend(name)
+    reference = json.get_backend("simplejson")
+
+    # The backends may differ in how they escape strings, but must decode to
+    # the same values.
+    result = backend.dumps(value)
+    assert isinstance(result, str)
+    assert reference.loads(result) == reference.loads(reference.dumps(value))
+
+    fp = io.StringIO()
+    backend.dump(value, fp)
+    assert fp.getvalue() == result
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+@pytest.mark.parametrize("document", DOCUMENTS, ids=get_id)
+def test_loads_matches_simplejson(name, document):
+    result = json.get_backend(name).loads(document)
+    expected = json.get_backend("simplejson").loads(document)
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_uuid(name):
+    value = uuid.uuid4()
+    document = {"id": value, "ids": [value, (1, value)], "point": Point(value, {"id": value})}
+    assert json.get_backend(name).dumps(value) == '"%s"' % value.hex
+    assert json.get_backend(name).dumps(document) == json.get_backend("simplejson").dumps(document)
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_decimal_nan(name):
+    # Depending on its version, simplejson encodes this as ``NaN``, which it
+    # can't decode, so the output is compared instead.
+    value = decimal.Decimal("NaN")
+    assert json.get_backend(name).dumps(value) == json.get_backend("simplejson").dumps(value)
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_errors(name):
+    backend = json.get_backend(name)
+
+    with pytest.raises(TypeError):
+        backend.dumps(object())
+
+    with pytest.raises(json.JSONDecodeError):
+        backend.loads("{")
+
+
+def test_unknown_backend():
+    assert isinstance(json.get_backend("unknown"), json.SimplejsonBackend)
+
+
+def test_orjson_available():
+    assert "orjson" in BACKENDS
+
+
+def test_default_backend():
+    assert isinstance(json.get_default_backend(), json.SimplejsonBackend)
+
+    with override_settings(SENTRY_JSON_BACKEND="orjson"):
+        assert isinstance(json.get_default_backend(), json.OrjsonBackend)
+        assert json.loads(json.dumps({"a": [1, None]})) == {"a": [1, None]}
@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from sentry.utils.functional import cached, compact
+from sentry.utils.functional import cache_scope, cached, compact, scope_cached
 
 
 class CompactTest(TestCase):
@@ -33,3 +33,28 @@ class CachedTest(TestCase):
         # Call with different kwargs order - call_count is still one:
         cached(cache, foo, kw2=2, kw1=1)
         assert foo.call_count == 1
+
+
+class ScopeCachedTest(TestCase):
+    def test_cache_scope(self):
+        @scope_cached
+        def foo(value):
+            foo.call_count += 1
+            return value * 2
+
+        foo.call_count = 0
+
+        assert foo(1) == 2
+        assert foo(1) == 2
+        assert foo.call_count == 2
+
+        with cache_scope():
+            assert foo(1) == 2
+            with cache_scope():
+                assert foo(1) == 2
+            assert foo(1) == 2
+            assert foo(2) == 4
+        assert foo.call_count == 4
+
+        assert foo(1) == 2
+        assert foo.call_count == 5
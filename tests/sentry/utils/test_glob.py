@@ -1,6 +1,6 @@
 import pytest
 
-from sentry.utils.glob import glob_match
+from sentry.utils.glob import GlobSet, glob_match, translate_glob
 
 
 class GlobInput:
@@ -52,3 +52,64 @@ class GlobInput:
 )
 def test_glob_match(glob_input, expect):
     assert glob_input() == expect
+
+
+@pytest.mark.parametrize(
+    "pat,kwargs,translated",
+    [
+        ["*.py", {}, True],
+        ["**/node_modules/**", {"doublestar": True}, True],
+        ["a/**/b", {"doublestar": True}, True],
+        ["foo?bar", {}, True],
+        ["root\\*", {"path_normalize": True}, True],
+        ["root\\*", {}, False],
+        ["[ab]*", {}, False],
+        ["{foo,bar}", {}, False],
+        ["caf\xe9", {}, False],
+    ],
+)
+def test_translate_glob(pat, kwargs, translated):
+    assert (translate_glob(pat, **kwargs) is not None) == translated
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"doublestar": True},
+        {"ignorecase": True},
+        {"doublestar": True, "ignorecase": True, "path_normalize": True},
+        {"allow_newline": False},
+    ],
+)
+def test_glob_set(kwargs):
+    patterns = [
+        "*.py",
+        "**/*.py",
+        "foo/**",
+        "**",
+        "*/hello.?y",
+        "root/**/*.py",
+        "foo:*",
+        "[fr]oo*",
+        "{foo,root}*",
+        "a**b",
+        "*caf\xe9*",
+    ]
+    values = [
+        "hello.py",
+        "foo/hello.py",
+        "foo/hello.PY",
+        "root\\foo\\hello.PY",
+        "foo:\nbar",
+        "ab",
+        "a/b",
+        "caf\xe9/hello.py",
+        "",
+        None,
+    ]
+    glob_set = GlobSet(patterns, **kwargs)
+    for value in values:
+        assert glob_set.match(value) == [
+            index for index, pat in enumerate(patterns) if glob_match(value, pat, **kwargs)
+        ], value
@@ -0,0 +1,72 @@
+import pytest
+
+from sentry.utils import hyperloglog
+
+SPARSE_HEADER = b"HYLL\x01\x00\x00\x00" + bytes(8)
+DENSE_HEADER = b"HYLL\x00\x00\x00\x00" + bytes(8)
+
+
+def _encode_dense(registers):
+    data = bytearray(hyperloglog.HLL_DENSE_SIZE - hyperloglog.HLL_HEADER_SIZE)
+    for index, value in enumerate(registers):
+        byte, bit = divmod(index * 6, 8)
+        data[byte] |= (value << bit) & 0xFF
+        if bit > 2:
+            data[byte + 1] |= value >> (8 - bit)
+    return DENSE_HEADER + bytes(data)
+
+
+def test_merge_sparse():
+    # XZERO(100), VAL(3) x 2, ZERO(64), XZERO(16218)
+    value = SPARSE_HEADER + bytes([0x40, 99, 0x89, 0x3F, 0x7F, 0x59])
+    registers = hyperloglog.new_registers()
+    registers[101] = 5
+    hyperloglog.merge(registers, value)
+
+    assert registers[:100] == bytes(100)
+    assert registers[100:102] == bytes([3, 5])
+    assert registers[102:] == bytes(hyperloglog.HLL_REGISTERS - 102)
+
+
+def test_merge_dense():
+    expected = bytearray(hyperloglog.HLL_REGISTERS)
+    expected[0] = 1
+    expected[1] = 63
+    expected[2] = 2
+    expected[3] = 17
+    expected[-1] = 50
+
+    registers = hyperloglog.new_registers()
+    registers[2] = 3
+    hyperloglog.merge(registers, _encode_dense(expected))
+
+    expected[2] = 3
+    assert registers == expected
+
+
+def test_merge_invalid():
+    registers = hyperloglog.new_registers()
+    for value in [b"", b"HYLL", b"HYLX" + bytes(12), DENSE_HEADER + b"\x00", SPARSE_HEADER]:
+        with pytest.raises(ValueError):
+            hyperloglog.merge(registers, value)
+
+
+def test_count():
+    registers = hyperloglog.new_registers()
+    assert hyperloglog.count(registers) == 0
+
+    registers[10] = 1
+    registers[20] = 2
+    registers[30] = 1
+    assert hyperloglog.count(registers) == 3
+
+    registers[:] = [2] * hyperloglog.HLL_REGISTERS
+    assert 45000 < hyperloglog.count(registers) < 50000
+
+
+def test_add():
+    registers = hyperloglog.new_registers(4)
+    hyperloglog.add(registers, 0b1000_0011)
+    hyperloglog.add(registers, 0b0001_0011)
+    hyperloglog.add(registers, 0b0100_0101)
+    assert registers == bytearray([0, 0, 0, 4, 0, 3] + [0] * 10)
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from sentry.utils import metrics
@@ -43,3 +45,35 @@ def test_wraps():
         args, kwargs = timing.call_args
         assert args[0] == "key"
         assert args[3] == {"foo": True, "result": "success"}
+
+
+def test_global_tags():
+    assert metrics._get_current_global_tags() == {}
+    with metrics.global_tags(foo="a"):
+        assert metrics._get_current_global_tags() == {"foo": "a"}
+        with metrics.global_tags(_all_threads=True, foo="b", bar="b"):
+            # Tags of the current thread take precedence.
+            assert metrics._get_current_global_tags() == {"foo": "a", "bar": "b"}
+            assert metrics._merge_tags({"bar": "c"}) == {"foo": "a", "bar": "c"}
+        assert metrics._get_current_global_tags() == {"foo": "a"}
+    assert metrics._get_current_global_tags() == {}
+
+
+def test_global_tags_other_thread():
+    entered = threading.Event()
+    done = threading.Event()
+
+    def run():
+        with metrics.global_tags(_all_threads=True, bar="b"):
+            entered.set()
+            done.wait()
+
+    with metrics.global_tags(foo="a"):
+        assert metrics._get_current_global_tags() == {"foo": "a"}
+        thread = threading.Thread(target=run)
+        thread.start()
+        entered.wait()
+        assert metrics._get_current_global_tags() == {"foo": "a", "bar": "b"}
+        done.set()
+        thread.join()
+        assert metrics._get_current_global_tags() == {"foo": "a"}
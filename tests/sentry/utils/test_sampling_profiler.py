@@ -0,0 +1,67 @@
+import os
+import threading
+
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.sampling_profiler import SamplingProfiler, profiling_stage
+
+
+def _wait_in_stage(started, done):
+    with profiling_stage("tasks.wait"):
+        started.set()
+        done.wait()
+
+
+def test_sample_and_flush(tmpdir):
+    started, done = threading.Event(), threading.Event()
+    thread = threading.Thread(target=_wait_in_stage, args=(started, done))
+    thread.start()
+    started.wait()
+
+    profiler = SamplingProfiler(["worker"])
+    try:
+        profiler.sample()
+        profiler.sample()
+    finally:
+        done.set()
+        thread.join()
+
+    assert profiler.samples == 2
+    (stack,) = [stack for stack in profiler.stacks if stack.startswith("tasks.wait;")]
+    assert profiler.stacks[stack] == 2
+    assert f"{__name__}:_wait_in_stage" in stack.split(";")
+
+    path = profiler.flush(str(tmpdir))
+    assert os.path.basename(path).startswith(f"worker-{os.getpid()}-")
+    assert path.endswith(".collapsed")
+    with open(path) as f:
+        assert f"{stack} 2\n" in f.read()
+    assert profiler.stacks == {}
+    assert profiler.flush(str(tmpdir)) is None
+
+
+def test_profiling_stage_restores_previous():
+    from sentry.utils.sampling_profiler import _stages
+
+    ident = threading.get_ident()
+    with profiling_stage("outer"):
+        with profiling_stage("inner"):
+            assert _stages[ident] == "inner"
+        assert _stages[ident] == "outer"
+    assert ident not in _stages
+
+
+def test_get_config():
+    profiler = SamplingProfiler(["worker", "worker:events.process_event"])
+
+    with override_options({"profiling.sampler.targets": ["web"]}):
+        assert profiler.get_config() is None
+
+    with override_options(
+        {
+            "profiling.sampler.targets": ["worker:events.process_event"],
+            "profiling.sampler.interval": 0.05,
+            "profiling.sampler.flush-interval": 30,
+            "profiling.sampler.output-dir": "/tmp/profiles",
+        }
+    ):
+        assert profiler.get_config() == (0.05, 30, "/tmp/profiles")
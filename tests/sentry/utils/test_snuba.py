@@ -1,4 +1,8 @@
+import gc
+import threading
+import time
 import unittest
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 
 import pytest
@@ -7,12 +11,22 @@ from django.utils import timezone
 
 from sentry.models import GroupRelease, Project, Release
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+from sentry.utils import json, redis
 from sentry.utils.compat import mock
 from sentry.utils.snuba import (
     Dataset,
+    JSONStreamReader,
+    QueryCoalescer,
+    QueryScheduler,
+    RateLimitExceeded,
     SnubaQueryParams,
+    UnexpectedResponseError,
     UnqualifiedQueryError,
     _prepare_query_params,
+    _stream_response,
+    get_cache_key,
+    get_coalescing_timeout,
     get_json_type,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
@@ -354,3 +368,287 @@ class QuantizeTimeTest(unittest.TestCase):
                 break
 
         assert i != j
+
+
+def chunked(value, size):
+    value = value.encode("utf-8")
+    return [value[i : i + size] for i in range(0, len(value), size)]
+
+
+class JSONStreamReaderTest(unittest.TestCase):
+    def test_elements(self):
+        value = {
+            "data": [{"id": 1234567890, "message": "h\u00e9llo \u2603", "score": 1.5}] * 5,
+            "totals": {"count": 5},
+        }
+        for size in (1, 3, 64, 4096):
+            reader = JSONStreamReader(chunked(json.dumps(value, indent=2), size))
+            items = reader.items("data")
+            assert next(items) == ("data", None)
+            assert list(reader.elements()) == value["data"]
+            assert list(items) == [("totals", {"count": 5})]
+            assert reader.next_char() == ""
+
+    def test_empty(self):
+        reader = JSONStreamReader(chunked('{"data": []}', 2))
+        items = reader.items("data")
+        assert next(items) == ("data", None)
+        assert list(reader.elements()) == []
+        assert list(items) == []
+
+    def test_invalid(self):
+        for value in ('{"data": [1 2]}', '{"data": [1,', "[]"):
+            reader = JSONStreamReader(chunked(value, 2))
+            with pytest.raises(ValueError):
+                for key, _ in reader.items("data"):
+                    if key == "data":
+                        list(reader.elements())
+
+
+class StreamResponseTest(unittest.TestCase):
+    def get_response(self, value, status=200):
+        response = mock.Mock(status=status)
+        response.data = json.dumps(value).encode("utf-8")
+        response.stream.return_value = iter(chunked(json.dumps(value), 5))
+        return response
+
+    def test_rows(self):
+        response = self.get_response(
+            {"meta": [{"name": "id"}], "data": [{"id": 1}, {"id": 2}], "totals": {"id": 3}}
+        )
+        body = _stream_response(response, lambda row: {"id": row["id"] * 10}, {})
+        assert body["meta"] == [{"name": "id"}]
+        assert "totals" not in body
+        assert not response.close.called
+
+        assert list(body["data"]) == [{"id": 10}, {"id": 20}]
+        assert body["totals"] == {"id": 3}
+        assert response.close.called
+        assert response.release_conn.called
+
+    def test_partially_consumed(self):
+        response = self.get_response({"data": [{"id": 1}, {"id": 2}]})
+        body = _stream_response(response, lambda row: row, {})
+        assert next(body["data"]) == {"id": 1}
+        body["data"].close()
+        assert response.close.called
+
+    def test_on_close(self):
+        on_close = mock.Mock()
+        response = self.get_response({"data": [{"id": 1}, {"id": 2}]})
+        body = _stream_response(response, lambda row: row, {}, on_close=on_close)
+        assert not on_close.called
+
+        assert list(body["data"]) == [{"id": 1}, {"id": 2}]
+        body["data"].close()
+        on_close.assert_called_once_with()
+
+    def test_on_close_unread(self):
+        on_close = mock.Mock()
+        response = self.get_response({"data": [{"id": 1}, {"id": 2}]})
+        body = _stream_response(response, lambda row: row, {}, on_close=on_close)
+        del body
+        gc.collect()
+        assert response.close.called
+        on_close.assert_called_once_with()
+
+    def test_error(self):
+        response = self.get_response({"error": {"message": "slow down"}}, status=429)
+        with pytest.raises(RateLimitExceeded):
+            _stream_response(response, lambda row: row, {})
+
+    def test_invalid(self):
+        response = mock.Mock(status=200)
+        response.stream.return_value = iter([b'{"data": [{"id": 1}, {"id"'])
+        body = _stream_response(response, lambda row: row, {})
+        with pytest.raises(UnexpectedResponseError):
+            list(body["data"])
+        assert response.close.called
+
+
+class QueryCoalescerTest(TestCase):
+    def setUp(self):
+        self.cluster = redis.redis_clusters.get("default")
+        self.params = ({"dataset": "events", "selected_columns": ["id"]}, None, None)
+        self.key = get_cache_key(self.params[0])
+
+    def test_get_coalescing_timeout(self):
+        with override_options(
+            {"snuba.query-coalescing.referrers": {"api.foo": 1.0, "search.": 2.0}}
+        ):
+            assert get_coalescing_timeout("api.foo") == 1.0
+            assert get_coalescing_timeout("search.sample") == 2.0
+            assert get_coalescing_timeout("api.bar") is None
+            assert get_coalescing_timeout(None) is None
+
+    def test_local(self):
+        started = threading.Event()
+        waiting = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        class WaitedFuture(Future):
+            def result(self, timeout=None):
+                waiting.set()
+                return super().result(timeout)
+
+        def execute(params):
+            calls.append(params)
+            started.set()
+            release.wait(5)
+            return [{"data": [{"id": 1}]}]
+
+        leader_results = []
+        leader = threading.Thread(
+            target=lambda: leader_results.extend(
+                QueryCoalescer("test", 5).run([self.params], execute)
+            )
+        )
+        follower_results = []
+        follower = threading.Thread(
+            target=lambda: follower_results.extend(
+                QueryCoalescer("test", 5).run([self.params], execute)
+            )
+        )
+
+        with mock.patch("sentry.utils.snuba.Future", WaitedFuture):
+            leader.start()
+            started.wait(5)
+            # The leader may only finish once the follower waits for its result,
+            # otherwise the follower would run the query itself.
+            follower.start()
+            waiting.wait(5)
+            release.set()
+            leader.join()
+            follower.join()
+
+        assert len(calls) == 1
+        assert leader_results == follower_results == [{"data": [{"id": 1}]}]
+        assert leader_results[0] is not follower_results[0]
+
+    def test_remote(self):
+        coalescer = QueryCoalescer("test", 5)
+        lease_key, result_key = coalescer.get_keys(self.key)
+        self.cluster.set(lease_key, "other")
+
+        def publish():
+            self.cluster.set(result_key, json.dumps({"data": [{"id": 2}]}))
+            self.cluster.delete(lease_key)
+
+        timer = threading.Timer(0.1, publish)
+        timer.start()
+        execute = mock.Mock()
+        assert coalescer.run([self.params], execute) == [{"data": [{"id": 2}]}]
+        timer.join()
+        assert not execute.called
+
+    def test_remote_abandoned(self):
+        coalescer = QueryCoalescer("test", 5)
+        lease_key, _ = coalescer.get_keys(self.key)
+        self.cluster.set(lease_key, "other")
+
+        timer = threading.Timer(0.1, lambda: self.cluster.delete(lease_key))
+        timer.start()
+        execute = mock.Mock(return_value=[{"data": [{"id": 3}]}])
+        assert coalescer.run([self.params], execute) == [{"data": [{"id": 3}]}]
+        timer.join()
+        execute.assert_called_once_with([self.params])
+
+    def test_remote_timeout(self):
+        coalescer = QueryCoalescer("test", 0.1)
+        lease_key, _ = coalescer.get_keys(self.key)
+        self.cluster.set(lease_key, "other")
+
+        execute = mock.Mock(return_value=[{"data": [{"id": 4}]}])
+        assert coalescer.run([self.params], execute) == [{"data": [{"id": 4}]}]
+        execute.assert_called_once_with([self.params])
+
+    def test_publishes_result(self):
+        coalescer = QueryCoalescer("test", 5)
+        lease_key, result_key = coalescer.get_keys(self.key)
+
+        execute = mock.Mock(return_value=[{"data": [{"id": 5}]}])
+        assert coalescer.run([self.params], execute) == [{"data": [{"id": 5}]}]
+        assert json.loads(self.cluster.get(result_key)) == {"data": [{"id": 5}]}
+        assert not self.cluster.exists(lease_key)
+
+
+class QuerySchedulerTest(TestCase):
+    def wait_until_waiting(self, scheduler, count):
+        for _ in range(500):
+            with scheduler.condition:
+                if len(scheduler.waiting) == count:
+                    return
+            time.sleep(0.01)
+        raise AssertionError("queries did not start waiting")
+
+    def test_priority(self):
+        scheduler = QueryScheduler(max_concurrency=1)
+        started = []
+
+        def run(referrer):
+            slot = scheduler.acquire(referrer)
+            started.append(referrer)
+            scheduler.release(slot)
+
+        with override_options(
+            {"snuba.query-scheduler.referrers": {"tasks.": {"priority": "background"}}}
+        ):
+            slot = scheduler.acquire("api.first")
+            background = threading.Thread(target=run, args=("tasks.report",))
+            background.start()
+            self.wait_until_waiting(scheduler, 1)
+            interactive = threading.Thread(target=run, args=("api.second",))
+            interactive.start()
+            self.wait_until_waiting(scheduler, 2)
+
+            scheduler.release(slot)
+            background.join()
+            interactive.join()
+
+        assert started == ["api.second", "tasks.report"]
+
+    def test_budget(self):
+        scheduler = QueryScheduler(max_concurrency=3)
+
+        with override_options(
+            {"snuba.query-scheduler.referrers": {"tasks.": {"priority": "background", "budget": 1}}}
+        ):
+            first = scheduler.acquire("tasks.report")
+            started = threading.Event()
+
+            def run():
+                scheduler.release(scheduler.acquire("tasks.digest"))
+                started.set()
+
+            budgeted = threading.Thread(target=run)
+            budgeted.start()
+            self.wait_until_waiting(scheduler, 1)
+
+            # Other referrers aren't held up by the exhausted budget.
+            scheduler.release(scheduler.acquire("api.issues"))
+            assert not started.is_set()
+
+            scheduler.release(first)
+            budgeted.join()
+            assert started.is_set()
+
+    def test_adaptive_concurrency(self):
+        scheduler = QueryScheduler(max_concurrency=10)
+
+        with override_options({"snuba.query-scheduler.adaptive-concurrency": True}):
+            scheduler.release(scheduler.acquire("api.issues"), overloaded=True)
+            assert scheduler.limit == 5
+            # Failures from the same overload only halve the limit once.
+            scheduler.release(scheduler.acquire("api.issues"), overloaded=True)
+            assert scheduler.limit == 5
+
+            # The limit grows by about one for each round of successful queries.
+            for _ in range(50):
+                scheduler.release(scheduler.acquire("api.issues"))
+            assert scheduler.limit == 10
+
+    def test_fixed_concurrency(self):
+        scheduler = QueryScheduler(max_concurrency=10)
+        scheduler.release(scheduler.acquire("api.issues"), overloaded=True)
+        assert scheduler.limit == 10
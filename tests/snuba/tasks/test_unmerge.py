@@ -596,3 +596,7 @@ class UnmergeTestCase(TestCase, SnubaTestCase):
         )
         assert destination_similar_items[1][0] == source.id
         assert destination_similar_items[1][1]["message:message:character-shingles"] < 1.0
+
+    def test_unmerge_parallel(self):
+        with self.options({"unmerge.parallel-slices": 3}):
+            self.test_unmerge()